@@ -0,0 +1,83 @@
+import json
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+from .suite import SCENARIOS, STRUCTURES, TRANSPORTS, Options, Result, compare, run
+
+
+def main() -> int:
+    parser = ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark ggmail against a local fake IMAP server",
+    )
+    parser.add_argument(
+        "scenarios", nargs="*", help=f"defaults to all: {', '.join(SCENARIOS)}"
+    )
+    parser.add_argument("--messages", type=int, default=Options().messages)
+    parser.add_argument("--size", type=int, default=Options().size)
+    parser.add_argument("--structure", choices=STRUCTURES, default="text")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--tls", action="store_true")
+    parser.add_argument("--repeat", type=int, default=Options().repeat)
+    parser.add_argument(
+        "--transport",
+        choices=list(TRANSPORTS),
+        default=Options().transport,
+        help="imaplib to measure the read path of imaplib as is",
+    )
+    parser.add_argument(
+        "--spill-threshold",
+        type=int,
+        help="size in bytes above which the buffered transport spills literals",
+    )
+    parser.add_argument("--json", type=Path, help="write the results to a file")
+    parser.add_argument("--compare", type=Path, help="a baseline written by --json")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    arguments = parser.parse_args()
+    unknown = set(arguments.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    options = Options(
+        messages=arguments.messages,
+        size=arguments.size,
+        structure=arguments.structure,
+        latency=arguments.latency,
+        tls=arguments.tls,
+        repeat=arguments.repeat,
+        transport=arguments.transport,
+        spill_threshold=arguments.spill_threshold,
+    )
+    results = run(options, arguments.scenarios)
+
+    print(f"{'scenario':<22}{'items':>8}{'seconds':>10}{'items/s':>12}{'MB/s':>10}")
+    for result in results:
+        print(
+            f"{result.name:<22}{result.items:>8}{result.seconds:>10.4f}"
+            f"{result.items_per_second:>12.0f}{result.megabytes_per_second:>10.2f}"
+        )
+    peak = results[-1].peak_rss_megabytes if results else None
+    print(f"peak RSS: {'unavailable' if peak is None else f'{peak:.1f} MB'}")
+
+    if arguments.json:
+        report = {
+            "options": options.dict(),
+            "results": [result.dict() for result in results],
+        }
+        arguments.json.write_text(json.dumps(report, indent=2))
+
+    if arguments.compare:
+        report = json.loads(arguments.compare.read_text())
+        baseline = [Result(**result) for result in report["results"]]
+        regressions = compare(results, baseline, arguments.tolerance)
+        for regression in regressions:
+            print(f"regression {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ggmail.account import Account
+from ggmail.authentication import Google
+from ggmail.flag import Flag
+from ggmail.message import (
+    ContentType,
+    FetchMode,
+    Message,
+    header_message_factory,
+    message_factory,
+)
+from ggmail.transport import BufferedTransport, Transport
+from tests.fake_server import (
+    STRUCTURES,
+    FakeIMAPServer,
+    FakeMailbox,
+    FakeMessage,
+    make_message,
+    self_signed_context,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TRANSPORTS = {"buffered": BufferedTransport, "imaplib": Transport}
+
+
+class Options(BaseModel):
+    messages: int = 1000
+    size: int = 2048
+    structure: str = "text"
+    latency: float = 0.0
+    tls: bool = False
+    repeat: int = 3
+    transport: str = "buffered"
+    spill_threshold: Optional[int] = None
+
+
+class Result(BaseModel):
+    """
+    Best run of a scenario, items are messages except for the mailboxes scenario
+    """
+
+    name: str
+    items: int
+    seconds: float
+    items_per_second: float
+    megabytes_per_second: float
+    peak_rss_megabytes: Optional[float] = None
+
+
+class Bench:
+    """
+    A fake server filled with the synthetic messages and an account logged in with
+    the inbox selected
+    """
+
+    def __init__(self, server: FakeIMAPServer, account: Account, raw: List[bytes]):
+        self.server = server
+        self.account = account
+        self.raw = raw
+        self.uids = [str(uid) for uid in range(1, len(raw) + 1)]
+
+    @property
+    def bytes_received(self) -> int:
+        return self.account._imap.bytes_received
+
+
+# A scenario prepares the bench and returns the measured action, the action returns
+# the number of items it handled and the number of bytes it processed, None to use
+# the bytes received from the server
+Action = Callable[[], Tuple[int, Optional[int]]]
+Scenario = Callable[[Bench], Action]
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+
+def scenario(name: str) -> Callable[[Scenario], Scenario]:
+    def register(function: Scenario) -> Scenario:
+        SCENARIOS[name] = function
+        return function
+
+    return register
+
+
+@scenario("fetch_messages")
+def fetch_messages(bench: Bench) -> Action:
+    return lambda: (len(bench.account.fetch_messages()), None)
+
+
+@scenario("fetch_raw")
+def fetch_raw(bench: Bench) -> Action:
+    def action():
+        bench.account._imap.uid("FETCH", f"1:{len(bench.uids)}", "(BODY.PEEK[])")
+        return len(bench.uids), None
+
+    return action
+
+
+@scenario("fetch_headers")
+def fetch_headers(bench: Bench) -> Action:
+    return lambda: (len(bench.account.fetch_messages(mode=FetchMode.HEADERS)), None)
+
+
+@scenario("fetch_summaries")
+def fetch_summaries(bench: Bench) -> Action:
+    return lambda: (len(bench.account.fetch_messages(mode=FetchMode.SUMMARY)), None)
+
+
+@scenario("fetch_attachments")
+def fetch_attachments(bench: Bench) -> Action:
+    def action():
+        return len(bench.account.fetch_attachments_using_uids(bench.uids)), None
+
+    return action
+
+
+@scenario("search_message_uids")
+def search_message_uids(bench: Bench) -> Action:
+    return lambda: (len(bench.account.search_message_uids()), None)
+
+
+@scenario("bulk_flags")
+def bulk_flags(bench: Bench) -> Action:
+    def action():
+        bench.account.add_flags_messages_using_uids(bench.uids, [Flag.FLAGGED])
+        return len(bench.uids), None
+
+    return action
+
+
+@scenario("bulk_move")
+def bulk_move(bench: Bench) -> Action:
+    archive = bench.account.mailbox_from_path("Archive")
+
+    def action():
+        bench.account.move_messages_using_uids(bench.uids, archive)
+        return len(bench.uids), None
+
+    return action
+
+
+@scenario("mailboxes")
+def mailboxes(bench: Bench) -> Action:
+    for index in range(100):
+        bench.server.add_mailbox(FakeMailbox(f"Folder {index}"))
+    # The mailboxes listed while opening the bench are kept by the account
+    bench.account._mailboxes = []
+
+    return lambda: (len(bench.account.mailboxes()), None)
+
+
+def fetch_descriptions(bench: Bench) -> List[List[bytes]]:
+    """
+    Build the raw descriptions of the messages as returned by a UID FETCH
+    """
+    return [
+        [b"%d (UID %d FLAGS (\\Seen) BODY[] {%d}" % (uid, uid, len(raw)), raw]
+        for uid, raw in enumerate(bench.raw, 1)
+    ]
+
+
+@scenario("parse")
+def parse(bench: Bench) -> Action:
+    descriptions = fetch_descriptions(bench)
+
+    def action():
+        for uid, description in zip(bench.uids, descriptions):
+            message_factory(uid, description, bench.account)
+        return len(descriptions), sum(len(raw) for raw in bench.raw)
+
+    return action
+
+
+@scenario("parse_headers")
+def parse_headers(bench: Bench) -> Action:
+    descriptions = fetch_descriptions(bench)
+
+    def action():
+        for uid, description in zip(bench.uids, descriptions):
+            header_message_factory(uid, description, bench.account)
+        return len(descriptions), sum(len(raw) for raw in bench.raw)
+
+    return action
+
+
+@scenario("parse_content_keep_raw")
+def parse_content_keep_raw(bench: Bench) -> Action:
+    descriptions = fetch_descriptions(bench)
+
+    def action():
+        for uid, description in zip(bench.uids, descriptions):
+            message_factory(uid, description, bench.account, keep_raw=True).body
+        return len(descriptions), sum(len(raw) for raw in bench.raw)
+
+    return action
+
+
+def message_fields(bench: Bench) -> List[dict]:
+    """
+    Build the fields of the messages as parsed by message_factory
+    """
+    date = datetime(2021, 10, 9, 18, 27, 26, tzinfo=timezone.utc)
+    return [
+        dict(
+            uid=uid,
+            from_="sender@example.com",
+            to="recipient@example.com",
+            subject=f"Message {uid}",
+            body=None,
+            html=None,
+            date=date,
+            content_type=ContentType.TEXT,
+            flags=[Flag.SEEN],
+        )
+        for uid in bench.uids
+    ]
+
+
+@scenario("build_messages")
+def build_messages(bench: Bench) -> Action:
+    fields = message_fields(bench)
+
+    def action():
+        for data in fields:
+            Message(_account=bench.account, **data)
+        return len(fields), 0
+
+    return action
+
+
+@scenario("build_messages_trusted")
+def build_messages_trusted(bench: Bench) -> Action:
+    fields = message_fields(bench)
+
+    def action():
+        for data in fields:
+            Message._from_trusted(_account=bench.account, **data)
+        return len(fields), 0
+
+    return action
+
+
+def peak_rss_megabytes() -> Optional[float]:
+    """
+    Get the peak resident memory of the process, None where it is not available
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+@contextmanager
+def open_bench(options: Options, raw: List[bytes]) -> Iterator[Bench]:
+    """
+    Start a fake server holding the messages in its inbox and an empty Archive
+    mailbox then log an account in
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        ssl_context = self_signed_context(Path(directory)) if options.tls else None
+        if options.tls and ssl_context is None:
+            raise RuntimeError("openssl is required to benchmark with TLS")
+
+        inbox = FakeMailbox(
+            "INBOX",
+            [
+                FakeMessage(uid, message, ["\\Seen"])
+                for uid, message in enumerate(raw, 1)
+            ],
+        )
+        with FakeIMAPServer(
+            [inbox, FakeMailbox("Archive")],
+            latency=options.latency,
+            ssl_context=ssl_context,
+        ) as server:
+            authentication = Google(
+                username="benchmark",
+                password="benchmark",
+                host=server.host,
+                port=server.port,
+                secure=options.tls,
+            )
+            transport = TRANSPORTS[options.transport]()
+            if isinstance(transport, BufferedTransport):
+                transport.spill_threshold = options.spill_threshold
+            with Account(authentication=authentication, transport=transport) as account:
+                account.select_mailbox(account.inbox())
+                yield Bench(server, account, raw)
+
+
+def run_scenario(name: str, options: Options, raw: List[bytes]) -> Result:
+    """
+    Run a scenario several times on a fresh server and keep the fastest run
+    """
+    best: Optional[Result] = None
+
+    for _ in range(options.repeat):
+        with open_bench(options, raw) as bench:
+            action = SCENARIOS[name](bench)
+            received = bench.bytes_received
+            start = time.perf_counter()
+            items, processed = action()
+            seconds = time.perf_counter() - start
+            if processed is None:
+                processed = bench.bytes_received - received
+
+        if best is None or seconds < best.seconds:
+            best = Result(
+                name=name,
+                items=items,
+                seconds=seconds,
+                items_per_second=items / seconds,
+                megabytes_per_second=processed / seconds / 2**20,
+            )
+
+    best.peak_rss_megabytes = peak_rss_megabytes()
+    return best
+
+
+def run(options: Options, names: Optional[List[str]] = None) -> List[Result]:
+    """
+    Run the scenarios
+
+    :param options: The size of the synthetic mailbox and of the server latency
+    :param names: The scenarios to run, defaults to every scenario
+    :return: The results in the order of the scenarios
+    """
+    if options.structure not in STRUCTURES:
+        raise ValueError(f"Unknown structure {options.structure}, use {STRUCTURES}")
+    if options.transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {options.transport}, use {TRANSPORTS}")
+
+    raw = [
+        make_message(uid, options.size, options.structure)
+        for uid in range(1, options.messages + 1)
+    ]
+    return [run_scenario(name, options, raw) for name in names or list(SCENARIOS)]
+
+
+def compare(
+    results: List[Result], baseline: List[Result], tolerance: float
+) -> List[str]:
+    """
+    Compare results with a baseline
+
+    :param results: The current results
+    :param baseline: The reference results
+    :param tolerance: The accepted throughput loss, 0.2 for 20%
+    :return: A description of each regression
+    """
+    references = {result.name: result for result in baseline}
+    regressions = []
+
+    for result in results:
+        reference = references.get(result.name)
+        if reference is None:
+            continue
+        if result.items_per_second < reference.items_per_second * (1 - tolerance):
+            loss = 1 - result.items_per_second / reference.items_per_second
+            regressions.append(
+                f"{result.name}: {result.items_per_second:.0f} items/s instead of "
+                f"{reference.items_per_second:.0f} items/s (-{loss:.0%})"
+            )
+
+    return regressions
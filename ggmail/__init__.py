@@ -1,7 +1,15 @@
 from .account import Account  # noqa
+from .async_account import AsyncAccount  # noqa
+from .async_mailbox import AsyncMailbox  # noqa
 from .authentication import Google, GoogleOAuth2, Outlook  # noqa
-from .flag import Flag  # noqa
+from .cache import MessageCache  # noqa
+from .flag import Flag, FlagSet  # noqa
+from .idle import IdleEvent, IdleEventKind  # noqa
+from .instrumentation import CommandEvent, MetricsCollector, ParseEvent  # noqa
 from .mailbox import Mailbox  # noqa
-from .message import Message  # noqa
+from .message import Attachment, FetchMode, Message, MessageSummary  # noqa
+from .pool import AccountPool  # noqa
+from .sync import MailboxChanges, SyncState  # noqa
+from .transport import BufferedTransport, Transport  # noqa
 
 __version__ = "0.4.1"
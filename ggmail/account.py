@@ -1,41 +1,93 @@
-from imaplib import IMAP4_SSL
-from typing import Any, List, Optional
+from concurrent.futures import Future
+from contextlib import closing, contextmanager
+from functools import partial
+from imaplib import IMAP4
+from threading import Thread
+from time import monotonic, perf_counter, sleep
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
-from pydantic import BaseModel, PrivateAttr
+from pydantic import BaseModel, Field, PrivateAttr
 
+from .attachment import TransferDecoder, parse_attachments_response
 from .authentication import Authentication
+from .batch import Batch
+from .cache import MessageCache
 from .exception import (
     AlreadyConnected,
     FlagAlreadyAttached,
     FlagNotAttached,
+    LoginFailed,
     MailboxAlreadyExists,
     MailboxFetchingFailed,
     MailboxNotDeletable,
     MailboxNotFound,
     MessageFetchingFailed,
+    MessageNotFound,
     MessageSearchingFailed,
     NotConnected,
 )
-from .flag import Flag
+from .fetch import parse_fetch
+from .flag import Flag, FlagSet, format_flags, unique_flags
+from .idle import IDLE_RENEWAL, IdleEvent, IdleEventKind, Idler
+from .instrumentation import CommandEvent, Event, Hook, ParseEvent
 from .mailbox import Mailbox, MailboxKind, mailbox_factory
-from .message import Message, message_factory
+from .message import (
+    CONTENT_FIELDS,
+    DEFAULT_CHUNK_SIZE,
+    HEADER_FIELDS,
+    Attachment,
+    ContentLoader,
+    FetchMode,
+    Message,
+    MessageSummary,
+    header_message_factory,
+    message_factory,
+    summary_factory,
+)
 from .policy import Policy
 from .policy import all_ as all_policy
+from .policy import uid as uid_policy
+from .sync import MailboxChanges, SyncState
+from .transport import BufferedTransport, Transport
+from .uid import (
+    DEFAULT_MAX_UID_SET_SIZE,
+    chunk_uids,
+    compress_uids,
+    count_uids,
+    expand_uids,
+)
 
 
 class Account(BaseModel):
     authentication: Authentication
 
-    _imap: IMAP4_SSL = PrivateAttr()
+    _connection: Optional[IMAP4] = PrivateAttr(None)
+    _connecting: Optional[Future] = PrivateAttr(None)
+    _session_lost: bool = PrivateAttr(False)
     _mailboxes: List[Mailbox] = PrivateAttr([])
+    _capabilities: Optional[Tuple[str, ...]] = PrivateAttr(None)
+    _batch: Optional[Batch] = PrivateAttr(None)
+    _uidvalidity: Optional[str] = PrivateAttr(None)
+    _uidnext: Optional[int] = PrivateAttr(None)
+    _highestmodseq: Optional[int] = PrivateAttr(None)
+    _sync_extension: Optional[str] = PrivateAttr(None)
 
     selected_mailbox: Optional[Mailbox] = None
 
     is_connected: bool = False
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        self._imap = IMAP4_SSL(self.authentication.host, self.authentication.port)
+    max_uid_set_size: int = DEFAULT_MAX_UID_SET_SIZE
+
+    max_retries: int = 3
+    retry_backoff: float = 0.5
+
+    hooks: List[Hook] = []
+
+    cache: Optional[MessageCache] = None
+
+    keep_raw: bool = False
+
+    transport: Transport = Field(default_factory=BufferedTransport)
 
     def __enter__(self):
         self.login()
@@ -44,6 +96,53 @@ class Account(BaseModel):
     def __exit__(self, exc_type, exc_value, exc_traceback):
         self.logout()
 
+    @property
+    def _imap(self) -> IMAP4:
+        """
+        The connection to the server, opened on first use or taken from the
+        background connection started by `ggmail.account.Account.connect`
+        """
+        if self._connection is None:
+            connecting, self._connecting = self._connecting, None
+            if connecting is not None:
+                self._connection = connecting.result()
+            else:
+                self._connection = self._open_connection()
+        return self._connection
+
+    def _open_connection(self) -> IMAP4:
+        return self.transport.open(
+            self.authentication.host,
+            self.authentication.port,
+            self.authentication.secure,
+        )
+
+    def connect(self, background: bool = False):
+        """
+        Open the connection to the server ahead of time, otherwise the connection is
+        opened by the login or by the first command
+
+        :param background: True to open the connection in a background thread, the
+                           first command waits for it and raises its error if any
+        """
+        if self._connection is not None or self._connecting is not None:
+            return
+
+        if not background:
+            self._connection = self._open_connection()
+            return
+
+        connecting: Future = Future()
+
+        def open_connection():
+            try:
+                connecting.set_result(self._open_connection())
+            except BaseException as error:
+                connecting.set_exception(error)
+
+        self._connecting = connecting
+        Thread(target=open_connection, daemon=True).start()
+
     def login(self):
         """
         Login to the gmail account
@@ -56,6 +155,9 @@ class Account(BaseModel):
 
         self.authentication.login(self._imap)
 
+        self._capabilities = None
+        self._sync_extension = None
+        self._session_lost = False
         self.is_connected = True
 
     def logout(self):
@@ -66,9 +168,190 @@ class Account(BaseModel):
         """
         self._check_is_connected()
 
-        self._imap.logout()
+        if not self._session_lost:
+            self._imap.logout()
+        self._connection = None
+        self._session_lost = False
         self.is_connected = False
 
+    def _drop_connection(self):
+        """
+        Forget a broken connection, the session is restored by the next command
+        """
+        connection, self._connection = self._connection, None
+        self._session_lost = True
+
+        if connection is not None:
+            try:
+                connection.shutdown()
+            except OSError:
+                pass
+
+    def _restore_session(self):
+        """
+        Open a new connection, login again and select the selected mailbox again
+
+        :raises LoginFailed: If the credentials are not accepted anymore
+        """
+        try:
+            self.authentication.login(self._imap)
+        except LoginFailed:
+            self._drop_connection()
+            self.is_connected = False
+            raise
+
+        self._capabilities = None
+        self._sync_extension = None
+        self._session_lost = False
+
+        if self.selected_mailbox is not None:
+            self._imap.select(self.selected_mailbox.path)
+            self._read_selection()
+
+    def _execute(self, name: str, *args: Any, idempotent: bool = False) -> Any:
+        """
+        Send a command, if the connection is dropped the session is restored by
+        logging in again and selecting the selected mailbox again, idempotent
+        commands are then retried after an exponential backoff
+
+        :param name: The name of the `imaplib.IMAP4` method sending the command
+        :param args: The arguments of the command
+        :param idempotent: True if sending the command twice is harmless
+        :raises IMAP4.abort: If the connection is dropped and the command can not be
+                             retried, is_connected becomes False if the session can
+                             not be restored
+        :raises LoginFailed: If the credentials are not accepted anymore
+        :return: The response of the command
+        """
+        attempt = 0
+
+        while True:
+            try:
+                if self._session_lost:
+                    self._restore_session()
+                return self._send(name, *args)
+            except (IMAP4.abort, OSError):
+                self._drop_connection()
+
+                if not idempotent or attempt >= self.max_retries:
+                    self._try_restore_session()
+                    raise
+
+                sleep(self.retry_backoff * 2**attempt)
+                attempt += 1
+
+    def _send(self, name: str, *args: Any) -> Any:
+        """
+        Call the `imaplib.IMAP4` method sending a command, a
+        `ggmail.instrumentation.CommandEvent` is fired if the account has hooks
+        """
+        imap = self._imap
+
+        if not self.hooks:
+            return getattr(imap, name)(*args)
+
+        bytes_sent = getattr(imap, "bytes_sent", 0)
+        bytes_received = getattr(imap, "bytes_received", 0)
+        error = None
+        start = perf_counter()
+
+        try:
+            return getattr(imap, name)(*args)
+        except Exception as exception:
+            error = type(exception).__name__
+            raise
+        finally:
+            duration = perf_counter() - start
+
+            if name == "uid":
+                command = f"UID {args[0].upper()}"
+                uid_count = count_uids(args[1]) if args[1] else 0
+            else:
+                command = name.upper()
+                uid_count = 0
+
+            self._fire(
+                CommandEvent(
+                    name=command,
+                    uid_count=uid_count,
+                    bytes_sent=getattr(imap, "bytes_sent", 0) - bytes_sent,
+                    bytes_received=getattr(imap, "bytes_received", 0) - bytes_received,
+                    duration=duration,
+                    error=error,
+                )
+            )
+
+    def _parse(self, name: str, parser: Callable[[], List[Any]]) -> List[Any]:
+        """
+        Call a parser, a `ggmail.instrumentation.ParseEvent` is fired if the account
+        has hooks
+
+        :param name: The name of the parser in the event
+        :param parser: The function parsing a response
+        :return: The parsed objects
+        """
+        if not self.hooks:
+            return parser()
+
+        start = perf_counter()
+        parsed = parser()
+        self._fire(
+            ParseEvent(name=name, count=len(parsed), duration=perf_counter() - start)
+        )
+        return parsed
+
+    def _fire(self, event: Event):
+        for hook in self.hooks:
+            hook(event)
+
+    def _try_restore_session(self):
+        """
+        Restore the session if possible, the account is disconnected otherwise
+        """
+        try:
+            self._restore_session()
+        except (IMAP4.error, OSError, LoginFailed):
+            self._drop_connection()
+            self.is_connected = False
+
+    def is_alive(self) -> bool:
+        """
+        Check that the connection is still usable by sending a NOOP
+
+        :return: True if the account is connected and the server answers, False else
+        """
+        if not self.is_connected:
+            return False
+
+        try:
+            status, _ = self._imap.noop()
+        except (IMAP4.error, OSError):
+            return False
+
+        return status == "OK"
+
+    def has_capability(self, capability: str) -> bool:
+        """
+        Check that the server supports a capability, capabilities are requested
+        once after the login
+
+        :param capability: The capability such as MOVE or UIDPLUS
+        :raises NotConnected: If the user is not connected
+        :return: True if the server advertises the capability, False else
+        """
+        self._check_is_connected()
+
+        if self._capabilities is None:
+            status, raw_response = self._execute("capability", idempotent=True)
+
+            if status == "OK" and raw_response and raw_response[-1]:
+                raw_capabilities = raw_response[-1].decode("ascii").upper()
+                self._capabilities = tuple(raw_capabilities.split())
+            else:
+                self._capabilities = tuple(self._imap.capabilities)
+
+        return capability.upper() in self._capabilities
+
     def _check_path_empty(self, path: str):
         """
         Assert that the target path is free
@@ -81,6 +364,26 @@ class Account(BaseModel):
                     f"A mailbox already exists at '{mailbox.path}'"
                 )
 
+    def _chunk_uids(self, uids: List[str]) -> List[List[str]]:
+        """
+        Split uids into chunks whose uid set fits in a single command
+
+        :param uids: The uids
+        :return: The sorted chunks of uids
+        """
+        return chunk_uids(uids, self.max_uid_set_size)
+
+    def _uid_sets(self, uids: List[str]) -> List[str]:
+        """
+        Build the uid sets of the commands targeting several messages
+
+        :param uids: The uids
+        :return: The uid sets, one per command
+        """
+        if len(uids) == 1:
+            return list(uids)
+        return [compress_uids(chunk) for chunk in self._chunk_uids(uids)]
+
     def _check_is_connected(self):
         """
         Assert that the account is connected
@@ -100,15 +403,18 @@ class Account(BaseModel):
         self._check_is_connected()
 
         if not self._mailboxes and force:
-            status, raw_response = self._imap.list()
+            status, raw_response = self._execute("list", idempotent=True)
 
             if status != "OK":
                 raise MailboxFetchingFailed("Unable to fetch mailboxes")
 
-            self._mailboxes = [
-                mailbox_factory(raw_mailbox_description, self)
-                for raw_mailbox_description in raw_response
-            ]
+            self._mailboxes = self._parse(
+                "mailbox_factory",
+                lambda: [
+                    mailbox_factory(raw_mailbox_description, self)
+                    for raw_mailbox_description in raw_response
+                ],
+            )
 
         return self._mailboxes
 
@@ -249,7 +555,56 @@ class Account(BaseModel):
         """
         Permanently delete messages that have the Deleted flag.
         """
-        self._imap.expunge()
+        if self._batch is not None:
+            self._batch.expunge()
+            return
+
+        self._execute("expunge")
+
+    def expunge_messages_using_uids(self, uids: List[str]):
+        """
+        Permanently delete the messages referenced by one of the uids if they have the
+        Deleted flag, other messages are expunged too if the server does not support
+        UIDPLUS (RFC 4315).
+
+        :param uids: The message's uids
+        :raises NotConnected: If the user is not connected
+        """
+        if not uids:
+            return
+
+        self._check_is_connected()
+
+        if self.has_capability("UIDPLUS"):
+            for uid_set in self._uid_sets(uids):
+                self._execute("uid", "EXPUNGE", uid_set, idempotent=True)
+        else:
+            self.expunge()
+
+    @contextmanager
+    def batch(self) -> Iterator[Batch]:
+        """
+        Record the copies, moves, flag updates and expunges of messages and send them
+        using the fewest commands possible at the end of the context, the flags of the
+        messages are updated right away. Nested batches join the outer one.
+
+        Messages fetched inside the batch don't reflect the pending operations. If an
+        exception is raised inside the context the pending operations are discarded,
+        the flags of the messages may then differ from the ones on the server.
+
+        :return: The batch
+        """
+        if self._batch is not None:
+            yield self._batch
+            return
+
+        batch = Batch(self)
+        self._batch = batch
+        try:
+            yield batch
+        finally:
+            self._batch = None
+        batch.flush()
 
     def select_mailbox(self, mailbox: Mailbox):
         """
@@ -261,7 +616,50 @@ class Account(BaseModel):
         self._check_is_connected()
 
         self.selected_mailbox = mailbox
-        self._imap.select(mailbox.path)
+        self._execute("select", mailbox.path, idempotent=True)
+        self._read_selection()
+
+    @contextmanager
+    def _selected(self, mailbox: Optional[Mailbox]) -> Iterator[None]:
+        """
+        Select a mailbox for the duration of the context, the mailbox selected before
+        is selected again afterwards so the commands of the caller keep their target
+
+        :param mailbox: The mailbox, None to keep the selected mailbox
+        """
+        previous = self.selected_mailbox
+        if mailbox is None or (previous is not None and previous.path == mailbox.path):
+            yield
+            return
+
+        self.select_mailbox(mailbox)
+        try:
+            yield
+        finally:
+            if previous is not None:
+                self.select_mailbox(previous)
+
+    def _read_selection(self):
+        """
+        Read the response codes sent by the server when a mailbox is selected
+        """
+        self._uidvalidity = self._response_code("UIDVALIDITY")
+        uidnext = self._response_code("UIDNEXT")
+        self._uidnext = int(uidnext) if uidnext else None
+        highestmodseq = self._response_code("HIGHESTMODSEQ")
+        self._highestmodseq = int(highestmodseq) if highestmodseq else None
+
+    def _response_code(self, name: str) -> Optional[str]:
+        """
+        Pop the value of a response code sent by the server, e.g. UIDVALIDITY
+
+        :param name: The name of the response code
+        :return: The value or None if the server did not send it
+        """
+        _, raw_response = self._imap.response(name)
+        if raw_response and raw_response[-1]:
+            return raw_response[-1].decode("ascii")
+        return None
 
     def select_mailbox_from_path(self, path: str):
         """
@@ -289,7 +687,7 @@ class Account(BaseModel):
 
         old_path = mailbox.path
 
-        self._imap.rename(old_path, path)
+        self._execute("rename", old_path, path)
 
         for mailbox in self.mailboxes():
             if mailbox.path.startswith(old_path):
@@ -326,7 +724,7 @@ class Account(BaseModel):
         )
 
         self._mailboxes.append(mailbox)
-        self._imap.create(path)
+        self._execute("create", path)
 
         return mailbox
 
@@ -356,7 +754,7 @@ class Account(BaseModel):
 
         try:
             self._mailboxes = self.mailboxes().remove(mailbox)
-            self._imap.delete(mailbox.path)
+            self._execute("delete", mailbox.path)
         except ValueError:
             raise MailboxNotFound(f"The mailbox {mailbox.path} is not found")
 
@@ -379,59 +777,686 @@ class Account(BaseModel):
         """
         self._check_is_connected()
 
-        status, raw_response = self._imap.uid("SEARCH", None, policy.to_imap_standard())
+        status, raw_response = self._execute(
+            "uid", "SEARCH", None, policy.to_imap_standard(), idempotent=True
+        )
 
         if status != "OK":
             raise MessageSearchingFailed("Unable to retrieve message uids")
 
-        raw_list = raw_response[0].decode("utf8").split(" ")
-
-        if raw_list == [""]:
-            return []
-
-        return [n for n in raw_list]
+        return parse_search_response(raw_response)
 
-    def fetch_messages(self, policy: Policy = all_policy) -> List[Message]:
+    def fetch_messages(
+        self, policy: Policy = all_policy, mode: FetchMode = FetchMode.FULL
+    ) -> Union[List[Message], List[MessageSummary]]:
         """
         Search all messages from the selected mailbox according to the policy
 
         :param policy: The policy to fetch message, defaults to all_
+        :param mode: The part of the messages to fetch, defaults to FetchMode.FULL
         :raises NotConnected: If the user is not connected
         :return: The list of messages
         """
         self._check_is_connected()
 
         message_uids = self.search_message_uids(policy)
+        return self.fetch_messages_using_uids(message_uids, mode)
+
+    def fetch_messages_using_uids(
+        self, uids: List[str], mode: FetchMode = FetchMode.FULL
+    ) -> Union[List[Message], List[MessageSummary]]:
+        """
+        Fetch the messages referenced by one of the uids from the selected mailbox,
+        using FetchMode.HEADERS, only the headers are fetched and the body and the
+        html of all the messages are loaded with a single command on first access,
+        using FetchMode.SUMMARY, only the headers are fetched and compact
+        `ggmail.message.MessageSummary` are returned, messages already stored in the
+        cache are rebuilt locally and only their flags are fetched
 
-        if not message_uids:
+        :param uids: The message's uids
+        :param mode: The part of the messages to fetch, defaults to FetchMode.FULL
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :return: The list of messages
+        """
+        if not uids:
             return []
 
-        status, raw_response = self._imap.uid(
-            "FETCH", ",".join(message_uids), "(BODY.PEEK[] FLAGS)"
+        self._check_is_connected()
+
+        if mode in (FetchMode.HEADERS, FetchMode.SUMMARY):
+            fields = " ".join(HEADER_FIELDS)
+            message_parts = f"(BODY.PEEK[HEADER.FIELDS ({fields})] FLAGS)"
+        else:
+            message_parts = "(BODY.PEEK[] FLAGS)"
+
+        raw_messages = {}
+        full_message_factory = self._message_factory()
+
+        def caching_message_factory(uid: str, raw_message_description, account):
+            raw_messages[uid] = raw_message_description[1]
+            return full_message_factory(uid, raw_message_description, account)
+
+        parser_name = "message_factory"
+        if mode is FetchMode.HEADERS:
+            parser_name = "header_message_factory"
+            factory = header_message_factory
+        elif mode is FetchMode.SUMMARY:
+            parser_name = "summary_factory"
+            factory = summary_factory
+        elif self._is_cache_usable():
+            factory = caching_message_factory
+        else:
+            factory = full_message_factory
+
+        cached_messages, cached_uids = [], set()
+        if mode is not FetchMode.SUMMARY:
+            cached_messages, cached_uids = self._cached_messages(uids)
+        missing_uids = [uid for uid in uids if uid not in cached_uids]
+        messages = []
+
+        for chunk in self._chunk_uids(missing_uids):
+            status, raw_response = self._execute(
+                "uid", "FETCH", compress_uids(chunk), message_parts, idempotent=True
+            )
+
+            if status != "OK":
+                raise MessageFetchingFailed("Unable to fetch messages")
+
+            messages += self._parse(
+                parser_name,
+                lambda: parse_fetch_response(chunk, raw_response, self, factory),
+            )
+
+            if raw_messages:
+                self._store_in_cache(raw_messages)
+                raw_messages.clear()
+
+        if mode is FetchMode.HEADERS:
+            loader = ContentLoader(self, self.selected_mailbox)
+            for message in messages:
+                loader.attach(message)
+
+        if cached_messages:
+            messages = sorted(
+                messages + cached_messages, key=lambda message: int(message.uid)
+            )
+
+        if mode is not FetchMode.SUMMARY:
+            # Their attachments are listed and downloaded from this mailbox
+            for message in messages:
+                message._mailbox = self.selected_mailbox
+
+        return messages
+
+    def _message_factory(self) -> Callable[[str, Any, Any], Message]:
+        """
+        The function creating a fully fetched message, it keeps a view of the raw
+        message if the account keeps raw messages
+        """
+        if self.keep_raw:
+            return partial(message_factory, keep_raw=True)
+        return message_factory
+
+    def _is_cache_usable(self) -> bool:
+        if self.cache is None or self.selected_mailbox is None:
+            return False
+        return self._uidvalidity is not None
+
+    def _store_in_cache(self, raw_messages: Dict[str, bytes]):
+        """
+        Store raw messages of the selected mailbox in the cache
+
+        :param raw_messages: The raw messages indexed by uid
+        """
+        self.cache.store_messages(
+            self.selected_mailbox.path, self._uidvalidity, raw_messages
         )
 
-        if status != "OK":
-            raise MessageFetchingFailed("Unable to fetch messages")
+    def _cached_messages(self, uids: List[str]) -> Tuple[List[Message], Set[str]]:
+        """
+        Rebuild the messages of the selected mailbox stored in the cache, their flags
+        are refreshed using a FETCH of the FLAGS only, messages missing from the
+        server are ignored
 
-        if raw_response == [None]:
-            return []
+        :param uids: The message's uids
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :return: The list of cached messages and the uids found in the cache
+        """
+        if not self._is_cache_usable():
+            return [], set()
+
+        raw_messages = self.cache.messages(
+            self.selected_mailbox.path, self._uidvalidity, uids
+        )
+        factory = self._message_factory()
+        messages = []
+
+        for chunk in self._chunk_uids(list(raw_messages)):
+            status, raw_response = self._execute(
+                "uid", "FETCH", compress_uids(chunk), "(FLAGS)", idempotent=True
+            )
+
+            if status != "OK":
+                raise MessageFetchingFailed("Unable to fetch message flags")
+
+            for uid, response in parse_fetch(raw_response).items():
+                if uid in raw_messages:
+                    raw_message_description = response.text, raw_messages[uid]
+                    messages.append(factory(uid, raw_message_description, self))
+
+        return messages, set(raw_messages)
+
+    def load_message_contents(
+        self, messages: List[Message], mailbox: Optional[Mailbox] = None
+    ):
+        """
+        Fetch the body and the html of messages using a single command
 
-        raw_messages = [
-            raw_message_description
-            for (index, raw_message_description) in enumerate(raw_response)
-            if index % 2 == 0
-        ]
+        :param messages: The messages to complete
+        :param mailbox: The mailbox containing the messages, defaults to the selected
+                        mailbox, the selected mailbox is selected again afterwards
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        """
+        if not messages:
+            return
+
+        with self._selected(mailbox):
+            uids = [message.uid for message in messages]
+            full_messages = {
+                full_message.uid: full_message
+                for full_message in self.fetch_messages_using_uids(uids)
+            }
+
+        for message in messages:
+            full_message = full_messages.get(message.uid)
+            for field in CONTENT_FIELDS:
+                value = getattr(full_message, field) if full_message else None
+                setattr(message, field, value)
+            if full_message is not None:
+                message._raw_view = full_message.raw
+
+    def iter_messages(
+        self,
+        policy: Policy = all_policy,
+        batch_size: int = 100,
+        mode: FetchMode = FetchMode.FULL,
+    ) -> Iterator[Union[Message, MessageSummary]]:
+        """
+        Iterate over the messages from the selected mailbox according to the policy,
+        messages are fetched by batch so only one batch is held in memory at a time
+
+        :param policy: The policy to fetch message, defaults to all_
+        :param batch_size: The number of messages fetched per command, defaults to 100
+        :param mode: The part of the messages to fetch, defaults to FetchMode.FULL
+        :raises NotConnected: If the user is not connected
+        :return: The iterator of messages, of message summaries using
+                 FetchMode.SUMMARY
+        """
+        self._check_is_connected()
+
+        message_uids = self.search_message_uids(policy)
 
-        return [
-            message_factory(uid, raw_message_description, self)
-            for (uid, raw_message_description) in zip(message_uids, raw_messages)
-        ]
+        for start in range(0, len(message_uids), batch_size):
+            end = start + batch_size
+            batch_uids = message_uids[start:end]
+            yield from self.fetch_messages_using_uids(batch_uids, mode)
 
-    def search_messages(self, policy: Policy = all_policy) -> List[Message]:
+    def search_messages(
+        self, policy: Policy = all_policy, mode: FetchMode = FetchMode.FULL
+    ) -> Union[List[Message], List[MessageSummary]]:
         """
         Alias of `ggmail.account.Account.fetch_messages`
         """
-        return self.fetch_messages(policy)
+        return self.fetch_messages(policy, mode)
+
+    def _enable_sync_extension(self) -> Optional[str]:
+        """
+        Enable QRESYNC or else CONDSTORE, the extension is enabled once per session
+
+        :return: The enabled extension or None if the server supports neither
+        """
+        if self._sync_extension is None:
+            self._sync_extension = ""
+
+            for extension in ("QRESYNC", "CONDSTORE"):
+                if self.has_capability(extension):
+                    status, _ = self._execute(
+                        "xatom", "ENABLE", extension, idempotent=True
+                    )
+                    if status == "OK":
+                        self._sync_extension = extension
+                        break
+
+        return self._sync_extension or None
+
+    def fetch_flags_using_uids(self, uids: List[str]) -> Dict[str, FlagSet]:
+        """
+        Fetch only the flags of the messages referenced by one of the uids from the
+        selected mailbox
+
+        :param uids: The message's uids
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :return: The flags indexed by uid, messages missing from the server are absent
+        """
+        self._check_is_connected()
+
+        flags: Dict[str, FlagSet] = {}
+
+        for chunk in self._chunk_uids(uids):
+            status, raw_response = self._execute(
+                "uid", "FETCH", compress_uids(chunk), "(FLAGS)", idempotent=True
+            )
+
+            if status != "OK":
+                raise MessageFetchingFailed("Unable to fetch message flags")
+
+            flags.update(parse_flags_response(raw_response))
+
+        return flags
+
+    def fetch_attachments_using_uids(
+        self, uids: List[str], mailbox: Optional[Mailbox] = None
+    ) -> Dict[str, List[Attachment]]:
+        """
+        List the attachments of the messages referenced by one of the uids from a
+        mailbox using their BODYSTRUCTURE, nothing is downloaded. The mailbox is
+        selected for the duration of the command, then the previous one again.
+
+        :param uids: The message's uids
+        :param mailbox: The mailbox of the messages, defaults to the selected mailbox
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :return: The attachments indexed by uid, messages missing from the server are
+                 absent
+        """
+        self._check_is_connected()
+
+        attachments: Dict[str, List[Attachment]] = {}
+
+        with self._selected(mailbox):
+            for chunk in self._chunk_uids(uids):
+                status, raw_response = self._execute(
+                    "uid",
+                    "FETCH",
+                    compress_uids(chunk),
+                    "(BODYSTRUCTURE)",
+                    idempotent=True,
+                )
+
+                if status != "OK":
+                    raise MessageFetchingFailed("Unable to fetch message structures")
+
+                attachments.update(
+                    parse_attachments_response(
+                        raw_response, self, self.selected_mailbox
+                    )
+                )
+
+        return attachments
+
+    def _fetch_part(
+        self,
+        uid: str,
+        part: str,
+        origin: Optional[int] = None,
+        length: int = 0,
+        mailbox: Optional[Mailbox] = None,
+    ) -> Any:
+        """
+        Fetch a part of a message from a mailbox without setting \\Seen, the mailbox
+        is selected for the duration of the command, then the previous one again
+
+        :param uid: The message's uid
+        :param part: The part number, e.g. "2" or "2.1"
+        :param origin: The first byte to fetch, defaults to None for the whole part
+        :param length: The number of bytes to fetch from the origin
+        :param mailbox: The mailbox of the message, defaults to the selected mailbox
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :raises MessageNotFound: If the message is not in the selected mailbox
+        :return: The part as transferred, empty if the message has no such part
+        """
+        self._check_is_connected()
+
+        section = f"BODY.PEEK[{part}]"
+        if origin is not None:
+            section += f"<{origin}.{length}>"
+
+        with self._selected(mailbox):
+            status, raw_response = self._execute(
+                "uid", "FETCH", uid, f"({section})", idempotent=True
+            )
+
+        if status != "OK":
+            raise MessageFetchingFailed(f"Unable to fetch the part {part} of {uid}")
+
+        response = parse_fetch(raw_response).get(uid)
+        if response is None:
+            raise MessageNotFound(f"No message with the uid {uid}")
+
+        return response.body if response.body is not None else b""
+
+    def download_part(
+        self,
+        uid: str,
+        part: str,
+        encoding: Optional[str] = None,
+        mailbox: Optional[Mailbox] = None,
+    ) -> bytes:
+        """
+        Download a part of a message from a mailbox using a single command
+
+        :param uid: The message's uid
+        :param part: The part number, e.g. "2" or "2.1"
+        :param encoding: The Content-Transfer-Encoding of the part, defaults to None
+                         to return the part as transferred
+        :param mailbox: The mailbox of the message, defaults to the selected mailbox
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :raises MessageNotFound: If the message is not in the mailbox
+        :return: The decoded part
+        """
+        raw_part = self._fetch_part(uid, part, mailbox=mailbox)
+        return TransferDecoder(encoding).decode(raw_part, final=True)
+
+    def stream_part(
+        self,
+        uid: str,
+        part: str,
+        encoding: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        mailbox: Optional[Mailbox] = None,
+    ) -> Iterator[bytes]:
+        """
+        Download a part of a message from a mailbox chunk by chunk using partial
+        fetches, only one chunk of the part is held in memory. The mailbox is
+        selected for each chunk so the commands run between two chunks keep the
+        selected mailbox.
+
+        :param uid: The message's uid
+        :param part: The part number, e.g. "2" or "2.1"
+        :param encoding: The Content-Transfer-Encoding of the part, defaults to None
+                         to return the part as transferred
+        :param chunk_size: The number of bytes fetched per command
+        :param mailbox: The mailbox of the message, defaults to the selected mailbox
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :raises MessageNotFound: If the message is not in the mailbox
+        :return: The iterator of decoded chunks
+        """
+        decoder = TransferDecoder(encoding)
+        origin = 0
+
+        while True:
+            chunk = self._fetch_part(uid, part, origin, chunk_size, mailbox)
+            origin += len(chunk)
+            final = len(chunk) < chunk_size
+            data = decoder.decode(chunk, final)
+            if data:
+                yield data
+            if final:
+                return
+
+    def changes_since(
+        self, state: Optional[SyncState] = None, mailbox: Optional[Mailbox] = None
+    ) -> MailboxChanges:
+        """
+        Get the changes of a mailbox since a previous synchronization, the mailbox
+        become the selected mailbox. Using QRESYNC only the changed messages and the
+        expunged uids are requested, using CONDSTORE the uids of the mailbox are
+        searched too to detect expunged messages, without these extensions the flags
+        of every known message are fetched and reported as changed.
+
+        :param state: The state of the previous synchronization, defaults to None to
+                      get every message of the mailbox
+        :param mailbox: The mailbox, defaults to the selected mailbox
+        :raises NotConnected: If the user is not connected
+        :raises MailboxNotFound: If no mailbox is given or selected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :return: The changes, including the state to give to the next call
+        """
+        self._check_is_connected()
+
+        if mailbox is None:
+            mailbox = self.selected_mailbox
+
+        if mailbox is None:
+            raise MailboxNotFound("There is no selected mailbox")
+
+        extension = self._enable_sync_extension()
+        self.select_mailbox(mailbox)
+
+        if not self._is_same_mailbox_state(state):
+            uids = self.search_message_uids()
+            messages = self.fetch_messages_using_uids(uids)
+            return self._mailbox_changes(uids, messages, {}, [], is_full=True)
+
+        known_uids = expand_uids(state.uids)
+
+        if extension is None or None in (state.highestmodseq, self._highestmodseq):
+            return self._changes_using_uids(known_uids)
+
+        return self._changes_using_modseq(
+            state.highestmodseq, known_uids, extension == "QRESYNC"
+        )
+
+    def _is_same_mailbox_state(self, state: Optional[SyncState]) -> bool:
+        if state is None or self._uidvalidity is None:
+            return False
+        if state.mailbox != self.selected_mailbox.path:
+            return False
+        return state.uidvalidity == self._uidvalidity
+
+    def _changes_using_uids(self, known_uids: List[str]) -> MailboxChanges:
+        """
+        Compute the changes of the selected mailbox comparing its uids with the
+        known uids
+        """
+        uids = self.search_message_uids()
+        known = set(known_uids)
+        current = set(uids)
+
+        new_uids = [uid for uid in uids if uid not in known]
+        expunged_uids = [uid for uid in known_uids if uid not in current]
+        flag_changes = self.fetch_flags_using_uids(
+            [uid for uid in uids if uid in known]
+        )
+
+        messages = self.fetch_messages_using_uids(new_uids)
+        return self._mailbox_changes(uids, messages, flag_changes, expunged_uids)
+
+    def _changes_using_modseq(
+        self, highestmodseq: int, known_uids: List[str], with_vanished: bool
+    ) -> MailboxChanges:
+        """
+        Compute the changes of the selected mailbox using CHANGEDSINCE and, if
+        QRESYNC is enabled, VANISHED
+        """
+        changed_flags: Dict[str, FlagSet] = {}
+        expunged_uids: List[str] = []
+        known = set(known_uids)
+
+        if self._highestmodseq != highestmodseq:
+            modifiers = f"CHANGEDSINCE {highestmodseq}"
+            if with_vanished:
+                modifiers += " VANISHED"
+
+            self._imap.response("VANISHED")
+            status, raw_response = self._execute(
+                "uid", "FETCH", "1:*", "(UID FLAGS)", f"({modifiers})", idempotent=True
+            )
+
+            if status != "OK":
+                raise MessageFetchingFailed("Unable to fetch message changes")
+
+            changed_flags = parse_flags_response(raw_response)
+
+            if with_vanished:
+                _, raw_vanished = self._imap.response("VANISHED")
+                vanished = set(parse_vanished_response(raw_vanished))
+                expunged_uids = [uid for uid in known_uids if uid in vanished]
+
+        if with_vanished:
+            vanished = set(expunged_uids)
+            uids = [uid for uid in known_uids if uid not in vanished]
+            uids += [uid for uid in changed_flags if uid not in known]
+        else:
+            uids = self.search_message_uids()
+            current = set(uids)
+            expunged_uids = [uid for uid in known_uids if uid not in current]
+
+        expunged = set(expunged_uids)
+        new_uids = [uid for uid in changed_flags if uid not in known]
+        flag_changes = {
+            uid: flags
+            for uid, flags in changed_flags.items()
+            if uid in known and uid not in expunged
+        }
+
+        messages = self.fetch_messages_using_uids(new_uids)
+        return self._mailbox_changes(uids, messages, flag_changes, expunged_uids)
+
+    def _mailbox_changes(
+        self,
+        uids: List[str],
+        messages: List[Message],
+        flag_changes: Dict[str, FlagSet],
+        expunged_uids: List[str],
+        is_full: bool = False,
+    ) -> MailboxChanges:
+        """
+        Build the changes of the selected mailbox and its new state
+        """
+        state = SyncState(
+            mailbox=self.selected_mailbox.path,
+            uidvalidity=self._uidvalidity,
+            uidnext=self._uidnext,
+            highestmodseq=self._highestmodseq,
+            uids=compress_uids(uids),
+        )
+
+        return MailboxChanges(
+            state=state,
+            new_messages=messages,
+            flag_changes=flag_changes,
+            expunged_uids=expunged_uids,
+            is_full=is_full,
+        )
+
+    def idle(
+        self, timeout: Optional[float] = None, renewal: float = IDLE_RENEWAL
+    ) -> Iterator[IdleEvent]:
+        """
+        Wait for changes of the selected mailbox using IDLE, the events are yielded
+        as soon as the server sends them. IDLE is re-issued every renewal seconds so
+        the server never drops the connection. The account must not be used until
+        the iteration stops, leaving the loop ends IDLE. Once QRESYNC is enabled the
+        expunged messages are reported by VANISHED events holding their uids.
+
+        :param timeout: The number of seconds after which the iteration stops,
+                        defaults to None to never stop
+        :param renewal: The number of seconds between two IDLE commands, defaults
+                        to 25 minutes
+        :raises NotConnected: If the user is not connected
+        :raises MailboxNotFound: If there is no selected mailbox
+        :return: The iterator of events
+        """
+        self._check_is_connected()
+
+        if self.selected_mailbox is None:
+            raise MailboxNotFound("There is no selected mailbox")
+
+        idler = Idler(self._imap)
+        deadline = None if timeout is None else monotonic() + timeout
+
+        try:
+            while deadline is None or monotonic() < deadline:
+                idler.start()
+                renewal_deadline = monotonic() + renewal
+                if deadline is not None:
+                    renewal_deadline = min(renewal_deadline, deadline)
+
+                while idler.is_idling:
+                    event = idler.wait(renewal_deadline - monotonic())
+                    if event is None:
+                        break
+                    yield self._parse_idle_event(event)
+
+                for event in idler.done():
+                    yield self._parse_idle_event(event)
+        finally:
+            if idler.is_idling:
+                idler.done()
+
+    @staticmethod
+    def _parse_idle_event(event: IdleEvent) -> IdleEvent:
+        """
+        Read the expunged uids of a VANISHED event, other events are left unchanged
+        """
+        if event.kind is IdleEventKind.VANISHED:
+            event.uids = parse_vanished_response([event.data])
+            event.number = len(event.uids)
+        return event
+
+    def watch_messages(
+        self,
+        policy: Policy = all_policy,
+        timeout: Optional[float] = None,
+        mode: FetchMode = FetchMode.FULL,
+        renewal: float = IDLE_RENEWAL,
+    ) -> Iterator[Union[Message, MessageSummary]]:
+        """
+        Yield the messages arriving in the selected mailbox since its selection
+        according to the policy, IDLE is used between two arrivals so the account can
+        be used while handling a message
+
+        :param policy: The policy the new messages must match, defaults to all_
+        :param timeout: The number of seconds after which the iteration stops,
+                        defaults to None to never stop
+        :param mode: The part of the messages to fetch, defaults to FetchMode.FULL
+        :param renewal: The number of seconds between two IDLE commands, defaults
+                        to 25 minutes
+        :raises NotConnected: If the user is not connected
+        :raises MailboxNotFound: If there is no selected mailbox
+        :return: The iterator of messages, of message summaries using
+                 FetchMode.SUMMARY
+        """
+        self._check_is_connected()
+
+        if self.selected_mailbox is None:
+            raise MailboxNotFound("There is no selected mailbox")
+
+        uidnext = self._uidnext
+        if uidnext is None:
+            uids = self.search_message_uids()
+            uidnext = max((int(uid) for uid in uids), default=0) + 1
+
+        deadline = None if timeout is None else monotonic() + timeout
+
+        while True:
+            remaining = None if deadline is None else deadline - monotonic()
+            if remaining is not None and remaining <= 0:
+                return
+
+            with closing(self.idle(remaining, renewal)) as events:
+                kinds = (event.kind for event in events)
+                if IdleEventKind.EXISTS not in kinds:
+                    return
+
+            new_uids = [
+                uid
+                for uid in self.search_message_uids(uid_policy(f"{uidnext}:*") + policy)
+                if int(uid) >= uidnext
+            ]
+
+            if not new_uids:
+                continue
+
+            uidnext = max(int(uid) for uid in new_uids) + 1
+            yield from self.fetch_messages_using_uids(new_uids, mode)
 
     def copy_message(self, message: Message, mailbox: Mailbox):
         """
@@ -460,8 +1485,7 @@ class Account(BaseModel):
         :param mailbox: The mailbox containing the new copy
         :raises NotConnected: If the user is not connected
         """
-        self._check_is_connected()
-        self._imap.uid("COPY", uid, mailbox.path)
+        self.copy_messages_using_uids([uid], mailbox)
 
     def copy_messages_using_uids(self, uids: List[str], mailbox: Mailbox):
         """
@@ -475,7 +1499,13 @@ class Account(BaseModel):
             return
 
         self._check_is_connected()
-        self._imap.uid("COPY", ",".join(uids), mailbox.path)
+
+        if self._batch is not None:
+            self._batch.copy(uids, mailbox)
+            return
+
+        for uid_set in self._uid_sets(uids):
+            self._execute("uid", "COPY", uid_set, mailbox.path)
 
     def move_message(
         self, message: Message, mailbox: Mailbox, with_expunge: bool = False
@@ -491,7 +1521,7 @@ class Account(BaseModel):
         :raises NotConnected: If the user is not connected
         """
         self.move_message_using_uid(message.uid, mailbox, with_expunge)
-        message.flags.append(Flag.DELETED)
+        message.flags.add(Flag.DELETED)
 
     def move_messages(
         self, messages: List[Message], mailbox: Mailbox, with_expunge: bool = False
@@ -509,14 +1539,15 @@ class Account(BaseModel):
         uids = [message.uid for message in messages]
         self.move_messages_using_uids(uids, mailbox, with_expunge)
         for message in messages:
-            message.flags.append(Flag.DELETED)
+            message.flags.add(Flag.DELETED)
 
     def move_message_using_uid(
         self, uid: str, mailbox: Mailbox, with_expunge: bool = False
     ):
         """
         Move a message to another mailbox using its uid, if you don't set with_expunge
-        to True, you will still see the mail in the source mailbox.
+        to True, you will still see the mail in the source mailbox unless the server
+        supports the MOVE extension.
 
         :param uid: The message's uid
         :param mailbox: The mailbox containing the new copy
@@ -524,17 +1555,19 @@ class Account(BaseModel):
                              False else
         :raises NotConnected: If the user is not connected
         """
-        self.copy_message_using_uid(uid, mailbox)
-        self.add_flag_message_using_uid(uid, Flag.DELETED)
-        if with_expunge:
-            self.expunge()
+        self.move_messages_using_uids([uid], mailbox, with_expunge)
 
     def move_messages_using_uids(
         self, uids: List[str], mailbox: Mailbox, with_expunge: bool = False
     ):
         """
         Move messages to another mailbox using their uids, if you don't set
-        with_expunge to True, you will still see the mail in the source mailbox.
+        with_expunge to True, you will still see the mail in the source mailbox unless
+        the server supports the MOVE extension.
+
+        Using MOVE (RFC 6851), the messages are moved in a single command. Else they
+        are copied then flagged as deleted, with_expunge only expunges the moved
+        messages if the server supports UIDPLUS (RFC 4315).
 
         :param uids: The message's uids
         :param mailbox: The mailbox containing the new copy
@@ -542,10 +1575,25 @@ class Account(BaseModel):
                              False else
         :raises NotConnected: If the user is not connected
         """
+        if not uids:
+            return
+
+        self._check_is_connected()
+
+        if self._batch is not None:
+            self._batch.move(uids, mailbox, with_expunge)
+            return
+
+        if self.has_capability("MOVE"):
+            for uid_set in self._uid_sets(uids):
+                self._execute("uid", "MOVE", uid_set, mailbox.path)
+            return
+
         self.copy_messages_using_uids(uids, mailbox)
         self.add_flag_messages_using_uids(uids, Flag.DELETED)
+
         if with_expunge:
-            self.expunge()
+            self.expunge_messages_using_uids(uids)
 
     def add_flag_message(self, message: Message, flag: Flag, using_uid: bool = True):
         """
@@ -553,19 +1601,10 @@ class Account(BaseModel):
 
         :param message: The message to update
         :param flag: The flag to add
-
         :raises NotConnected: If the user is not connected
+        :raises FlagAlreadyAttached: If the flag is already attached
         """
-        if flag in message.flags:
-            raise FlagAlreadyAttached(
-                f"The flag {flag} is already attached to the message with the uid "
-                f"{message.uid}"
-            )
-
-        self.add_flag_message_using_uid(message.uid, flag)
-        self._imap.uid("STORE", message.uid, "+FLAGS", flag.value)
-
-        message.flags.append(flag)
+        self.add_flags_messages([message], [flag])
 
     def add_flag_messages(self, messages: List[Message], flag: Flag):
         """
@@ -574,19 +1613,34 @@ class Account(BaseModel):
         :param messages: The messages to update
         :param flag: The flag to add
         :raises NotConnected: If the user is not connected
+        :raises FlagAlreadyAttached: If the flag is already attached
+        """
+        self.add_flags_messages(messages, [flag])
+
+    def add_flags_messages(self, messages: List[Message], flags: List[Flag]):
+        """
+        Add several flags to all messages using a single command
+
+        :param messages: The messages to update
+        :param flags: The flags to add
+        :raises NotConnected: If the user is not connected
+        :raises FlagAlreadyAttached: If one of the flags is already attached
         """
+        flags = unique_flags(flags)
+
         for message in messages:
-            if flag in message.flags:
-                raise FlagAlreadyAttached(
-                    f"The flag {flag} is already attached to the message with the uid "
-                    f"{message.uid}"
-                )
+            for flag in flags:
+                if flag in message.flags:
+                    raise FlagAlreadyAttached(
+                        f"The flag {flag} is already attached to the message with "
+                        f"the uid {message.uid}"
+                    )
 
         uids = [message.uid for message in messages]
-        self.add_flag_messages_using_uids(uids, flag)
+        self.add_flags_messages_using_uids(uids, flags)
 
         for message in messages:
-            message.flags.append(flag)
+            message.flags.update(flags)
 
     def add_flag_message_using_uid(self, uid: str, flag: Flag):
         """
@@ -596,8 +1650,7 @@ class Account(BaseModel):
         :param flag: The flag to add
         :raises NotConnected: If the user is not connected
         """
-        self._check_is_connected()
-        self._imap.uid("STORE", uid, "+FLAGS", flag.value)
+        self.add_flags_messages_using_uids([uid], [flag])
 
     def add_flag_messages_using_uids(self, uids: List[str], flag: Flag):
         """
@@ -607,11 +1660,18 @@ class Account(BaseModel):
         :param flag: The flag to add
         :raises NotConnected: If the user is not connected
         """
-        if not uids:
-            return
+        self.add_flags_messages_using_uids(uids, [flag])
 
-        self._check_is_connected()
-        self._imap.uid("STORE", ",".join(uids), "+FLAGS", flag.value)
+    def add_flags_messages_using_uids(self, uids: List[str], flags: List[Flag]):
+        """
+        Add several flags to all messages referenced by one of the uids using a single
+        command, the server does not send back the updated flags
+
+        :param uids: The message's uids
+        :param flags: The flags to add
+        :raises NotConnected: If the user is not connected
+        """
+        self._store_flags(uids, "+", flags)
 
     def remove_flag_message(self, message: Message, flag: Flag):
         """
@@ -620,64 +1680,181 @@ class Account(BaseModel):
         :param message: The message to update
         :param flag: The flag to remove
         :raises NotConnected: If the user is not connected
-        :raises FlagAlreadyAttached: If the flag is not attached
+        :raises FlagNotAttached: If the flag is not attached
         """
-        self._check_is_connected()
-
-        if flag not in message.flags:
-            raise FlagNotAttached(
-                f"The flag {flag} not attached to the message with the uid "
-                f"{message.uid}"
-            )
-
-        self.remove_flag_message_using_uid(message.uid, flag)
-
-        message.flags.remove(flag)
+        self.remove_flags_messages([message], [flag])
 
     def remove_flag_messages(self, messages: List[Message], flag: Flag):
         """
         Remove a flag to all messages
 
-        :param messages: The messages to remove
-        :param flag: The flag to add
+        :param messages: The messages to update
+        :param flag: The flag to remove
+        :raises NotConnected: If the user is not connected
+        :raises FlagNotAttached: If the flag is not attached
+        """
+        self.remove_flags_messages(messages, [flag])
+
+    def remove_flags_messages(self, messages: List[Message], flags: List[Flag]):
+        """
+        Remove several flags to all messages using a single command
+
+        :param messages: The messages to update
+        :param flags: The flags to remove
         :raises NotConnected: If the user is not connected
+        :raises FlagNotAttached: If one of the flags is not attached
         """
         self._check_is_connected()
 
+        flags = unique_flags(flags)
+
         for message in messages:
-            if flag not in message.flags:
-                raise FlagNotAttached(
-                    f"The flag {flag} is already attached to the message with the uid "
-                    f"{message.uid}"
-                )
+            for flag in flags:
+                if flag not in message.flags:
+                    raise FlagNotAttached(
+                        f"The flag {flag} not attached to the message with the uid "
+                        f"{message.uid}"
+                    )
 
         uids = [message.uid for message in messages]
-        self.remove_flag_messages_using_uids(uids, flag)
+        self.remove_flags_messages_using_uids(uids, flags)
 
         for message in messages:
-            message.flags.remove(flag)
+            message.flags.difference_update(flags)
 
     def remove_flag_message_using_uid(self, uid: str, flag: Flag):
         """
         Remove a flag to the message using its uid
 
         :param uid: The message's uid
-        :param flag: The flag to add
+        :param flag: The flag to remove
         :raises NotConnected: If the user is not connected
         """
-        self._check_is_connected()
-        self._imap.uid("STORE", uid, "-FLAGS", flag.value)
+        self.remove_flags_messages_using_uids([uid], [flag])
 
     def remove_flag_messages_using_uids(self, uids: List[str], flag: Flag):
         """
         Remove a flag to all messages referenced by one of the uids
 
         :param uids: The message's uids
-        :param flag: The flag to add
+        :param flag: The flag to remove
         :raises NotConnected: If the user is not connected
         """
-        if not uids:
+        self.remove_flags_messages_using_uids(uids, [flag])
+
+    def remove_flags_messages_using_uids(self, uids: List[str], flags: List[Flag]):
+        """
+        Remove several flags to all messages referenced by one of the uids using a
+        single command, the server does not send back the updated flags
+
+        :param uids: The message's uids
+        :param flags: The flags to remove
+        :raises NotConnected: If the user is not connected
+        """
+        self._store_flags(uids, "-", flags)
+
+    def _store_flags(self, uids: List[str], sign: str, flags: List[Flag]):
+        """
+        Send the STORE command updating the flags of messages
+
+        :param uids: The message's uids
+        :param sign: + to add the flags, - to remove them
+        :param flags: The flags
+        :raises NotConnected: If the user is not connected
+        """
+        if not uids or not flags:
             return
 
         self._check_is_connected()
-        self._imap.uid("STORE", ",".join(uids), "-FLAGS", flag.value)
+
+        if self._batch is not None:
+            self._batch.store_flags(uids, sign, flags)
+            return
+
+        for uid_set in self._uid_sets(uids):
+            self._execute(
+                "uid",
+                "STORE",
+                uid_set,
+                f"{sign}FLAGS.SILENT",
+                format_flags(flags),
+                idempotent=True,
+            )
+
+
+def parse_search_response(raw_response: List[bytes]) -> List[str]:
+    """
+    Extract the uids from the raw response of a SEARCH command
+
+    :param raw_response: The raw response
+    :return: The list of uids
+    """
+    raw_list = raw_response[0].decode("utf8").split(" ")
+
+    if raw_list == [""]:
+        return []
+
+    return [n for n in raw_list]
+
+
+def parse_flags_response(raw_response: List[Any]) -> Dict[str, FlagSet]:
+    """
+    Extract the flags from the raw response of a FETCH command
+
+    :param raw_response: The raw response
+    :return: The flags indexed by uid
+    """
+    return {
+        uid: response.flags
+        for uid, response in parse_fetch(raw_response).items()
+        if response.flags is not None
+    }
+
+
+def parse_vanished_response(raw_response: List[Any]) -> List[str]:
+    """
+    Extract the expunged uids from the raw VANISHED responses
+
+    :param raw_response: The raw responses such as [b"(EARLIER) 41,43:45"]
+    :return: The list of expunged uids
+    """
+    uids = []
+
+    for raw_vanished in raw_response:
+        if not raw_vanished:
+            continue
+        uid_set = raw_vanished.decode("ascii").replace("(EARLIER)", "").strip()
+        uids += expand_uids(uid_set)
+
+    return uids
+
+
+def parse_fetch_response(
+    message_uids: List[str],
+    raw_response: List[Any],
+    account,
+    factory: Optional[Callable[[str, Any, Any], Message]] = None,
+) -> List[Message]:
+    """
+    Create the messages from the raw response of a FETCH command, the data of each
+    message is found using the uid reported by the server so the order of the
+    responses does not matter, uids missing from the response are ignored
+
+    :param message_uids: The uids of the fetched messages
+    :param raw_response: The raw response
+    :param account: The account
+    :param factory: The function creating a message, defaults to message_factory
+    :return: The list of messages
+    """
+    if factory is None:
+        factory = message_factory
+
+    responses = parse_fetch(raw_response)
+    messages = []
+
+    for uid in message_uids:
+        response = responses.get(uid)
+        if response is not None and response.body is not None:
+            messages.append(factory(uid, (response.text, response.body), account))
+
+    return messages
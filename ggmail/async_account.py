@@ -0,0 +1,738 @@
+from functools import partial
+from typing import Any, AsyncIterator, List, Optional
+
+from pydantic import BaseModel, PrivateAttr
+
+from .account import parse_fetch_response, parse_search_response
+from .async_imap import AsyncIMAP4
+from .async_mailbox import AsyncMailbox
+from .authentication import Authentication
+from .exception import (
+    AlreadyConnected,
+    FlagAlreadyAttached,
+    FlagNotAttached,
+    MailboxAlreadyExists,
+    MailboxFetchingFailed,
+    MailboxNotDeletable,
+    MailboxNotFound,
+    MessageFetchingFailed,
+    MessageSearchingFailed,
+    NotConnected,
+)
+from .flag import Flag, format_flags, unique_flags
+from .mailbox import MailboxKind, mailbox_factory
+from .message import Message, message_factory
+from .policy import Policy
+from .policy import all_ as all_policy
+from .uid import DEFAULT_MAX_UID_SET_SIZE, chunk_uids, compress_uids
+
+
+class AsyncAccount(BaseModel):
+    """
+    Non-blocking version of `ggmail.account.Account`, every operation involving the
+    server is awaitable so a single event loop can manage many accounts.
+    """
+
+    authentication: Authentication
+
+    _imap: AsyncIMAP4 = PrivateAttr()
+    _mailboxes: List[AsyncMailbox] = PrivateAttr([])
+
+    selected_mailbox: Optional[AsyncMailbox] = None
+
+    is_connected: bool = False
+
+    max_uid_set_size: int = DEFAULT_MAX_UID_SET_SIZE
+
+    keep_raw: bool = False
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self._imap = AsyncIMAP4(
+            self.authentication.host,
+            self.authentication.port,
+            secure=self.authentication.secure,
+        )
+
+    async def __aenter__(self):
+        await self.login()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.logout()
+
+    async def login(self):
+        """
+        Open the connection and login to the account
+
+        :raises AlreadyConnected: If the user is already connected
+        :raises LoginFailed: If there is a problem with imap
+        """
+        if self.is_connected:
+            raise AlreadyConnected("You are already connected")
+
+        await self._imap.open()
+
+        try:
+            await self.authentication.async_login(self._imap)
+            await self._imap.capability()
+        except Exception:
+            await self._imap.close()
+            raise
+
+        self.is_connected = True
+
+    async def logout(self):
+        """
+        Logout from the account and close the connection
+
+        :raises NotConnected: If the user is not connected
+        """
+        self._check_is_connected()
+
+        await self._imap.logout()
+        self.is_connected = False
+
+    def has_capability(self, capability: str) -> bool:
+        """
+        Check that the server supports a capability, capabilities are requested
+        right after the login
+
+        :param capability: The capability such as MOVE or UIDPLUS
+        :return: True if the server advertises the capability, False else
+        """
+        return capability.upper() in self._imap.capabilities
+
+    def _check_is_connected(self):
+        """
+        Assert that the account is connected
+        """
+        if not self.is_connected:
+            raise NotConnected("You should be connected to perform this operation")
+
+    def _chunk_uids(self, uids: List[str]) -> List[List[str]]:
+        """
+        Split uids into chunks whose uid set fits in a single command
+
+        :param uids: The uids
+        :return: The sorted chunks of uids
+        """
+        return chunk_uids(uids, self.max_uid_set_size)
+
+    def _uid_sets(self, uids: List[str]) -> List[str]:
+        """
+        Build the uid sets of the commands targeting several messages
+
+        :param uids: The uids
+        :return: The uid sets, one per command
+        """
+        if len(uids) == 1:
+            return list(uids)
+        return [compress_uids(chunk) for chunk in self._chunk_uids(uids)]
+
+    async def _check_path_empty(self, path: str):
+        """
+        Assert that the target path is free
+
+        :param path: The targeted path
+        """
+        for mailbox in await self.mailboxes():
+            if mailbox.path == path:
+                raise MailboxAlreadyExists(
+                    f"A mailbox already exists at '{mailbox.path}'"
+                )
+
+    async def mailboxes(self, force: bool = True) -> List[AsyncMailbox]:
+        """
+        Fetch all mailboxes
+
+        :param force: Force the account to reload all mailboxes
+        :raises NotConnected: If the user is not connected
+        :raises MailboxFetchingFailed: If there is a problem with imap
+        :return: The list of mailboxes
+        """
+        self._check_is_connected()
+
+        if not self._mailboxes and force:
+            status, raw_response = await self._imap.list()
+
+            if status != "OK":
+                raise MailboxFetchingFailed("Unable to fetch mailboxes")
+
+            self._mailboxes = [
+                mailbox_factory(raw_mailbox_description, self, AsyncMailbox)
+                for raw_mailbox_description in raw_response
+            ]
+
+        return self._mailboxes
+
+    async def _mailboxes_from_attr(self, attr: str, value: Any) -> List[AsyncMailbox]:
+        """
+        Retrieve mailboxes from an attribute
+
+        :param attr: The attribute
+        :param attr: The value expected from the attribute
+        :return: The list of mailboxes
+        """
+        mailboxes = await self.mailboxes()
+        return [mailbox for mailbox in mailboxes if getattr(mailbox, attr) == value]
+
+    async def _mailbox_from_attr(self, attr: str, value: Any) -> AsyncMailbox:
+        """
+        Retrieve the first mailbox from an attribute
+
+        :param attr: The attribute
+        :param attr: The value expected from the attribute
+        :return: The first mailbox
+        """
+        try:
+            return (await self._mailboxes_from_attr(attr, value))[0]
+        except IndexError:
+            raise MailboxNotFound(f"Mailbox of {attr} {value} not found")
+
+    async def mailboxes_from_kind(self, kind: MailboxKind) -> List[AsyncMailbox]:
+        """
+        Return mailboxes of a particular kind
+
+        :param kind: The kind of mailbox
+        :return: The list of mailboxes
+        """
+        return await self._mailboxes_from_attr("kind", kind)
+
+    async def mailbox_from_kind(self, kind: MailboxKind) -> AsyncMailbox:
+        """
+        Return a mailbox of a particular kind
+
+        :param kind: The kind of mailbox
+        :raises MailboxNotFound: If the mailbox is not found
+        :return: The first mailbox of that kind
+        """
+        return await self._mailbox_from_attr("kind", kind)
+
+    async def mailbox_from_path(self, path: str) -> AsyncMailbox:
+        """
+        Return a mailbox of a particular path
+
+        :param path: The path of mailbox
+        :raises MailboxNotFound: If the mailbox is not found
+        :return: The mailbox of that path
+        """
+        return await self._mailbox_from_attr("path", path)
+
+    async def inbox(self) -> AsyncMailbox:
+        """
+        Return inbox mailbox
+
+        :return: The inbox mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.INBOX)
+
+    async def trash(self) -> AsyncMailbox:
+        """
+        Return trash mailbox
+
+        :return: The trash mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.TRASH)
+
+    async def drafts(self) -> AsyncMailbox:
+        """
+        Return drafts mailbox
+
+        :return: The drafts mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.DRAFTS)
+
+    async def important(self) -> AsyncMailbox:
+        """
+        Return important mailbox
+
+        :return: The important mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.IMPORTANT)
+
+    async def sent(self) -> AsyncMailbox:
+        """
+        Return sent mailbox
+
+        :return: The sent mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.SENT)
+
+    async def flagged(self) -> AsyncMailbox:
+        """
+        Return flagged mailbox
+
+        :return: The flagged mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.FLAGGED)
+
+    async def all_(self) -> AsyncMailbox:
+        """
+        Return all mailbox
+
+        :return: The all mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.ALL)
+
+    async def junk(self) -> AsyncMailbox:
+        """
+        Return junk mailbox
+
+        :return: The junk mailbox
+        """
+        return await self.mailbox_from_kind(MailboxKind.JUNK)
+
+    async def customs(self) -> List[AsyncMailbox]:
+        """
+        Return custom mailboxes
+
+        :return: The custom mailboxes
+        """
+        return await self.mailboxes_from_kind(MailboxKind.CUSTOM)
+
+    async def expunge(self):
+        """
+        Permanently delete messages that have the Deleted flag.
+        """
+        await self._imap.expunge()
+
+    async def select_mailbox(self, mailbox: AsyncMailbox):
+        """
+        Select a mailbox
+
+        :param mailbox: The mailbox to select
+        :raises NotConnected: If the user is not connected
+        """
+        self._check_is_connected()
+
+        self.selected_mailbox = mailbox
+        await self._imap.select(mailbox.path)
+
+    async def move_mailbox(self, mailbox: AsyncMailbox, path: str):
+        """
+        Move a mailbox to another place
+
+        :param mailbox: The mailbox to move
+        :param path: The new path of the mailbox
+        :raises NotConnected: If the user is not connected
+        :raises MailboxAlreadyExists: If the mailbox already exists for the path
+        """
+        if path == mailbox.path:
+            return
+
+        self._check_is_connected()
+        await self._check_path_empty(path)
+
+        old_path = mailbox.path
+
+        await self._imap.rename(old_path, path)
+
+        for mailbox in await self.mailboxes():
+            if mailbox.path.startswith(old_path):
+                mailbox.path = mailbox.path.replace(old_path, path)
+                mailbox.label = mailbox.path.split("/")[-1]
+
+    async def rename_mailbox(self, mailbox: AsyncMailbox, label: str):
+        """
+        Rename a mailbox
+
+        :param mailbox: The mailbox to rename
+        :param path: The new label of the mailbox
+        """
+        parent_path = "/".join(mailbox.path.split("/")[0:-1])
+        path = f"{parent_path}/{label}" if parent_path else label
+        await self.move_mailbox(mailbox, path)
+
+    async def create_mailbox(self, path: str) -> AsyncMailbox:
+        """
+        Create a mailbox from a path
+
+        :param path: The path of the mailbox to create
+        :return: The newly mailbox
+        """
+        self._check_is_connected()
+        await self._check_path_empty(path)
+
+        mailbox = AsyncMailbox(
+            label=path.split("/")[-1],
+            path=path,
+            kind=MailboxKind.CUSTOM,
+            has_children=False,
+            _account=self,
+        )
+
+        self._mailboxes.append(mailbox)
+        await self._imap.create(path)
+
+        return mailbox
+
+    async def delete_mailbox(self, mailbox: AsyncMailbox):
+        """
+        Delete a particular mailbox
+
+        :param path: The mailbox to delete
+        """
+        self._check_is_connected()
+
+        if mailbox.kind is not MailboxKind.CUSTOM:
+            raise MailboxNotDeletable("You can't delete a not custom mailbox")
+
+        mailboxes = await self.mailboxes()
+        if mailbox not in mailboxes:
+            raise MailboxNotFound(f"The mailbox {mailbox.path} is not found")
+
+        mailboxes.remove(mailbox)
+        await self._imap.delete(mailbox.path)
+
+    async def search_message_uids(self, policy: Policy = all_policy) -> List[str]:
+        """
+        Search all message ids from the selected mailbox according to the policy
+
+        :param policy: The policy to fetch message, defaults to all_
+        :raises NotConnected: If the user is not connected
+        :return: The list of ids
+        """
+        self._check_is_connected()
+
+        status, raw_response = await self._imap.uid(
+            "SEARCH", None, policy.to_imap_standard()
+        )
+
+        if status != "OK":
+            raise MessageSearchingFailed("Unable to retrieve message uids")
+
+        return parse_search_response(raw_response)
+
+    async def fetch_messages(self, policy: Policy = all_policy) -> List[Message]:
+        """
+        Search all messages from the selected mailbox according to the policy
+
+        :param policy: The policy to fetch message, defaults to all_
+        :raises NotConnected: If the user is not connected
+        :return: The list of messages
+        """
+        self._check_is_connected()
+
+        message_uids = await self.search_message_uids(policy)
+        return await self.fetch_messages_using_uids(message_uids)
+
+    async def fetch_messages_using_uids(self, uids: List[str]) -> List[Message]:
+        """
+        Fetch the messages referenced by one of the uids from the selected mailbox
+
+        :param uids: The message's uids
+        :raises NotConnected: If the user is not connected
+        :raises MessageFetchingFailed: If there is a problem with imap
+        :return: The list of messages
+        """
+        if not uids:
+            return []
+
+        self._check_is_connected()
+
+        factory = partial(message_factory, keep_raw=self.keep_raw)
+        messages = []
+
+        for chunk in self._chunk_uids(uids):
+            status, raw_response = await self._imap.uid(
+                "FETCH", compress_uids(chunk), "(BODY.PEEK[] FLAGS)"
+            )
+
+            if status != "OK":
+                raise MessageFetchingFailed("Unable to fetch messages")
+
+            messages += parse_fetch_response(chunk, raw_response, self, factory)
+
+        return messages
+
+    async def iter_messages(
+        self, policy: Policy = all_policy, batch_size: int = 100
+    ) -> AsyncIterator[Message]:
+        """
+        Iterate over the messages from the selected mailbox according to the policy,
+        messages are fetched by batch so only one batch is held in memory at a time
+
+        :param policy: The policy to fetch message, defaults to all_
+        :param batch_size: The number of messages fetched per command, defaults to 100
+        :raises NotConnected: If the user is not connected
+        :return: The asynchronous iterator of messages
+        """
+        self._check_is_connected()
+
+        message_uids = await self.search_message_uids(policy)
+
+        for start in range(0, len(message_uids), batch_size):
+            end = start + batch_size
+            batch_uids = message_uids[start:end]
+            for message in await self.fetch_messages_using_uids(batch_uids):
+                yield message
+
+    async def search_messages(self, policy: Policy = all_policy) -> List[Message]:
+        """
+        Alias of `ggmail.async_account.AsyncAccount.fetch_messages`
+        """
+        return await self.fetch_messages(policy)
+
+    async def copy_message(self, message: Message, mailbox: AsyncMailbox):
+        """
+        Copy a message to another mailbox
+
+        :param message: The message to copy
+        :param mailbox: The mailbox containing the new copy
+        """
+        await self.copy_messages_using_uids([message.uid], mailbox)
+
+    async def copy_messages(self, messages: List[Message], mailbox: AsyncMailbox):
+        """
+        Copy messages to another mailbox
+
+        :param messages: The messages to copy
+        :param mailbox: The mailbox containing the new copy
+        """
+        uids = [message.uid for message in messages]
+        await self.copy_messages_using_uids(uids, mailbox)
+
+    async def copy_messages_using_uids(self, uids: List[str], mailbox: AsyncMailbox):
+        """
+        Copy message to another mailbox using their uids
+
+        :param uids: The message's uids
+        :param mailbox: The mailbox containing the new copy
+        :raises NotConnected: If the user is not connected
+        """
+        if not uids:
+            return
+
+        self._check_is_connected()
+        for uid_set in self._uid_sets(uids):
+            await self._imap.uid("COPY", uid_set, mailbox.path)
+
+    async def move_message(
+        self, message: Message, mailbox: AsyncMailbox, with_expunge: bool = False
+    ):
+        """
+        Move a message to another mailbox, if you don't set with_expunge to True, you
+        will still see the mail in the source mailbox.
+
+        :param message: The message to move
+        :param mailbox: The other mailbox
+        :param with_expunge: True if you permanently delete the message from the source,
+                             False else
+        :raises NotConnected: If the user is not connected
+        """
+        await self.move_messages([message], mailbox, with_expunge)
+
+    async def move_messages(
+        self, messages: List[Message], mailbox: AsyncMailbox, with_expunge: bool = False
+    ):
+        """
+        Move messages to another mailbox, if you don't set with_expunge to True, you
+        will still see the mail in the source mailbox.
+
+        :param messages: The messages to move
+        :param mailbox: The other mailbox
+        :param with_expunge: True if you permanently delete the message from the source,
+                             False else
+        :raises NotConnected: If the user is not connected
+        """
+        uids = [message.uid for message in messages]
+        await self.move_messages_using_uids(uids, mailbox, with_expunge)
+        for message in messages:
+            message.flags.add(Flag.DELETED)
+
+    async def move_messages_using_uids(
+        self, uids: List[str], mailbox: AsyncMailbox, with_expunge: bool = False
+    ):
+        """
+        Move messages to another mailbox using their uids, if you don't set
+        with_expunge to True, you will still see the mail in the source mailbox unless
+        the server supports the MOVE extension.
+
+        Using MOVE (RFC 6851), the messages are moved in a single command. Else they
+        are copied then flagged as deleted, with_expunge only expunges the moved
+        messages if the server supports UIDPLUS (RFC 4315).
+
+        :param uids: The message's uids
+        :param mailbox: The mailbox containing the new copy
+        :param with_expunge: True if you permanently delete the message from the source,
+                             False else
+        :raises NotConnected: If the user is not connected
+        """
+        if not uids:
+            return
+
+        self._check_is_connected()
+
+        if self.has_capability("MOVE"):
+            for uid_set in self._uid_sets(uids):
+                await self._imap.uid("MOVE", uid_set, mailbox.path)
+            return
+
+        await self.copy_messages_using_uids(uids, mailbox)
+        await self.add_flag_messages_using_uids(uids, Flag.DELETED)
+
+        if not with_expunge:
+            return
+
+        if self.has_capability("UIDPLUS"):
+            for uid_set in self._uid_sets(uids):
+                await self._imap.uid("EXPUNGE", uid_set)
+        else:
+            await self.expunge()
+
+    async def add_flag_message(self, message: Message, flag: Flag):
+        """
+        Add a flag to the message
+
+        :param message: The message to update
+        :param flag: The flag to add
+        :raises NotConnected: If the user is not connected
+        :raises FlagAlreadyAttached: If the flag is already attached
+        """
+        await self.add_flags_messages([message], [flag])
+
+    async def add_flag_messages(self, messages: List[Message], flag: Flag):
+        """
+        Add a flag to all messages
+
+        :param messages: The messages to update
+        :param flag: The flag to add
+        :raises NotConnected: If the user is not connected
+        :raises FlagAlreadyAttached: If the flag is already attached
+        """
+        await self.add_flags_messages(messages, [flag])
+
+    async def add_flags_messages(self, messages: List[Message], flags: List[Flag]):
+        """
+        Add several flags to all messages using a single command
+
+        :param messages: The messages to update
+        :param flags: The flags to add
+        :raises NotConnected: If the user is not connected
+        :raises FlagAlreadyAttached: If one of the flags is already attached
+        """
+        flags = unique_flags(flags)
+
+        for message in messages:
+            for flag in flags:
+                if flag in message.flags:
+                    raise FlagAlreadyAttached(
+                        f"The flag {flag} is already attached to the message with "
+                        f"the uid {message.uid}"
+                    )
+
+        uids = [message.uid for message in messages]
+        await self.add_flags_messages_using_uids(uids, flags)
+
+        for message in messages:
+            message.flags.update(flags)
+
+    async def add_flag_messages_using_uids(self, uids: List[str], flag: Flag):
+        """
+        Add a flag to all messages referenced by one of the uids
+
+        :param uids: The message's uids
+        :param flag: The flag to add
+        :raises NotConnected: If the user is not connected
+        """
+        await self.add_flags_messages_using_uids(uids, [flag])
+
+    async def add_flags_messages_using_uids(self, uids: List[str], flags: List[Flag]):
+        """
+        Add several flags to all messages referenced by one of the uids using a single
+        command, the server does not send back the updated flags
+
+        :param uids: The message's uids
+        :param flags: The flags to add
+        :raises NotConnected: If the user is not connected
+        """
+        await self._store_flags(uids, "+FLAGS.SILENT", flags)
+
+    async def remove_flag_message(self, message: Message, flag: Flag):
+        """
+        Remove a flag from the message
+
+        :param message: The message to update
+        :param flag: The flag to remove
+        :raises NotConnected: If the user is not connected
+        :raises FlagNotAttached: If the flag is not attached
+        """
+        await self.remove_flags_messages([message], [flag])
+
+    async def remove_flag_messages(self, messages: List[Message], flag: Flag):
+        """
+        Remove a flag to all messages
+
+        :param messages: The messages to update
+        :param flag: The flag to remove
+        :raises NotConnected: If the user is not connected
+        :raises FlagNotAttached: If the flag is not attached
+        """
+        await self.remove_flags_messages(messages, [flag])
+
+    async def remove_flags_messages(self, messages: List[Message], flags: List[Flag]):
+        """
+        Remove several flags to all messages using a single command
+
+        :param messages: The messages to update
+        :param flags: The flags to remove
+        :raises NotConnected: If the user is not connected
+        :raises FlagNotAttached: If one of the flags is not attached
+        """
+        self._check_is_connected()
+
+        flags = unique_flags(flags)
+
+        for message in messages:
+            for flag in flags:
+                if flag not in message.flags:
+                    raise FlagNotAttached(
+                        f"The flag {flag} not attached to the message with the uid "
+                        f"{message.uid}"
+                    )
+
+        uids = [message.uid for message in messages]
+        await self.remove_flags_messages_using_uids(uids, flags)
+
+        for message in messages:
+            message.flags.difference_update(flags)
+
+    async def remove_flag_messages_using_uids(self, uids: List[str], flag: Flag):
+        """
+        Remove a flag to all messages referenced by one of the uids
+
+        :param uids: The message's uids
+        :param flag: The flag to remove
+        :raises NotConnected: If the user is not connected
+        """
+        await self.remove_flags_messages_using_uids(uids, [flag])
+
+    async def remove_flags_messages_using_uids(
+        self, uids: List[str], flags: List[Flag]
+    ):
+        """
+        Remove several flags to all messages referenced by one of the uids using a
+        single command, the server does not send back the updated flags
+
+        :param uids: The message's uids
+        :param flags: The flags to remove
+        :raises NotConnected: If the user is not connected
+        """
+        await self._store_flags(uids, "-FLAGS.SILENT", flags)
+
+    async def _store_flags(self, uids: List[str], item: str, flags: List[Flag]):
+        """
+        Send the STORE command updating the flags of messages
+
+        :param uids: The message's uids
+        :param item: The message data item such as +FLAGS.SILENT
+        :param flags: The flags
+        :raises NotConnected: If the user is not connected
+        """
+        if not uids or not flags:
+            return
+
+        self._check_is_connected()
+        for uid_set in self._uid_sets(uids):
+            await self._imap.uid("STORE", uid_set, item, format_flags(flags))
@@ -0,0 +1,260 @@
+import asyncio
+import re
+import ssl
+from base64 import b64encode
+from imaplib import _MAXLINE, IMAP4, IMAP4_SSL_PORT
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_CRLF = b"\r\n"
+_LITERAL = re.compile(rb".*{(?P<size>\d+)}$", re.ASCII)
+_TAGGED = re.compile(rb"(?P<tag>[A-Z0-9]+) (?P<type>[A-Z]+) ?(?P<data>.*)", re.ASCII)
+_UNTAGGED = re.compile(rb"\* (?P<type>[A-Z-]+)( (?P<data>.*))?", re.ASCII)
+_UNTAGGED_STATUS = re.compile(
+    rb"\* (?P<data>\d+) (?P<type>[A-Z-]+)( (?P<data2>.*))?", re.ASCII
+)
+_RESPONSE_CODE = re.compile(rb"\[(?P<type>[A-Z-]+)( (?P<data>.*))?\]", re.ASCII)
+_CONTINUATION = re.compile(rb"\+( (?P<data>.*))?", re.ASCII)
+# Longest accepted response line, e.g. a SEARCH response listing every uid, same as
+# imaplib plus the CRLF
+_LINE_LIMIT = _MAXLINE + 2
+
+Response = Tuple[str, List[Any]]
+
+
+class AsyncIMAP4:
+    """
+    Minimal non-blocking IMAP4 client, the responses have the same shape as the
+    responses of `imaplib.IMAP4` so the parsers of ggmail can be reused.
+    """
+
+    error = IMAP4.error
+    abort = IMAP4.abort
+
+    def __init__(self, host: str, port: int = IMAP4_SSL_PORT, secure: bool = True):
+        self.host = host
+        self.port = port
+        self.secure = secure
+        self.capabilities: Tuple[str, ...] = ()
+        self.untagged_responses: Dict[str, List[Any]] = {}
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._tag_number = 0
+
+    async def open(self):
+        """
+        Open the connection and read the server greeting
+
+        :raises IMAP4.abort: If the server does not greet us
+        """
+        context = ssl.create_default_context() if self.secure else None
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, ssl=context, limit=_LINE_LIMIT
+        )
+        self._lock = asyncio.Lock()
+
+        greeting = await self._read_line()
+        if not greeting.startswith(b"* OK") and not greeting.startswith(b"* PREAUTH"):
+            raise self.abort(f"Unexpected greeting {greeting!r}")
+
+        await self.capability()
+
+    async def close(self):
+        """
+        Close the connection without sending LOGOUT
+        """
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+        self._reader, self._writer = None, None
+
+    async def _read_line(self) -> bytes:
+        """
+        Read one line of the server response without the CRLF
+
+        :raises IMAP4.abort: If the server closed the connection or sent a line
+                             longer than imaplib accepts
+        :return: The line
+        """
+        try:
+            line = await self._reader.readline()
+        except (ValueError, asyncio.LimitOverrunError) as error:
+            # The rest of the line is still unread, the stream cannot be reused
+            await self.close()
+            raise self.abort(f"Got more than {_MAXLINE} bytes: {error}")
+        if not line:
+            raise self.abort("Socket error: EOF")
+        return line[:-2] if line.endswith(_CRLF) else line.rstrip(b"\n")
+
+    async def _write(self, data: bytes):
+        self._writer.write(data + _CRLF)
+        await self._writer.drain()
+
+    def _append_untagged(self, name: str, data: Any):
+        self.untagged_responses.setdefault(name, []).append(data)
+
+    async def _read_untagged(self, line: bytes):
+        """
+        Store an untagged response, reading its literals if any
+
+        :param line: The first line of the untagged response
+        """
+        match = _UNTAGGED_STATUS.match(line)
+        if match:
+            data = match.group("data")
+            if match.group("data2"):
+                data = data + b" " + match.group("data2")
+        else:
+            match = _UNTAGGED.match(line)
+            data = match.group("data") or b""
+
+        name = match.group("type").decode("ascii")
+
+        code = _RESPONSE_CODE.match(data)
+        if name in ("OK", "NO", "BAD") and code:
+            self._append_untagged(
+                code.group("type").decode("ascii"), code.group("data") or b""
+            )
+
+        literal = _LITERAL.match(data)
+        while literal:
+            size = int(literal.group("size"))
+            content = await self._reader.readexactly(size)
+            self._append_untagged(name, (data, content))
+            data = await self._read_line()
+            literal = _LITERAL.match(data)
+
+        self._append_untagged(name, data)
+
+    async def _command(
+        self, name: str, *args: str, responder: Optional[Callable] = None
+    ) -> Response:
+        """
+        Send a command and wait for its completion
+
+        :param name: The name of the command
+        :param args: The arguments of the command, None arguments are ignored
+        :param responder: The callable answering the continuation requests
+        :raises IMAP4.error: If the server replies BAD
+        :raises IMAP4.abort: If the connection is broken
+        :return: The status and the data of the tagged response
+        """
+        if self._writer is None:
+            raise self.abort("The connection is not opened")
+
+        async with self._lock:
+            self._tag_number += 1
+            tag = f"GG{self._tag_number}".encode("ascii")
+            words = [tag, name.encode("ascii")]
+            words.extend(arg.encode("utf8") for arg in args if arg is not None)
+            command = b" ".join(words)
+
+            try:
+                await self._write(command)
+
+                while True:
+                    line = await self._read_line()
+
+                    if line.startswith(b"* "):
+                        await self._read_untagged(line)
+                        continue
+
+                    continuation = _CONTINUATION.match(line)
+                    if continuation:
+                        if responder is None:
+                            raise self.abort(f"Unexpected continuation {line!r}")
+                        await self._write(responder(continuation.group("data")))
+                        continue
+
+                    tagged = _TAGGED.match(line)
+                    if tagged and tagged.group("tag") == tag:
+                        break
+            except (OSError, asyncio.IncompleteReadError) as error:
+                raise self.abort(f"Socket error: {error}")
+
+        status = tagged.group("type").decode("ascii")
+        if status == "BAD":
+            raise self.error(f"{name} command error: {status} [{line!r}]")
+
+        return status, [tagged.group("data")]
+
+    async def _untagged_command(self, response: str, name: str, *args) -> Response:
+        """
+        Send a command and return the untagged responses of a particular name
+
+        :param response: The name of the expected untagged responses
+        :param name: The name of the command
+        :param args: The arguments of the command
+        :return: The status and the untagged responses
+        """
+        self.untagged_responses.pop(response, None)
+        status, data = await self._command(name, *args)
+        if status == "NO":
+            return status, data
+        return status, self.untagged_responses.pop(response, [None])
+
+    async def capability(self) -> Response:
+        status, data = await self._untagged_command("CAPABILITY", "CAPABILITY")
+        if data != [None]:
+            self.capabilities = tuple(data[-1].decode("ascii").upper().split())
+        return status, data
+
+    async def login(self, user: str, password: str) -> Response:
+        quoted = password.replace("\\", "\\\\").replace('"', '\\"')
+        status, data = await self._command("LOGIN", user, f'"{quoted}"')
+        if status != "OK":
+            raise self.error(data[-1])
+        return status, data
+
+    async def authenticate(self, mechanism: str, authobject: Callable) -> Response:
+        def responder(challenge: bytes) -> bytes:
+            response = authobject(challenge)
+            if isinstance(response, str):
+                response = response.encode("utf8")
+            return b64encode(response)
+
+        status, data = await self._command(
+            "AUTHENTICATE", mechanism.upper(), responder=responder
+        )
+        if status != "OK":
+            raise self.error(data[-1])
+        return status, data
+
+    async def logout(self) -> Response:
+        try:
+            status, data = await self._untagged_command("BYE", "LOGOUT")
+        except self.abort:
+            status, data = "NO", [None]
+        await self.close()
+        return status, data
+
+    async def noop(self) -> Response:
+        return await self._command("NOOP")
+
+    async def list(self) -> Response:
+        return await self._untagged_command("LIST", "LIST", '""', "*")
+
+    async def select(self, mailbox: str = "INBOX") -> Response:
+        self.untagged_responses = {}
+        return await self._untagged_command("EXISTS", "SELECT", mailbox)
+
+    async def create(self, mailbox: str) -> Response:
+        return await self._command("CREATE", mailbox)
+
+    async def delete(self, mailbox: str) -> Response:
+        return await self._command("DELETE", mailbox)
+
+    async def rename(self, old_mailbox: str, new_mailbox: str) -> Response:
+        return await self._command("RENAME", old_mailbox, new_mailbox)
+
+    async def expunge(self) -> Response:
+        return await self._untagged_command("EXPUNGE", "EXPUNGE")
+
+    async def uid(self, command: str, *args: str) -> Response:
+        command = command.upper()
+        response = command if command == "SEARCH" else "FETCH"
+        return await self._untagged_command(response, "UID", command, *args)
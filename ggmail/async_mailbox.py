@@ -0,0 +1,78 @@
+from typing import AsyncIterator, List
+
+from .mailbox import Mailbox
+from .message import Message
+from .policy import Policy
+from .policy import all_ as all_policy
+
+
+class AsyncMailbox(Mailbox):
+    """
+    Mailbox bound to an `ggmail.async_account.AsyncAccount`, every operation
+    involving the server is awaitable.
+    """
+
+    async def rename(self, label: str):
+        """
+        Rename the mailbox
+
+        :param path: The new label of the mailbox
+        """
+        await self._account.rename_mailbox(self, label)
+
+    async def move(self, path: str):
+        """
+        Move the mailbox, every nested mailbox of the mailbox will be moved with it
+
+        :param path: The name of the new path
+        """
+        await self._account.move_mailbox(self, path)
+
+    async def select(self):
+        """
+        Select the mailbox
+        """
+        await self._account.select_mailbox(self)
+
+    async def search_uids(self, policy: Policy = all_policy) -> List[str]:
+        """
+        Search all message uids from the mailbox according to the policy, the mailbox
+        become the selected mailbox
+
+        :param policy: The policy to fetch message uids, defaults to all_
+        :return: The list of message uids
+        """
+        await self.select()
+        return await self._account.search_message_uids(policy)
+
+    async def fetch(self, policy: Policy = all_policy) -> List[Message]:
+        """
+        Search all messages from the mailbox according to the policy, the mailbox become
+        the selected mailbox
+
+        :param policy: The policy to fetch messages, defaults to all_
+        :return: The list of messages
+        """
+        await self.select()
+        return await self._account.fetch_messages(policy)
+
+    async def search(self, policy: Policy = all_policy) -> List[Message]:
+        """
+        Alias of `ggmail.async_mailbox.AsyncMailbox.fetch`
+        """
+        return await self.fetch(policy)
+
+    async def iter(
+        self, policy: Policy = all_policy, batch_size: int = 100
+    ) -> AsyncIterator[Message]:
+        """
+        Iterate over the messages from the mailbox according to the policy, messages
+        are fetched by batch, the mailbox become the selected mailbox
+
+        :param policy: The policy to fetch messages, defaults to all_
+        :param batch_size: The number of messages fetched per command, defaults to 100
+        :return: The asynchronous iterator of messages
+        """
+        await self.select()
+        async for message in self._account.iter_messages(policy, batch_size):
+            yield message
@@ -0,0 +1,211 @@
+import binascii
+import re
+from email.message import Message as EmailMessage
+from itertools import takewhile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .fetch import parse_fetch
+from .message import Attachment, decode_subject
+
+_BASE64_NOISE = re.compile(rb"[^A-Za-z0-9+/=]")
+# Number of fields of a single part before its extension data, text parts add the
+# number of lines and message/rfc822 parts the envelope, the body and the lines
+_BASIC_FIELDS = 7
+_TEXT_FIELDS = 8
+_MESSAGE_FIELDS = 10
+
+
+class TransferDecoder:
+    """
+    Decode a part received chunk by chunk according to its Content-Transfer-Encoding,
+    the end of a chunk which cannot be decoded alone is kept for the next one
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self.encoding = (encoding or "7bit").lower()
+        self.pending = b""
+
+    def decode(self, data: Any, final: bool = False) -> bytes:
+        """
+        Decode a chunk
+
+        :param data: The chunk as received
+        :param final: True for the last chunk
+        :return: The decoded bytes available
+        """
+        if self.encoding == "base64":
+            data = self.pending + _BASE64_NOISE.sub(b"", data)
+            end = len(data) if final else len(data) - len(data) % 4
+            data, self.pending = data[:end], data[end:]
+            try:
+                return binascii.a2b_base64(data + b"=" * (-len(data) % 4))
+            except binascii.Error:
+                # A truncated last quantum is dropped like the email package does
+                return binascii.a2b_base64(data[: len(data) - len(data) % 4])
+
+        if self.encoding == "quoted-printable":
+            data = self.pending + bytes(data)
+            end = len(data) if final else data.rfind(b"\n") + 1
+            data, self.pending = data[:end], data[end:]
+            return binascii.a2b_qp(data)
+
+        return bytes(data)
+
+
+def parse_attachments_response(
+    raw_response: List[Any], account, mailbox=None
+) -> Dict[str, List[Attachment]]:
+    """
+    Extract the attachments from the raw response of a FETCH (BODYSTRUCTURE) command
+
+    :param raw_response: The raw response
+    :param account: The account of the messages
+    :param mailbox: The mailbox of the messages, defaults to None
+    :return: The attachments indexed by uid
+    """
+    attachments = {}
+
+    for uid, response in parse_fetch(raw_response).items():
+        bodystructure = response.bodystructure
+        if bodystructure is not None:
+            attachments[uid] = attachments_from_bodystructure(
+                uid, bodystructure, account, mailbox
+            )
+
+    return attachments
+
+
+def attachments_from_bodystructure(
+    uid: str, bodystructure: list, account, mailbox=None
+) -> List[Attachment]:
+    """
+    List the attachments of a message, parts whose disposition is attachment or
+    which have a filename, attached messages are listed without their own parts
+
+    :param uid: The uid of the message
+    :param bodystructure: The parsed BODYSTRUCTURE, see `ggmail.fetch.parse_list`
+    :param account: The account of the message
+    :param mailbox: The mailbox of the message, defaults to None
+    :return: The attachments in the order of the message
+    """
+    attachments = []
+
+    for part, body in iter_parts(bodystructure):
+        if len(body) < _BASIC_FIELDS or not isinstance(body[0], str):
+            continue
+
+        content_type = f"{body[0]}/{body[1]}".lower()
+        if content_type == "message/rfc822":
+            extension = _MESSAGE_FIELDS
+        elif content_type.startswith("text/"):
+            extension = _TEXT_FIELDS
+        else:
+            extension = _BASIC_FIELDS
+        # The extension data starts with the MD5 of the part then its disposition
+        kind, disposition_params = _disposition(_field(body, extension + 1))
+        filename = _filename(kind, disposition_params, _pairs(body[2]))
+
+        if kind != "attachment" and filename is None:
+            continue
+
+        attachments.append(
+            Attachment._from_trusted(
+                account,
+                mailbox,
+                uid=uid,
+                part=part,
+                filename=filename,
+                content_type=content_type,
+                size=body[6] if isinstance(body[6], int) else 0,
+                encoding=str(body[5] or "7bit").lower(),
+            )
+        )
+
+    return attachments
+
+
+def iter_parts(bodystructure: list, part: str = "") -> Iterator[Tuple[str, list]]:
+    """
+    Iterate over the single parts of a BODYSTRUCTURE
+
+    :param bodystructure: The parsed BODYSTRUCTURE
+    :param part: The part number of the structure, empty for the message
+    :return: The iterator of part numbers such as "2.1" and their structure
+    """
+    if bodystructure and isinstance(bodystructure[0], list):
+        children = takewhile(lambda child: isinstance(child, list), bodystructure)
+        for index, child in enumerate(children, 1):
+            yield from iter_parts(child, f"{part}.{index}" if part else str(index))
+    else:
+        yield part or "1", bodystructure
+
+
+def _field(body: list, index: int) -> Any:
+    return body[index] if index < len(body) else None
+
+
+def _pairs(raw_params: Any) -> List[Tuple[str, str]]:
+    """
+    Read a parameter list such as ["NAME", "a.pdf"], NIL gives an empty list
+    """
+    if not isinstance(raw_params, list):
+        return []
+    return [
+        (str(name), str(value))
+        for name, value in zip(raw_params[::2], raw_params[1::2])
+        if value is not None
+    ]
+
+
+def _disposition(disposition: Any) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+    """
+    Read a disposition such as ["ATTACHMENT", ["FILENAME", "a.pdf"]]
+    """
+    if not disposition or not isinstance(disposition, list):
+        return None, []
+    if not isinstance(disposition[0], str):
+        return None, []
+    return disposition[0].lower(), _pairs(_field(disposition, 1))
+
+
+def _filename(
+    kind: Optional[str],
+    disposition_params: List[Tuple[str, str]],
+    type_params: List[Tuple[str, str]],
+) -> Optional[str]:
+    """
+    Read the filename of the disposition or else the name of the content type, RFC
+    2231 parameters and RFC 2047 encoded words are decoded
+    """
+    for wanted, params in (("filename", disposition_params), ("name", type_params)):
+        for name, value in params:
+            # Parameters split or encoded using RFC 2231 are left to the email package
+            if "*" in name:
+                return _decode_filename(kind, disposition_params, type_params)
+            if name.lower() == wanted:
+                return decode_subject(value) if "=?" in value else value
+
+    return None
+
+
+def _decode_filename(
+    kind: Optional[str],
+    disposition_params: List[Tuple[str, str]],
+    type_params: List[Tuple[str, str]],
+) -> Optional[str]:
+    """
+    Read the filename by rebuilding the headers of the part for the email package
+    """
+    header = EmailMessage()
+    header["Content-Disposition"] = _header_value(kind or "inline", disposition_params)
+    header["Content-Type"] = _header_value("application/octet-stream", type_params)
+
+    filename = header.get_filename()
+    return decode_subject(filename) if filename is not None else None
+
+
+def _header_value(value: str, params: List[Tuple[str, str]]) -> str:
+    for name, param in params:
+        quoted = param.replace("\\", "\\\\").replace('"', '\\"')
+        value += f'; {name.lower()}="{quoted}"'
+    return value
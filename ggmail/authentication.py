@@ -3,6 +3,7 @@ from imaplib import IMAP4
 
 from pydantic import BaseModel, SecretStr
 
+from .async_imap import AsyncIMAP4
 from .exception import LoginFailed
 
 
@@ -10,6 +11,7 @@ class Authentication(BaseModel, ABC):
     username: str
     host: str
     port: int
+    secure: bool = True
 
     @abstractmethod
     def login(self, imap: IMAP4):
@@ -20,6 +22,20 @@ class Authentication(BaseModel, ABC):
         :raises LoginFailed: If there is a problem with imap
         """
 
+    async def async_login(self, imap: AsyncIMAP4):
+        """
+        Login to the account using a non-blocking connection, authentications which
+        don't override it can only be used by `ggmail.account.Account`
+
+        :param imap: the async imap account instance
+        :raises LoginFailed: If there is a problem with imap
+        :raises NotImplementedError: If the authentication has no async login
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support AsyncAccount, implement "
+            "async_login to use it"
+        )
+
 
 class Google(Authentication):
     password: SecretStr
@@ -35,17 +51,29 @@ class Google(Authentication):
                 "and ensure you granted access to less secure app."
             )
 
+    async def async_login(self, imap: AsyncIMAP4):
+        try:
+            await imap.login(self.username, self.password.get_secret_value())
+        except IMAP4.error:
+            raise LoginFailed(
+                "Can't login to your email account, verify your credentials "
+                "and ensure you granted access to less secure app."
+            )
+
 
 class GoogleOAuth2(Authentication):
     token: SecretStr
     host: str = "imap.gmail.com"
     port: int = 993
 
+    def _auth_string(self) -> str:
+        user = self.username
+        token = self.token.get_secret_value()
+        return "user=%s\1auth=Bearer %s\1\1" % (user, token)
+
     def login(self, imap: IMAP4):
         try:
-            user = self.username
-            token = self.token.get_secret_value()
-            auth_string = "user=%s\1auth=Bearer %s\1\1" % (user, token)
+            auth_string = self._auth_string()
             imap.authenticate("XOAUTH2", lambda x: auth_string)
         except IMAP4.error:
             raise LoginFailed(
@@ -53,6 +81,16 @@ class GoogleOAuth2(Authentication):
                 "and ensure you granted access using gcp."
             )
 
+    async def async_login(self, imap: AsyncIMAP4):
+        try:
+            auth_string = self._auth_string()
+            await imap.authenticate("XOAUTH2", lambda x: auth_string)
+        except IMAP4.error:
+            raise LoginFailed(
+                "Can't login to your email account, verify your credentials "
+                "and ensure you granted access using gcp."
+            )
+
 
 class Outlook(Authentication):
     password: SecretStr
@@ -67,3 +105,12 @@ class Outlook(Authentication):
                 "Can't login to your email account, verify your credentials "
                 "and ensure you granted access to less secure app."
             )
+
+    async def async_login(self, imap: AsyncIMAP4):
+        try:
+            await imap.login(self.username, self.password.get_secret_value())
+        except IMAP4.error:
+            raise LoginFailed(
+                "Can't login to your email account, verify your credentials "
+                "and ensure you granted access to less secure app."
+            )
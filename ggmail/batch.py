@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional, Tuple
+
+from .flag import Flag
+from .mailbox import Mailbox
+
+OrderedUids = Dict[str, None]
+
+
+class _MailboxOperations:
+    """
+    Operations recorded while a particular mailbox was selected
+    """
+
+    def __init__(self, mailbox: Optional[Mailbox]):
+        self.mailbox = mailbox
+        self.flags: Dict[Tuple[str, Flag], OrderedUids] = {}
+        self.copies: Dict[str, Tuple[Mailbox, OrderedUids]] = {}
+        self.moves: Dict[str, Tuple[Mailbox, OrderedUids]] = {}
+        self.expunged_uids: OrderedUids = {}
+        self.expunge = False
+
+    def grouped_flags(self, sign: str) -> Dict[Tuple[str, ...], List[Flag]]:
+        """
+        Group the flags updated in a direction by the uids they target so flags
+        sharing the same uids are updated with a single command
+
+        :param sign: The direction, + or -
+        :return: The flags indexed by their uids
+        """
+        groups: Dict[Tuple[str, ...], List[Flag]] = {}
+        for (flag_sign, flag), uids in self.flags.items():
+            if flag_sign == sign and uids:
+                groups.setdefault(tuple(uids), []).append(flag)
+        return groups
+
+
+class Batch:
+    """
+    Operations recorded inside `ggmail.account.Account.batch`, they are sent using
+    the fewest commands possible when the batch is flushed: one STORE per flag and
+    direction, one COPY or MOVE per target mailbox and one expunge at the end.
+    """
+
+    def __init__(self, account):
+        self.account = account
+        self.operations: Dict[Optional[str], _MailboxOperations] = {}
+
+    def _current(self) -> _MailboxOperations:
+        mailbox = self.account.selected_mailbox
+        path = mailbox.path if mailbox is not None else None
+        if path not in self.operations:
+            self.operations[path] = _MailboxOperations(mailbox)
+        return self.operations[path]
+
+    def store_flags(self, uids: List[str], sign: str, flags: List[Flag]):
+        """
+        Record a flag update, a later update of the same flag on the same message
+        overrides the previous one
+
+        :param uids: The message's uids
+        :param sign: The direction, + or -
+        :param flags: The flags
+        """
+        operations = self._current()
+        opposite_sign = "-" if sign == "+" else "+"
+
+        for flag in flags:
+            opposite = operations.flags.get((opposite_sign, flag), {})
+            pending = operations.flags.setdefault((sign, flag), {})
+            for uid in uids:
+                opposite.pop(uid, None)
+                pending[uid] = None
+
+    def copy(self, uids: List[str], mailbox: Mailbox):
+        """
+        Record a copy of messages
+
+        :param uids: The message's uids
+        :param mailbox: The mailbox containing the new copy
+        """
+        _, pending = self._current().copies.setdefault(mailbox.path, (mailbox, {}))
+        pending.update(dict.fromkeys(uids))
+
+    def move(self, uids: List[str], mailbox: Mailbox, with_expunge: bool):
+        """
+        Record a move of messages
+
+        :param uids: The message's uids
+        :param mailbox: The mailbox containing the new copy
+        :param with_expunge: True if the moved messages are expunged at the end
+        """
+        operations = self._current()
+        _, pending = operations.moves.setdefault(mailbox.path, (mailbox, {}))
+        pending.update(dict.fromkeys(uids))
+        if with_expunge:
+            operations.expunged_uids.update(dict.fromkeys(uids))
+
+    def expunge(self):
+        """
+        Record an expunge of the mailbox
+        """
+        self._current().expunge = True
+
+    def flush(self):
+        """
+        Send every recorded operation, mailbox by mailbox, the mailbox selected
+        before the flush is selected again at the end
+        """
+        account = self.account
+        selected_mailbox = account.selected_mailbox
+        operations_list, self.operations = list(self.operations.values()), {}
+
+        for operations in operations_list:
+            source = operations.mailbox
+            if source is not None and source is not account.selected_mailbox:
+                account.select_mailbox(source)
+
+            for sign in ("+", "-"):
+                for uids, flags in operations.grouped_flags(sign).items():
+                    account._store_flags(list(uids), sign, flags)
+
+            for mailbox, uids in operations.copies.values():
+                account.copy_messages_using_uids(list(uids), mailbox)
+
+            for mailbox, uids in operations.moves.values():
+                account.move_messages_using_uids(list(uids), mailbox)
+
+            if operations.expunge:
+                account.expunge()
+            elif operations.expunged_uids and not account.has_capability("MOVE"):
+                account.expunge_messages_using_uids(list(operations.expunged_uids))
+
+        if selected_mailbox not in (None, account.selected_mailbox):
+            account.select_mailbox(selected_mailbox)
@@ -0,0 +1,153 @@
+import sqlite3
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, PrivateAttr
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mailboxes (
+    path TEXT PRIMARY KEY,
+    uidvalidity TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    path TEXT NOT NULL,
+    uid INTEGER NOT NULL,
+    raw BLOB NOT NULL,
+    PRIMARY KEY (path, uid)
+);
+"""
+
+# SQLite refuses statements with more than 999 variables on old versions
+_MAX_VARIABLES = 900
+
+
+class MessageCache(BaseModel):
+    """
+    SQLite store of raw messages, a message is immutable for a given mailbox,
+    UIDVALIDITY and uid so it is never downloaded twice. The messages of a mailbox
+    are dropped as soon as its UIDVALIDITY changes.
+    """
+
+    path: str = ":memory:"
+
+    _connection: sqlite3.Connection = PrivateAttr()
+    _lock: Lock = PrivateAttr()
+
+    class Config:
+        copy_on_model_validation = "none"
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the underlying database
+        """
+        self._connection.close()
+
+    def _validate(self, mailbox: str, uidvalidity: str):
+        """
+        Drop the messages of the mailbox if they belong to another UIDVALIDITY
+        """
+        row = self._connection.execute(
+            "SELECT uidvalidity FROM mailboxes WHERE path = ?", (mailbox,)
+        ).fetchone()
+
+        if row is not None and row[0] == uidvalidity:
+            return
+
+        self._connection.execute("DELETE FROM messages WHERE path = ?", (mailbox,))
+        self._connection.execute(
+            "INSERT OR REPLACE INTO mailboxes (path, uidvalidity) VALUES (?, ?)",
+            (mailbox, uidvalidity),
+        )
+
+    def messages(
+        self, mailbox: str, uidvalidity: str, uids: Iterable[str]
+    ) -> Dict[str, bytes]:
+        """
+        Get the raw messages already stored for the uids
+
+        :param mailbox: The path of the mailbox
+        :param uidvalidity: The current UIDVALIDITY of the mailbox
+        :param uids: The message's uids
+        :return: The raw messages indexed by uid, missing uids are absent
+        """
+        uids = [int(uid) for uid in uids]
+        raw_messages: Dict[str, bytes] = {}
+
+        with self._lock, self._connection:
+            self._validate(mailbox, uidvalidity)
+
+            for start in range(0, len(uids), _MAX_VARIABLES):
+                end = start + _MAX_VARIABLES
+                chunk = uids[start:end]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT uid, raw FROM messages "
+                    f"WHERE path = ? AND uid IN ({placeholders})",
+                    [mailbox, *chunk],
+                )
+                raw_messages.update((str(uid), bytes(raw)) for uid, raw in rows)
+
+        return raw_messages
+
+    def store_messages(
+        self, mailbox: str, uidvalidity: str, raw_messages: Dict[str, bytes]
+    ):
+        """
+        Store raw messages
+
+        :param mailbox: The path of the mailbox
+        :param uidvalidity: The current UIDVALIDITY of the mailbox
+        :param raw_messages: The raw messages indexed by uid
+        """
+        if not raw_messages:
+            return
+
+        with self._lock, self._connection:
+            self._validate(mailbox, uidvalidity)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO messages (path, uid, raw) VALUES (?, ?, ?)",
+                [(mailbox, int(uid), raw) for uid, raw in raw_messages.items()],
+            )
+
+    def uids(self, mailbox: str) -> List[str]:
+        """
+        Get the uids stored for a mailbox
+
+        :param mailbox: The path of the mailbox
+        :return: The sorted list of uids
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT uid FROM messages WHERE path = ? ORDER BY uid", (mailbox,)
+            )
+            return [str(uid) for uid, in rows]
+
+    def clear(self, mailbox: Optional[str] = None):
+        """
+        Drop the stored messages
+
+        :param mailbox: The path of the mailbox to clear, defaults to every mailbox
+        """
+        with self._lock, self._connection:
+            if mailbox is None:
+                self._connection.execute("DELETE FROM messages")
+                self._connection.execute("DELETE FROM mailboxes")
+            else:
+                self._connection.execute(
+                    "DELETE FROM messages WHERE path = ?", (mailbox,)
+                )
+                self._connection.execute(
+                    "DELETE FROM mailboxes WHERE path = ?", (mailbox,)
+                )
@@ -11,6 +11,15 @@ class AlreadyConnected(Exception):
     pass
 
 
+# Pool exception
+class PoolExhausted(Exception):
+    pass
+
+
+class PoolClosed(Exception):
+    pass
+
+
 # Mailbox exception
 class MailboxFetchingFailed(Exception):
     pass
@@ -41,6 +50,10 @@ class MessageFetchingFailed(Exception):
     pass
 
 
+class MessageNotFound(Exception):
+    pass
+
+
 class FlagNotAttached(Exception):
     pass
 
@@ -0,0 +1,268 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .flag import FlagSet
+
+# The first line of a FETCH response as stored by imaplib, "* 12 FETCH (" without
+# the "* " and the response name, continuation lines start with a space or ")"
+_START = re.compile(rb"(?P<sequence>\d+) \(")
+# The data items read from a FETCH response, sections and quoted strings are
+# matched as a whole so that the field names of BODY[HEADER.FIELDS (...)] and the
+# strings of a BODYSTRUCTURE are never read as data items
+_ITEM = re.compile(
+    rb"(?<=[ (])(?:"
+    rb"UID (?P<uid>\d+)"
+    rb"|FLAGS \((?P<flags>[^)]*)\)"
+    rb"|RFC822\.SIZE (?P<size>\d+)"
+    rb'|INTERNALDATE "(?P<internaldate>[^"]*)"'
+    rb"|MODSEQ \((?P<modseq>\d+)\)"
+    rb"|(?P<bodystructure>BODYSTRUCTURE )(?=\()"
+    rb"|[A-Z0-9.]+\[[^\]]*\]"
+    rb'|"(?:[^"\\]|\\.)*"'
+    rb")",
+    re.ASCII,
+)
+# The tokens of a parenthesized list, a literal is announced at the end of a line
+_LIST_TOKEN = re.compile(
+    rb' *(?:(?P<open>\()|(?P<close>\))|"(?P<quoted>(?:[^"\\]|\\.)*)"'
+    rb"|(?P<literal>\{\d+\}$)|(?P<atom>[^ ()\"]+))",
+    re.ASCII,
+)
+_QUOTED_SPECIAL = re.compile(rb"\\(.)")
+_LITERAL = re.compile(
+    rb"(?P<section>[A-Z0-9.]+(?:\[[^\]]*\])?(?:<\d+>)?) \{\d+\}$", re.ASCII
+)
+_INTERNALDATE_FORMAT = "%d-%b-%Y %H:%M:%S %z"
+
+
+class FetchResponse:
+    """
+    The data items of a FETCH response, literals are indexed by the section
+    reported by the server, e.g. "BODY[]" or "BODY[HEADER.FIELDS (FROM)]"
+    """
+
+    __slots__ = (
+        "sequence",
+        "uid",
+        "flags",
+        "size",
+        "internaldate",
+        "modseq",
+        "literals",
+        "_lines",
+        "_bodystructure_at",
+    )
+
+    def __init__(self, sequence: int):
+        self.sequence = sequence
+        self.uid: Optional[str] = None
+        self.flags: Optional[FlagSet] = None
+        self.size: Optional[int] = None
+        self.internaldate: Optional[datetime] = None
+        self.modseq: Optional[int] = None
+        self.literals: Dict[str, bytes] = {}
+        self._lines: List[Tuple[bytes, Optional[bytes]]] = []
+        self._bodystructure_at: Optional[Tuple[int, int]] = None
+
+    @property
+    def text(self) -> bytes:
+        """
+        The response without its literals, e.g. b'1 (UID 4 BODY[] {12} FLAGS ())'
+        """
+        return b"".join(text for text, _ in self._lines)
+
+    @property
+    def bodystructure(self) -> Optional[list]:
+        """
+        The BODYSTRUCTURE of the message as nested lists of strings, numbers and
+        None for NIL, e.g. ["text", "plain", ["charset", "utf-8"], None, ...]
+        """
+        if self._bodystructure_at is None:
+            return None
+        index, position = self._bodystructure_at
+        return parse_list(self._lines[index:], position)
+
+    @property
+    def body(self) -> Optional[bytes]:
+        """
+        The first literal of the response, None if the response has no literal
+        """
+        return next(iter(self.literals.values()), None)
+
+    def _read(self, text: bytes, literal: Optional[bytes]):
+        """
+        Read a line of the response and the literal ending it
+        """
+        self._lines.append((text, literal))
+
+        for item in _ITEM.finditer(text):
+            if item.group("uid") is not None:
+                self.uid = item.group("uid").decode("ascii")
+            elif item.group("flags") is not None:
+                self.flags = FlagSet(
+                    flag.decode("utf8", "replace")
+                    for flag in item.group("flags").split()
+                )
+            elif item.group("size") is not None:
+                self.size = int(item.group("size"))
+            elif item.group("internaldate") is not None:
+                self.internaldate = parse_internaldate(item.group("internaldate"))
+            elif item.group("modseq") is not None:
+                self.modseq = int(item.group("modseq"))
+            elif item.group("bodystructure") is not None:
+                self._bodystructure_at = (len(self._lines) - 1, item.end())
+
+        # Literals of a BODYSTRUCTURE are strings of the structure, not sections
+        match = _LITERAL.search(text) if literal is not None else None
+        if match:
+            self.literals[match.group("section").decode("ascii")] = literal
+
+    def _merge(self, other: "FetchResponse"):
+        """
+        Add the data items of another response about the same message
+        """
+        if other._bodystructure_at is not None:
+            index, position = other._bodystructure_at
+            self._bodystructure_at = (len(self._lines) + index, position)
+        self._lines += other._lines
+        self.literals.update(other.literals)
+        for name in ("flags", "size", "internaldate", "modseq"):
+            value = getattr(other, name)
+            if value is not None:
+                setattr(self, name, value)
+
+
+def parse_internaldate(raw_date: bytes) -> Optional[datetime]:
+    """
+    Parse the INTERNALDATE of a message, e.g. b" 9-Oct-2021 18:27:26 +0000"
+
+    :param raw_date: The date
+    :return: The date or None if it is malformed
+    """
+    try:
+        return datetime.strptime(raw_date.decode("ascii").strip(), _INTERNALDATE_FORMAT)
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def parse_list(lines: List[Tuple[bytes, Optional[bytes]]], position: int = 0) -> list:
+    """
+    Parse the parenthesized list starting at a position of the first line, e.g. a
+    BODYSTRUCTURE, strings are decoded, NIL gives None and numbers give integers
+
+    :param lines: The lines of the response and the literals ending them
+    :param position: The position of the opening parenthesis in the first line
+    :return: The list, an empty list if there is none at the position
+    """
+    tokens = _list_tokens(lines, position)
+    if next(tokens, None) != ("open", None):
+        return []
+    return _read_list(tokens)
+
+
+def _list_tokens(
+    lines: List[Tuple[bytes, Optional[bytes]]], position: int
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Split lines into parentheses and values, literals are read in place of their
+    announcement
+    """
+    for text, literal in lines:
+        token = _LIST_TOKEN.match(text, position)
+        while token and token.end() > position:
+            position = token.end()
+            kind = token.lastgroup
+            if kind == "open" or kind == "close":
+                yield kind, None
+            elif kind == "quoted":
+                quoted = token.group(kind)
+                if b"\\" in quoted:
+                    quoted = _QUOTED_SPECIAL.sub(rb"\1", quoted)
+                yield "value", quoted.decode("utf8", "replace")
+            elif kind == "literal":
+                yield "value", bytes(literal or b"").decode("utf8", "replace")
+            else:
+                yield "value", _atom(token.group(kind))
+            token = _LIST_TOKEN.match(text, position)
+        position = 0
+
+
+def _atom(atom: bytes) -> Any:
+    if atom.upper() == b"NIL":
+        return None
+    if atom.isdigit():
+        return int(atom)
+    return atom.decode("utf8", "replace")
+
+
+def _read_list(tokens: Iterator[Tuple[str, Any]]) -> list:
+    """
+    Read the tokens up to the parenthesis closing the list
+    """
+    items: list = []
+    for kind, value in tokens:
+        if kind == "open":
+            items.append(_read_list(tokens))
+        elif kind == "close":
+            return items
+        else:
+            items.append(value)
+    return items
+
+
+def _lines(raw_response: Iterable[Any]) -> Iterator[Tuple[bytes, Optional[bytes]]]:
+    """
+    Split the raw response into lines and the literals ending them
+    """
+    for part in raw_response:
+        if isinstance(part, tuple):
+            yield part[0], part[1]
+        elif isinstance(part, bytes):
+            yield part, None
+
+
+def iter_fetch_responses(raw_response: Iterable[Any]) -> Iterator[FetchResponse]:
+    """
+    Read the FETCH responses of a raw response in a single pass
+
+    :param raw_response: The raw response as returned by `imaplib.IMAP4.uid`
+    :return: The responses in the order of the server
+    """
+    response: Optional[FetchResponse] = None
+
+    for text, literal in _lines(raw_response):
+        start = _START.match(text)
+        if start:
+            if response is not None:
+                yield response
+            response = FetchResponse(int(start.group("sequence")))
+        elif response is None:
+            continue
+
+        response._read(text, literal)
+
+    if response is not None:
+        yield response
+
+
+def parse_fetch(raw_response: Iterable[Any]) -> Dict[str, FetchResponse]:
+    """
+    Read the FETCH responses of a raw response and index them by the uid reported
+    by the server, unsolicited responses without uid are ignored and the responses
+    about the same message are merged
+
+    :param raw_response: The raw response as returned by `imaplib.IMAP4.uid`
+    :return: The responses indexed by uid
+    """
+    responses: Dict[str, FetchResponse] = {}
+
+    for response in iter_fetch_responses(raw_response):
+        if response.uid is None:
+            continue
+        if response.uid in responses:
+            responses[response.uid]._merge(response)
+        else:
+            responses[response.uid] = response
+
+    return responses
@@ -1,4 +1,6 @@
+import sys
 from enum import Enum
+from typing import FrozenSet, Iterable, Iterator, List, Union
 
 
 class Flag(Enum):
@@ -10,3 +12,242 @@ class Flag(Enum):
     BIT_0 = "$MailFlagBit0"
     BIT_1 = "$MailFlagBit1"
     BIT_2 = "$MailFlagBit2"
+
+
+# A system flag or a custom keyword such as $Forwarded
+AnyFlag = Union[Flag, str]
+
+
+def unique_flags(flags: Iterable[Flag]) -> List[Flag]:
+    """
+    Remove the duplicated flags keeping their order
+
+    :param flags: The flags
+    :return: The flags without duplicates
+    """
+    return list(dict.fromkeys(flags))
+
+
+def format_flags(flags: Iterable[Flag]) -> str:
+    """
+    Format flags as the flag list of an IMAP command
+
+    :param flags: The flags
+    :return: The flag list such as (\\Seen \\Flagged)
+    """
+    return "(" + " ".join(flag_value(flag) for flag in flags) + ")"
+
+
+def flag_value(flag: AnyFlag) -> str:
+    """
+    Get the IMAP representation of a flag
+
+    :param flag: The flag or the keyword
+    :return: The flag such as \\Seen or $Forwarded
+    """
+    return flag.value if isinstance(flag, Flag) else flag
+
+
+# The bit of each flag in a flag bitmask
+FLAG_BITS = {flag: 1 << index for index, flag in enumerate(Flag)}
+
+
+def flags_to_bits(flags: Iterable[Flag]) -> int:
+    """
+    Pack flags into a bitmask
+
+    :param flags: The flags
+    :return: The bitmask, see `ggmail.flag.FLAG_BITS`
+    """
+    bits = 0
+    for flag in flags:
+        bits |= FLAG_BITS[flag]
+    return bits
+
+
+def bits_to_flags(bits: int) -> List[Flag]:
+    """
+    Unpack a bitmask into flags
+
+    :param bits: The bitmask, see `ggmail.flag.FLAG_BITS`
+    :return: The flags in declaration order
+    """
+    return [flag for flag, bit in FLAG_BITS.items() if bits & bit]
+
+
+_FLAGS_BY_VALUE = {flag.value.lower(): flag for flag in Flag}
+_NO_KEYWORDS: FrozenSet[str] = frozenset()
+
+
+def to_flag(value: AnyFlag) -> AnyFlag:
+    """
+    Get the `ggmail.flag.Flag` of a flag value, flags are case-insensitive, other
+    keywords are interned
+
+    :param value: The flag or its IMAP representation
+    :return: The flag or the interned keyword
+    """
+    if isinstance(value, Flag):
+        return value
+    return _FLAGS_BY_VALUE.get(value.lower()) or sys.intern(value)
+
+
+class FlagSet:
+    """
+    Mutable set of flags, members of `ggmail.flag.Flag` are stored as bits, see
+    `ggmail.flag.FLAG_BITS`, and any other keyword as an interned string. Flags can
+    be given as `ggmail.flag.Flag` or as their IMAP representation.
+    """
+
+    __slots__ = ("bits", "keywords")
+
+    def __init__(self, flags: Iterable[AnyFlag] = ()):
+        self.bits = 0
+        self.keywords = _NO_KEYWORDS
+        self.update(flags)
+
+    @classmethod
+    def from_bits(cls, bits: int, keywords: FrozenSet[str] = _NO_KEYWORDS) -> "FlagSet":
+        """
+        Build a set from its bitmask and its keywords
+
+        :param bits: The bitmask, see `ggmail.flag.FLAG_BITS`
+        :param keywords: The interned keywords
+        :return: The set
+        """
+        flags = cls()
+        flags.bits = bits
+        flags.keywords = keywords
+        return flags
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value) -> "FlagSet":
+        if isinstance(value, FlagSet):
+            return value
+        if isinstance(value, (str, Flag)):
+            raise TypeError("a collection of flags is required")
+        return cls(value)
+
+    def __contains__(self, flag: AnyFlag) -> bool:
+        flag = to_flag(flag)
+        if isinstance(flag, Flag):
+            return bool(self.bits & FLAG_BITS[flag])
+        return flag in self.keywords
+
+    def __iter__(self) -> Iterator[AnyFlag]:
+        yield from bits_to_flags(self.bits)
+        yield from sorted(self.keywords)
+
+    def __len__(self) -> int:
+        return bin(self.bits).count("1") + len(self.keywords)
+
+    def __bool__(self) -> bool:
+        return bool(self.bits or self.keywords)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, set, frozenset)):
+            other = FlagSet(other)
+        if not isinstance(other, FlagSet):
+            return NotImplemented
+        return self.bits == other.bits and self.keywords == other.keywords
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FlagSet({list(self)!r})"
+
+    def __or__(self, other: Iterable[AnyFlag]) -> "FlagSet":
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def __sub__(self, other: Iterable[AnyFlag]) -> "FlagSet":
+        result = self.copy()
+        result.difference_update(other)
+        return result
+
+    def __and__(self, other: Iterable[AnyFlag]) -> "FlagSet":
+        other = FlagSet.validate(other)
+        return FlagSet.from_bits(self.bits & other.bits, self.keywords & other.keywords)
+
+    def __ior__(self, other: Iterable[AnyFlag]) -> "FlagSet":
+        self.update(other)
+        return self
+
+    def __isub__(self, other: Iterable[AnyFlag]) -> "FlagSet":
+        self.difference_update(other)
+        return self
+
+    def copy(self) -> "FlagSet":
+        return FlagSet.from_bits(self.bits, self.keywords)
+
+    def add(self, flag: AnyFlag):
+        """
+        Add a flag
+
+        :param flag: The flag
+        """
+        flag = to_flag(flag)
+        if isinstance(flag, Flag):
+            self.bits |= FLAG_BITS[flag]
+        elif flag not in self.keywords:
+            self.keywords = self.keywords | {flag}
+
+    def discard(self, flag: AnyFlag):
+        """
+        Remove a flag if it is present
+
+        :param flag: The flag
+        """
+        flag = to_flag(flag)
+        if isinstance(flag, Flag):
+            self.bits &= ~FLAG_BITS[flag]
+        elif flag in self.keywords:
+            self.keywords = self.keywords - {flag}
+
+    def remove(self, flag: AnyFlag):
+        """
+        Remove a flag
+
+        :param flag: The flag
+        :raises KeyError: If the flag is not present
+        """
+        if flag not in self:
+            raise KeyError(flag)
+        self.discard(flag)
+
+    def update(self, flags: Iterable[AnyFlag]):
+        """
+        Add several flags
+
+        :param flags: The flags
+        """
+        if isinstance(flags, FlagSet):
+            self.bits |= flags.bits
+            if flags.keywords:
+                self.keywords = self.keywords | flags.keywords
+        else:
+            for flag in flags:
+                self.add(flag)
+
+    def difference_update(self, flags: Iterable[AnyFlag]):
+        """
+        Remove several flags
+
+        :param flags: The flags
+        """
+        if isinstance(flags, FlagSet):
+            self.bits &= ~flags.bits
+            if flags.keywords:
+                self.keywords = self.keywords - flags.keywords
+        else:
+            for flag in flags:
+                self.discard(flag)
+
+    # Kept for code written when flags were a list
+    append = add
+    extend = update
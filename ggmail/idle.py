@@ -0,0 +1,189 @@
+import re
+import select
+import ssl
+from enum import Enum, auto
+from imaplib import IMAP4
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+# Servers drop idling clients after 30 minutes, RFC 2177 advises to re-issue IDLE
+# at least every 29 minutes
+IDLE_RENEWAL = 25 * 60
+
+_CRLF = b"\r\n"
+_EVENT = re.compile(
+    rb"\* (?P<number>\d+) (?P<kind>EXISTS|EXPUNGE|FETCH|RECENT)\b ?(?P<data>.*)",
+    re.ASCII,
+)
+# Sent instead of EXPUNGE once QRESYNC is enabled (RFC 7162)
+_VANISHED = re.compile(rb"\* VANISHED (?P<data>.*)", re.ASCII)
+_LITERAL = re.compile(rb".*{(?P<size>\d+)}$", re.ASCII)
+
+
+class IdleEventKind(Enum):
+    EXISTS = auto()
+    EXPUNGE = auto()
+    FETCH = auto()
+    RECENT = auto()
+    VANISHED = auto()
+
+
+class IdleEvent(BaseModel):
+    """
+    An untagged response received while idling, number is the number of messages
+    for EXISTS and RECENT, the message sequence number for EXPUNGE and FETCH and the
+    number of expunged uids for VANISHED, uids are the expunged uids of VANISHED
+    """
+
+    kind: IdleEventKind
+    number: int
+    data: bytes = b""
+    uids: List[str] = []
+
+
+class Idler:
+    """
+    Drive the IDLE command (RFC 2177) on top of an `imaplib.IMAP4` connection, the
+    connection must not be used for anything else while idling.
+    """
+
+    def __init__(self, imap: IMAP4):
+        self.imap = imap
+        self.tag: Optional[bytes] = None
+        self.pending: List[IdleEvent] = []
+
+    @property
+    def is_idling(self) -> bool:
+        return self.tag is not None
+
+    def _read_response(self) -> bytes:
+        """
+        Read a response line, including its literals if any
+        """
+        line = self.imap._get_line()
+        literal = _LITERAL.match(line)
+
+        while literal:
+            line += _CRLF + self.imap.read(int(literal.group("size")))
+            next_line = self.imap._get_line()
+            line += next_line
+            literal = _LITERAL.match(next_line)
+
+        return line
+
+    def _handle_untagged(self, line: bytes):
+        """
+        Queue the event of an untagged response, other untagged responses are ignored
+
+        :raises IMAP4.abort: If the server closes the connection
+        """
+        if line.startswith(b"* BYE"):
+            raise self.imap.abort(line.decode("utf8", "replace"))
+
+        match = _EVENT.match(line)
+        if match:
+            self.pending.append(
+                IdleEvent(
+                    kind=IdleEventKind[match.group("kind").decode("ascii")],
+                    number=int(match.group("number")),
+                    data=match.group("data"),
+                )
+            )
+            return
+
+        match = _VANISHED.match(line)
+        if match:
+            self.pending.append(
+                IdleEvent(
+                    kind=IdleEventKind.VANISHED, number=0, data=match.group("data")
+                )
+            )
+
+    def _check_completion(self, line: bytes):
+        """
+        Check the tagged response completing the IDLE command
+
+        :raises IMAP4.error: If the server refused the command
+        """
+        self.tag = None
+        if line.split(b" ", 2)[1:2] != [b"OK"]:
+            raise self.imap.error(f"IDLE command error: {line!r}")
+
+    def start(self):
+        """
+        Send IDLE and wait for the server to accept it
+
+        :raises IMAP4.error: If the server refused the command
+        """
+        tag = self.imap._new_tag()
+        self.imap.tagged_commands.pop(tag, None)
+        self.imap.send(tag + b" IDLE" + _CRLF)
+        self.tag = tag
+
+        while True:
+            line = self._read_response()
+            if line.startswith(b"+"):
+                return
+            if line.startswith(b"* "):
+                self._handle_untagged(line)
+            elif line.startswith(tag + b" "):
+                self._check_completion(line)
+
+    def _has_buffered_data(self) -> bool:
+        """
+        Check if data was already received without blocking
+        """
+        sock = self.imap.sock
+        timeout = sock.gettimeout()
+        sock.settimeout(0.0)
+        try:
+            return bool(self.imap.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(timeout)
+
+    def wait(self, timeout: Optional[float]) -> Optional[IdleEvent]:
+        """
+        Wait for the next event
+
+        :param timeout: The maximum number of seconds to wait, None to wait forever
+        :raises IMAP4.abort: If the server closes the connection
+        :return: The event or None if nothing happened before the timeout
+        """
+        while not self.pending:
+            if not self._has_buffered_data():
+                if timeout is not None and timeout <= 0:
+                    return None
+                readable, _, _ = select.select([self.imap.sock], [], [], timeout)
+                if not readable:
+                    return None
+
+            line = self._read_response()
+            if line.startswith(self.tag + b" "):
+                self._check_completion(line)
+                return None
+            self._handle_untagged(line)
+
+        return self.pending.pop(0)
+
+    def done(self) -> List[IdleEvent]:
+        """
+        Send DONE and wait for the end of the IDLE command
+
+        :raises IMAP4.error: If the server refused the command
+        :return: The events received before the end of the command
+        """
+        if self.is_idling:
+            self.imap.send(b"DONE" + _CRLF)
+
+            while self.is_idling:
+                line = self._read_response()
+                if line.startswith(self.tag + b" "):
+                    self._check_completion(line)
+                else:
+                    self._handle_untagged(line)
+
+        events, self.pending = self.pending, []
+        return events
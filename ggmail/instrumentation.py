@@ -0,0 +1,193 @@
+from bisect import bisect_left
+from imaplib import IMAP4, IMAP4_SSL
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket holds
+# every slower observation
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _ByteCounter:
+    """
+    Count the bytes sent and received by an `imaplib.IMAP4` connection
+    """
+
+    bytes_sent = 0
+    bytes_received = 0
+
+    def send(self, data: bytes):
+        self.bytes_sent += len(data)
+        return super().send(data)
+
+    def read(self, size: int) -> bytes:
+        data = super().read(size)
+        self.bytes_received += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        line = super().readline()
+        self.bytes_received += len(line)
+        return line
+
+
+class CountingIMAP4(_ByteCounter, IMAP4):
+    pass
+
+
+class CountingIMAP4_SSL(_ByteCounter, IMAP4_SSL):
+    pass
+
+
+class CommandEvent(BaseModel):
+    """
+    Fired after every IMAP command sent by an account, failed commands carry the
+    name of their error
+    """
+
+    name: str
+    uid_count: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    duration: float
+    error: Optional[str] = None
+
+
+class ParseEvent(BaseModel):
+    """
+    Fired after a server response is turned into messages or mailboxes
+    """
+
+    name: str
+    count: int
+    duration: float
+
+
+Event = Union[CommandEvent, ParseEvent]
+Hook = Callable[[Event], Any]
+
+
+class Histogram(BaseModel):
+    buckets: Sequence[float] = LATENCY_BUCKETS
+    counts: List[int] = []
+    count: int = 0
+    total: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float):
+        """
+        Record a value
+
+        :param value: The value
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Estimate a percentile, the result is the upper bound of the bucket holding
+        it, or the maximum for the last bucket
+
+        :param percent: The percentile between 0 and 100
+        :return: The estimation or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(self.buckets):
+                    return self.buckets[index]
+                return self.maximum
+
+        return self.maximum
+
+
+class CommandStats(BaseModel):
+    latency: Histogram = Field(default_factory=Histogram)
+    uid_count: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    errors: int = 0
+
+
+class MetricsCollector(BaseModel):
+    """
+    Hook keeping in memory a latency histogram and the transferred bytes per IMAP
+    command and a duration histogram per parser, add it to the hooks of an account
+    or of several accounts.
+    """
+
+    commands: Dict[str, CommandStats] = {}
+    parsers: Dict[str, Histogram] = {}
+
+    _lock: Lock = PrivateAttr()
+
+    class Config:
+        copy_on_model_validation = "none"
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self._lock = Lock()
+
+    def __call__(self, event: Event):
+        with self._lock:
+            if isinstance(event, CommandEvent):
+                stats = self.commands.setdefault(event.name, CommandStats())
+                stats.latency.observe(event.duration)
+                stats.uid_count += event.uid_count
+                stats.bytes_sent += event.bytes_sent
+                stats.bytes_received += event.bytes_received
+                if event.error is not None:
+                    stats.errors += 1
+            else:
+                histogram = self.parsers.setdefault(event.name, Histogram())
+                histogram.observe(event.duration)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Copy the metrics to export them
+
+        :return: The metrics as plain dictionaries
+        """
+        with self._lock:
+            return self.dict()
+
+    def reset(self):
+        """
+        Forget every recorded metric
+        """
+        with self._lock:
+            self.commands = {}
+            self.parsers = {}
@@ -1,11 +1,12 @@
 from enum import Enum, auto
-from typing import List
+from typing import Iterator, List, Optional, Type, Union
 
 from pydantic import BaseModel, PrivateAttr
 
-from .message import Message
+from .message import FetchMode, Message, MessageSummary
 from .policy import Policy
 from .policy import all_ as all_policy
+from .sync import MailboxChanges, SyncState
 from .utf7 import decode
 
 
@@ -35,6 +36,16 @@ class Mailbox(BaseModel):
         super().__init__(**data)
         self._account = _account
 
+    @classmethod
+    def _from_trusted(cls, _account, **data) -> "Mailbox":
+        """
+        Build a mailbox from data parsed by the library without validating it, the
+        values must already have the types of the fields
+        """
+        mailbox = cls.construct(**data)
+        mailbox._account = _account
+        return mailbox
+
     def rename(self, label: str):
         """
         Rename the mailbox
@@ -68,30 +79,88 @@ class Mailbox(BaseModel):
         self.select()
         return self._account.search_message_uids(policy)
 
-    def fetch(self, policy: Policy = all_policy) -> List[Message]:
+    def fetch(
+        self, policy: Policy = all_policy, mode: FetchMode = FetchMode.FULL
+    ) -> Union[List[Message], List[MessageSummary]]:
         """
         Search all messages from the mailbox according to the policy, the mailbox become
         the selected mailbox
 
         :param policy: The policy to fetch messages, defaults to all_
+        :param mode: The part of the messages to fetch, defaults to FetchMode.FULL
         :return: The list of messages
         """
         self.select()
-        return self._account.fetch_messages(policy)
+        return self._account.fetch_messages(policy, mode)
 
-    def search(self, policy: Policy = all_policy) -> List[Message]:
+    def search(
+        self, policy: Policy = all_policy, mode: FetchMode = FetchMode.FULL
+    ) -> Union[List[Message], List[MessageSummary]]:
         """
         Alias of `ggmail.mailbox.Mailbox.fetch`
         """
-        return self.fetch(policy)
+        return self.fetch(policy, mode)
+
+    def iter(
+        self,
+        policy: Policy = all_policy,
+        batch_size: int = 100,
+        mode: FetchMode = FetchMode.FULL,
+    ) -> Iterator[Union[Message, MessageSummary]]:
+        """
+        Iterate over the messages from the mailbox according to the policy, messages
+        are fetched by batch, the mailbox become the selected mailbox
+
+        :param policy: The policy to fetch messages, defaults to all_
+        :param batch_size: The number of messages fetched per command, defaults to 100
+        :param mode: The part of the messages to fetch, defaults to FetchMode.FULL
+        :return: The iterator of messages, of message summaries using
+                 FetchMode.SUMMARY
+        """
+        self.select()
+        return self._account.iter_messages(policy, batch_size, mode)
+
+    def changes_since(self, state: Optional[SyncState] = None) -> MailboxChanges:
+        """
+        Get the changes of the mailbox since a previous synchronization, the mailbox
+        become the selected mailbox
+
+        :param state: The state of the previous synchronization, defaults to None to
+                      get every message of the mailbox
+        :return: The changes, including the state to give to the next call
+        """
+        return self._account.changes_since(state, self)
+
+    def watch(
+        self,
+        policy: Policy = all_policy,
+        timeout: Optional[float] = None,
+        mode: FetchMode = FetchMode.FULL,
+    ) -> Iterator[Union[Message, MessageSummary]]:
+        """
+        Yield the messages arriving in the mailbox according to the policy using
+        IDLE, the mailbox become the selected mailbox
+
+        :param policy: The policy the new messages must match, defaults to all_
+        :param timeout: The number of seconds after which the iteration stops,
+                        defaults to None to never stop
+        :param mode: The part of the messages to fetch, defaults to FetchMode.FULL
+        :return: The iterator of messages, of message summaries using
+                 FetchMode.SUMMARY
+        """
+        self.select()
+        return self._account.watch_messages(policy, timeout, mode)
 
 
-def mailbox_factory(raw_mailbox_description: bytes, account) -> Mailbox:
+def mailbox_factory(
+    raw_mailbox_description: bytes, account, mailbox_class: Type[Mailbox] = Mailbox
+) -> Mailbox:
     """
     Create a mailbox from a raw byte description of the mailbox
 
     :param raw_mailbox_description: The description of the mailbox
     :paam account: The account
+    :param mailbox_class: The class of the created mailbox, defaults to Mailbox
     :return: The mailbox
     """
     mailbox_description = raw_mailbox_description.decode("utf8")
@@ -110,7 +179,7 @@ def mailbox_factory(raw_mailbox_description: bytes, account) -> Mailbox:
         kind_tag = [tag for tag in tags if tag not in ["HasChildren", "HasNoChildren"]]
         kind = MailboxKind.CUSTOM if not kind_tag else MailboxKind[kind_tag[0].upper()]
 
-    return Mailbox(
+    return mailbox_class._from_trusted(
         label=label,
         path=path,
         kind=kind,
@@ -1,15 +1,21 @@
-from datetime import datetime
-from email import message_from_bytes
+import codecs
+import re
+import sys
+from datetime import datetime, timezone
+from email import message_from_string
 from email.header import decode_header
 from email.message import Message as EmailMessage
 from email.utils import parsedate_to_datetime
 from enum import Enum, auto
+from functools import lru_cache
 from imaplib import ParseFlags
-from typing import List, Optional, Tuple
+from mmap import mmap
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from pydantic import BaseModel, PrivateAttr
 
-from .flag import Flag
+from .exception import MessageNotFound
+from .flag import FLAG_BITS, Flag, FlagSet, flag_value
 
 
 class ContentType(Enum):
@@ -17,6 +23,99 @@ class ContentType(Enum):
     TEXT = auto()
 
 
+class FetchMode(Enum):
+    FULL = auto()
+    HEADERS = auto()
+    SUMMARY = auto()
+
+
+HEADER_FIELDS = ("FROM", "TO", "SUBJECT", "DATE", "CONTENT-TYPE")
+CONTENT_FIELDS = ("body", "html", "encoding")
+# A raw message as received from the server, or a view of it, huge messages are
+# received as a mapping of a temporary file, see `ggmail.transport`
+RawMessage = Union[bytes, bytearray, memoryview, mmap]
+# Tried in order after the declared charset, latin_1 decodes any byte
+FALLBACK_ENCODINGS = ("utf-8", "latin_1")
+# Number of bytes of a part fetched per command while streaming it
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_HEADER_END = re.compile(rb"\r?\n\r?\n")
+_LINE_BREAK = re.compile(rb"\r?\n")
+# A field and its folded lines, the value keeps the folding like the compat32 policy
+_HEADER_FIELD = re.compile(
+    r"^(?P<name>[\x21-\x39\x3b-\x7e]+):[ \t]*(?P<value>.*(?:\r?\n[ \t].*)*)",
+    re.MULTILINE,
+)
+
+
+class Attachment(BaseModel):
+    """
+    A part of a message listed from its BODYSTRUCTURE without downloading it, the
+    size is the one of the part as transferred, e.g. before base64 decoding. It is
+    downloaded from the mailbox it was listed from.
+    """
+
+    uid: str
+    part: str
+    filename: Optional[str]
+    content_type: str
+    size: int
+    encoding: str
+
+    _account = PrivateAttr()
+    _mailbox = PrivateAttr(None)
+
+    def __init__(self, _account, _mailbox=None, **data):
+        super().__init__(**data)
+        self._account = _account
+        self._mailbox = _mailbox
+
+    @classmethod
+    def _from_trusted(cls, _account, _mailbox=None, **data) -> "Attachment":
+        """
+        Build an attachment from data parsed by the library without validating it,
+        the values must already have the types of the fields
+        """
+        attachment = cls.construct(**data)
+        attachment._account = _account
+        attachment._mailbox = _mailbox
+        return attachment
+
+    def download(self) -> bytes:
+        """
+        Download the attachment using a single command
+
+        :return: The decoded content
+        """
+        return _part_account(self._account).download_part(
+            self.uid, self.part, self.encoding, mailbox=self._mailbox
+        )
+
+    def stream(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Download the attachment chunk by chunk, only one chunk is held in memory
+
+        :param chunk_size: The number of bytes fetched per command
+        :return: The iterator of decoded chunks
+        """
+        return _part_account(self._account).stream_part(
+            self.uid, self.part, self.encoding, chunk_size, mailbox=self._mailbox
+        )
+
+
+def _part_account(account):
+    """
+    Check the account of a message can list and download its parts, only
+    `ggmail.account.Account` can
+    """
+    if not hasattr(account, "fetch_attachments_using_uids"):
+        raise NotImplementedError(
+            f"{type(account).__name__} cannot list or download attachments, use "
+            "ggmail.account.Account"
+        )
+    return account
+
+
 class Message(BaseModel):
     uid: str
     from_: str
@@ -24,16 +123,151 @@ class Message(BaseModel):
     subject: str
     body: Optional[str]
     html: Optional[str]
+    encoding: Optional[str] = None
     date: datetime
     content_type: ContentType
-    flags: List[Flag]
+    flags: FlagSet
 
     _account = PrivateAttr()
+    _mailbox = PrivateAttr(None)
+    _loader: Optional["ContentLoader"] = PrivateAttr(None)
+    _raw: Optional[RawMessage] = PrivateAttr(None)
+    _raw_view: Optional[memoryview] = PrivateAttr(None)
+    _attachments: Optional[List[Attachment]] = PrivateAttr(None)
+
+    class Config:
+        json_encoders = {FlagSet: lambda flags: [flag_value(flag) for flag in flags]}
 
     def __init__(self, _account, **data):
         super().__init__(**data)
         self._account = _account
 
+    @classmethod
+    def _from_trusted(cls, _account, **data) -> "Message":
+        """
+        Build a message from data parsed by the library without validating it, the
+        values must already have the types of the fields
+        """
+        message = cls.construct(**data)
+        message._account = _account
+        return message
+
+    def __getattr__(self, name: str):
+        if name in CONTENT_FIELDS:
+            if self._raw is not None:
+                self._decode_content()
+                return self.__dict__[name]
+            if self._loader is not None:
+                self._loader.load()
+                return self.__dict__[name]
+        raise AttributeError(f"'Message' object has no attribute '{name}'")
+
+    def _iter(self, *args, **kwargs):
+        # The content is decoded or loaded before exporting or comparing the message
+        if self._raw is not None:
+            self._decode_content()
+        elif self._loader is not None:
+            self._loader.load()
+        return super()._iter(*args, **kwargs)
+
+    @property
+    def raw(self) -> Optional[memoryview]:
+        """
+        The raw message as received from the server when the account keeps raw
+        messages, see `ggmail.account.Account.keep_raw`, the view shares the buffer
+        of the FETCH response so the message is never copied
+
+        :return: The raw message or None if it was not kept
+        """
+        return self._raw_view
+
+    def _defer_content(self, raw_message: RawMessage, keep: bool = False):
+        """
+        Keep the raw message and decode its content on first access, the raw
+        message is kept after decoding if asked
+        """
+        for field in CONTENT_FIELDS:
+            self.__dict__.pop(field, None)
+        self._raw = raw_message
+        if keep:
+            self._raw_view = memoryview(raw_message)
+
+    def _decode_content(self):
+        """
+        Parse the MIME tree of the raw message to decode its body, html and their
+        encoding, fields assigned in the meantime are kept
+        """
+        raw_message, self._raw = self._raw, None
+        if isinstance(raw_message, mmap):
+            content = decode_content_from_buffer(raw_message)
+        else:
+            content = decode_content_with_encoding(parse_mime(raw_message))
+        for field, value in zip(CONTENT_FIELDS, content):
+            self.__dict__.setdefault(field, value)
+
+    @property
+    def attachments(self) -> List[Attachment]:
+        """
+        The attachments of the message, listed from its BODYSTRUCTURE the first time
+        they are accessed without downloading them, the mailbox the message was
+        fetched from is selected if needed
+
+        :raises NotImplementedError: If the account cannot download parts
+        :return: The attachments in the order of the message
+        """
+        if self._attachments is None:
+            attachments = _part_account(self._account).fetch_attachments_using_uids(
+                [self.uid], mailbox=self._mailbox
+            )
+            self._attachments = attachments.get(self.uid, [])
+        return self._attachments
+
+    def _part_encoding(self, part: Union[Attachment, str]) -> Tuple[str, Optional[str]]:
+        """
+        Find the part number and the transfer encoding of a part, the encoding of a
+        part number is the one of the attachment with this number if any
+        """
+        if not isinstance(part, str):
+            return part.part, part.encoding
+        for attachment in self.attachments:
+            if attachment.part == part:
+                return part, attachment.encoding
+        return part, None
+
+    def download(self, part: Union[Attachment, str]) -> bytes:
+        """
+        Download a part of the message using a single command, the mailbox the
+        message was fetched from is selected if needed
+
+        :param part: An attachment or a part number such as "2" or "2.1", parts
+                     which are not attachments are returned as transferred
+        :raises NotImplementedError: If the account cannot download parts
+        :return: The decoded part
+        """
+        number, encoding = self._part_encoding(part)
+        return _part_account(self._account).download_part(
+            self.uid, number, encoding, mailbox=self._mailbox
+        )
+
+    def stream(
+        self, part: Union[Attachment, str], chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Download a part of the message chunk by chunk using partial fetches, only one
+        chunk is held in memory, the mailbox the message was fetched from is selected
+        if needed
+
+        :param part: An attachment or a part number such as "2" or "2.1", parts
+                     which are not attachments are returned as transferred
+        :param chunk_size: The number of bytes fetched per command
+        :raises NotImplementedError: If the account cannot download parts
+        :return: The iterator of decoded chunks
+        """
+        number, encoding = self._part_encoding(part)
+        return _part_account(self._account).stream_part(
+            self.uid, number, encoding, chunk_size, mailbox=self._mailbox
+        )
+
     def copy(self, mailbox):
         """
         Copy the message to another mailbox
@@ -67,6 +301,22 @@ class Message(BaseModel):
         """
         return self._account.remove_flag_message(self, flag)
 
+    def add_flags_message(self, flags: List[Flag]):
+        """
+        Add several flags to the message using a single command
+
+        :param flags: The flags to add
+        """
+        return self._account.add_flags_messages([self], flags)
+
+    def remove_flags_message(self, flags: List[Flag]):
+        """
+        Remove several flags to the message using a single command
+
+        :param flags: The flags to remove
+        """
+        return self._account.remove_flags_messages([self], flags)
+
     def is_answered(self) -> bool:
         """
         Return if the message is answered
@@ -99,7 +349,7 @@ class Message(BaseModel):
         """
         Add delete flag to the message
         """
-        self.add_flag_message(Flag.DELETED)
+        return self.add_flag_message(Flag.DELETED)
 
     def undelete(self):
         """
@@ -168,6 +418,129 @@ class Message(BaseModel):
         return self.remove_flag_message(Flag.SEEN)
 
 
+class ContentLoader:
+    """
+    Load the body and the html of messages fetched using `FetchMode.HEADERS` the
+    first time one of them is accessed, every pending message of the loader is
+    loaded using a single command.
+    """
+
+    def __init__(self, account, mailbox):
+        self.account = account
+        self.mailbox = mailbox
+        self.messages: List[Message] = []
+
+    def attach(self, message: Message):
+        """
+        Unload the content of the message, it will be loaded on first access
+
+        :param message: The message fetched without its content
+        """
+        for field in CONTENT_FIELDS:
+            message.__dict__.pop(field, None)
+        message._loader = self
+        self.messages.append(message)
+
+    def load(self):
+        """
+        Load the content of every pending message
+        """
+        messages, self.messages = self.messages, []
+        try:
+            self.account.load_message_contents(messages, self.mailbox)
+        except Exception:
+            self.messages = messages + self.messages
+            raise
+
+        for message in messages:
+            message._loader = None
+
+
+class MessageSummary:
+    """
+    Compact description of a message fetched using `FetchMode.SUMMARY`, meant to
+    hold a lot of messages e.g. to find duplicates. Addresses are interned, the
+    date is a UTC timestamp and the flags a bitmask, see `ggmail.flag.FLAG_BITS`,
+    custom keywords are not kept.
+    """
+
+    __slots__ = ("uid", "from_", "to", "subject", "timestamp", "flag_bits", "_account")
+
+    def __init__(
+        self,
+        uid: int,
+        from_: str,
+        to: str,
+        subject: str,
+        timestamp: float,
+        flag_bits: int,
+        _account,
+    ):
+        self.uid = uid
+        self.from_ = sys.intern(from_)
+        self.to = sys.intern(to)
+        self.subject = subject
+        self.timestamp = timestamp
+        self.flag_bits = flag_bits
+        self._account = _account
+
+    def __repr__(self) -> str:
+        return (
+            f"MessageSummary(uid={self.uid}, from_={self.from_!r}, to={self.to!r}, "
+            f"subject={self.subject!r}, timestamp={self.timestamp}, "
+            f"flag_bits={self.flag_bits})"
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, MessageSummary):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def _key(self) -> tuple:
+        return (
+            self.uid,
+            self.from_,
+            self.to,
+            self.subject,
+            self.timestamp,
+            self.flag_bits,
+        )
+
+    @property
+    def date(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp, timezone.utc)
+
+    @property
+    def flags(self) -> FlagSet:
+        return FlagSet.from_bits(self.flag_bits)
+
+    def has_flag(self, flag: Flag) -> bool:
+        """
+        Return if the flag is attached to the message
+
+        :param flag: The flag
+        :return: True if the flag is attached, False else
+        """
+        return bool(self.flag_bits & FLAG_BITS[flag])
+
+    def to_message(self, mode: FetchMode = FetchMode.FULL) -> Message:
+        """
+        Fetch the full message from the selected mailbox, it must be the mailbox of
+        the summary
+
+        :param mode: The part of the message to fetch, defaults to FetchMode.FULL
+        :raises MessageNotFound: If the message does not exist anymore
+        :return: The message
+        """
+        messages = self._account.fetch_messages_using_uids([str(self.uid)], mode)
+        if not messages:
+            raise MessageNotFound(f"Message of uid {self.uid} not found")
+        return messages[0]
+
+
 def _decode_bytes(data: bytes, encoding: str) -> str:
     """
     Internal method to help data.decode to be mockable
@@ -183,26 +556,54 @@ def decode_byte_best_effort(data: bytes, encoding: Optional[str] = None) -> str:
     :param encoding: The guessed encoding
     :return: The string
     """
-    if not isinstance(data, bytes):
-        return data
+    text, _ = decode_text(data, encoding)
+    return text
 
-    base_encodings = ["utf-8", "ascii", "latin_1", "utf_16", "utf_32", "iso8859-1"]
 
-    if encoding is None:
-        encodings = base_encodings
-    else:
-        encodings = [encoding] + base_encodings
+@lru_cache(maxsize=256)
+def lookup_codec(charset: str) -> Optional[str]:
+    """
+    Find the codec of a charset, the lookup is cached because every part of every
+    message declares its charset
+
+    :param charset: The charset, e.g. "UTF8" or "iso-8859-1"
+    :return: The normalized codec name, e.g. "utf-8" or "latin-1", or None if the
+             charset is unknown
+    """
+    try:
+        return codecs.lookup(charset).name
+    except (LookupError, ValueError):
+        return None
 
-    # Transform the list to a fake ordered set
-    encodings = list(dict.fromkeys(encodings))
+
+def decode_text(
+    data: Optional[bytes], charset: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Decode the bytes using their declared charset first then the fallback
+    encodings, see `ggmail.message.FALLBACK_ENCODINGS`
+
+    :param data: The bytes to decode, other values are returned as is
+    :param charset: The declared charset
+    :return: The string, UNKNOWN if every encoding failed, and the codec used
+    """
+    if not isinstance(data, bytes):
+        return data, None
+
+    encodings = (charset, *FALLBACK_ENCODINGS) if charset else FALLBACK_ENCODINGS
+    tried = set()
 
     for encoding in encodings:
+        codec = lookup_codec(encoding)
+        if codec is None or codec in tried:
+            continue
+        tried.add(codec)
         try:
-            return _decode_bytes(data, encoding)
+            return _decode_bytes(data, codec), codec
         except (UnicodeDecodeError, LookupError):
             continue
 
-    return "UNKNOWN"
+    return "UNKNOWN", None
 
 
 def decode_subject(subject: str) -> str:
@@ -224,61 +625,309 @@ def decode_content(message: EmailMessage) -> Tuple[str, Optional[str]]:
     :param message: The message
     :return: The decoded body and html
     """
-    body, html = None, None
+    body, html, _ = decode_content_with_encoding(message)
+    return body, html
+
+
+def decode_content_with_encoding(
+    message: EmailMessage,
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Decode the content using the charset declared by each part
+
+    :param message: The message
+    :return: The decoded body and html and the codec used for the body, or for the
+             html if there is no body
+    """
+    body_part, html_part = None, None
     if message.get_content_maintype() == "multipart":
         for content in message.walk():
             if content.get_content_type() == "text/plain":
-                body = content.get_payload(decode=True)
+                body_part = content
             elif content.get_content_type() == "text/html":
-                html = content.get_payload(decode=True)
+                html_part = content
     elif message.get_content_maintype() == "text":
-        body = message.get_payload()
+        body_part = message
+
+    body, body_encoding = _decode_part(body_part)
+    html, html_encoding = _decode_part(html_part)
+
+    return body, html, body_encoding or html_encoding
+
+
+# A MIME entity of a buffer, its parsed header and the bounds of the entity and of
+# its content
+_BufferEntity = Tuple[EmailMessage, int, int, int]
+
+
+def decode_content_from_buffer(
+    buffer: RawMessage,
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Decode the content like `ggmail.message.decode_content_with_encoding` without
+    parsing the whole message, only the headers of the parts are parsed and only
+    the text parts are copied, other parts such as attachments are skipped
+
+    :param buffer: The raw message, e.g. a mapped file
+    :return: The decoded body and html and the codec used for the body, or for the
+             html if there is no body
+    """
+    entities = _walk_buffer(buffer, 0, len(buffer))
+    top = next(entities)
+    body_entity, html_entity = None, None
+
+    if top[0].get_content_maintype() == "multipart":
+        for entity in entities:
+            if entity[0].get_content_type() == "text/plain":
+                body_entity = entity
+            elif entity[0].get_content_type() == "text/html":
+                html_entity = entity
+    elif top[0].get_content_maintype() == "text":
+        body_entity = top
+
+    body, body_encoding = _decode_part(_parse_entity(buffer, body_entity))
+    html, html_encoding = _decode_part(_parse_entity(buffer, html_entity))
+
+    return body, html, body_encoding or html_encoding
+
+
+def _walk_buffer(buffer: RawMessage, start: int, end: int) -> Iterator[_BufferEntity]:
+    """
+    Walk the MIME entities of buffer[start:end] in the order of
+    `email.message.Message.walk`, the content of the entities is not copied
+    """
+    if _LINE_BREAK.match(buffer, start, end):
+        content_start = start  # The entity has no header
+    else:
+        header_end = _HEADER_END.search(buffer, start, end)
+        content_start = header_end.end() if header_end else end
+
+    header = parse_mime(buffer[start:content_start])
+    yield header, start, content_start, end
+
+    if header.get_content_maintype() == "multipart":
+        boundary = header.get_boundary()
+        if boundary is not None:
+            yield from _walk_multipart(buffer, content_start, end, boundary)
+    elif header.get_content_type() == "message/rfc822" and content_start < end:
+        yield from _walk_buffer(buffer, content_start, end)
+
+
+def _walk_multipart(
+    buffer: RawMessage, start: int, end: int, boundary: str
+) -> Iterator[_BufferEntity]:
+    """
+    Walk the parts of a multipart content delimited by the boundary
+    """
+    escaped = re.escape(boundary.encode("ascii", "surrogateescape"))
+    delimiter = re.compile(
+        rb"^--" + escaped + rb"(?P<close>--)?[ \t]*(?:\r?\n|$)", re.MULTILINE
+    )
+    part_start = None
+
+    for match in delimiter.finditer(buffer, start, end):
+        if part_start is not None:
+            # The line break before a delimiter belongs to the delimiter
+            part_end = _strip_line_break(buffer, part_start, match.start())
+            yield from _walk_buffer(buffer, part_start, part_end)
+        if match.group("close"):
+            return
+        part_start = match.end()
+
+    if part_start is not None:
+        # The closing delimiter is missing, the last part ends with the content
+        yield from _walk_buffer(
+            buffer, part_start, _strip_line_break(buffer, part_start, end)
+        )
+
+
+def _strip_line_break(buffer: RawMessage, start: int, end: int) -> int:
+    """
+    Find the end of buffer[start:end] without its final line break
+    """
+    if end > start and buffer[end - 1] == ord("\n"):
+        end -= 1
+        if end > start and buffer[end - 1] == ord("\r"):
+            end -= 1
+    return end
+
+
+def _parse_entity(
+    buffer: RawMessage, entity: Optional[_BufferEntity]
+) -> Optional[EmailMessage]:
+    """
+    Parse a single entity of a buffer
+    """
+    if entity is None:
+        return None
+    _, start, _, end = entity
+    return parse_mime(buffer[start:end])
 
-    return decode_byte_best_effort(body), decode_byte_best_effort(html)
 
+def _decode_part(part: Optional[EmailMessage]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Decode the payload of a text part
+    """
+    if part is None:
+        return None, None
+    return decode_text(part.get_payload(decode=True), part.get_content_charset())
 
-def decode_flags(header: bytes) -> List[Flag]:
+
+def decode_flags(header: bytes) -> FlagSet:
     """
-    Decode flags from the header
+    Decode flags from the header, unknown keywords are kept as strings
 
     :param header: The header
     :return: The message flags
     """
     raw_flags = ParseFlags(header)
-    return [Flag(decode_byte_best_effort(flag, "ascii")) for flag in raw_flags]
+    return FlagSet(flag.decode("utf8", "replace") for flag in raw_flags)
 
 
 def get_content_type(content_type: str) -> ContentType:
     return ContentType.MULTIPART if content_type == "multipart" else ContentType.TEXT
 
 
-def message_factory(uid: str, raw_message_description: List[bytes], account) -> Message:
+def parse_mime(raw_message: RawMessage) -> EmailMessage:
     """
-    Create a message from a raw byte description of the message
+    Parse the MIME tree of a raw message, like `email.message_from_bytes` but the
+    text is decoded straight from the buffer so a view is never copied to bytes
+
+    :param raw_message: The raw message
+    :return: The MIME tree
+    """
+    return message_from_string(str(raw_message, "ascii", "surrogateescape"))
+
+
+def parse_header(raw_message: RawMessage) -> Dict[str, str]:
+    """
+    Parse only the header of a raw message, the content is neither copied nor
+    parsed into a MIME tree
+
+    :param raw_message: The raw message or its header
+    :return: The first value of each field indexed by lowercase field name
+    """
+    end = _HEADER_END.search(raw_message)
+    raw_header = bytes(raw_message[: end.end()] if end is not None else raw_message)
+    header: Dict[str, str] = {}
+
+    if raw_header.isascii():
+        text = raw_header.decode("ascii")
+    else:
+        # Raw 8-bit headers are UTF-8 (RFC 6532) or, for old mailers, latin_1
+        text, _ = decode_text(raw_header)
+
+    for field in _HEADER_FIELD.finditer(text):
+        value = field.group("value").rstrip("\r\n")
+        header.setdefault(field.group("name").lower(), value)
+
+    return header
+
+
+def get_content_maintype(content_type: Optional[str]) -> str:
+    """
+    Get the main type of a Content-Type header value, text by default as in
+    `email.message.Message.get_content_maintype`
+
+    :param content_type: The value of the header
+    :return: The main type
+    """
+    if content_type is None:
+        return "text"
+
+    full_type = content_type.split(";", 1)[0].strip().lower()
+    if full_type.count("/") != 1:
+        return "text"
+
+    return full_type.split("/")[0]
+
+
+def message_factory(
+    uid: str, raw_message_description: List[bytes], account, keep_raw: bool = False
+) -> Message:
+    """
+    Create a message from a raw byte description of the message, the raw message is
+    dropped once decoded unless it is kept, then the body and the html are decoded
+    the first time one of them is accessed
 
     :param uid: The uid of the message
     :param raw_message_description: The description of the message
     :param account: The account
+    :param keep_raw: True to keep a view of the raw message as `Message.raw`
+    :return: The message
+    """
+    raw_header, raw_message = raw_message_description
+    message = _message_from_header(uid, raw_header, parse_header(raw_message), account)
+    message._defer_content(raw_message, keep=keep_raw)
+    if not keep_raw:
+        message._decode_content()
+
+    return message
+
+
+def header_message_factory(
+    uid: str, raw_message_description: List[bytes], account
+) -> Message:
+    """
+    Create a message without its content from a raw byte description of the message
+    headers, see `ggmail.message.HEADER_FIELDS`
+
+    :param uid: The uid of the message
+    :param raw_message_description: The description of the message headers
+    :param account: The account
     :return: The message
     """
     raw_header, raw_message = raw_message_description
-    message = message_from_bytes(raw_message)
-
-    from_ = message["From"]
-    to = message["To"]
-    subject = decode_subject(message["Subject"])
-    body, html = decode_content(message)
-    date = parsedate_to_datetime(message["Date"])
-    content_type = get_content_type(message.get_content_maintype())
+
+    return _message_from_header(uid, raw_header, parse_header(raw_message), account)
+
+
+def summary_factory(
+    uid: str, raw_message_description: List[bytes], account
+) -> MessageSummary:
+    """
+    Create a message summary from a raw byte description of the message headers,
+    see `ggmail.message.HEADER_FIELDS`
+
+    :param uid: The uid of the message
+    :param raw_message_description: The description of the message headers
+    :param account: The account
+    :return: The message summary
+    """
+    raw_header, raw_message = raw_message_description
+    header = parse_header(raw_message)
+
+    return MessageSummary(
+        uid=int(uid),
+        from_=header.get("from", ""),
+        to=header.get("to", ""),
+        subject=decode_subject(header.get("subject")),
+        timestamp=parsedate_to_datetime(header.get("date")).timestamp(),
+        flag_bits=decode_flags(raw_header).bits,
+        _account=account,
+    )
+
+
+def _message_from_header(
+    uid: str, raw_header: bytes, header: Dict[str, str], account
+) -> Message:
+    """
+    Create a message without its content from a parsed header
+    """
+    from_ = header.get("from", "")
+    to = header.get("to", "")
+    subject = decode_subject(header.get("subject"))
+    date = parsedate_to_datetime(header.get("date"))
+    content_type = get_content_type(get_content_maintype(header.get("content-type")))
     flags = decode_flags(raw_header)
 
-    message = Message(
+    message = Message._from_trusted(
         uid=uid,
         from_=from_,
         to=to,
         subject=subject,
-        html=html,
-        body=body,
+        html=None,
+        body=None,
         date=date,
         content_type=content_type,
         flags=flags,
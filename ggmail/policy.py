@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from datetime import date, datetime
+from typing import Union
 
 from pydantic import BaseModel
 
-from .flag import Flag
+from .flag import Flag, flag_value
 
 
 class Policy(ABC, BaseModel):
@@ -82,10 +83,10 @@ class OneDate(Policy):
 
 class OneFlag(Policy):
     intrinsic: str
-    flag: Flag
+    flag: Union[Flag, str]
 
     def to_imap_standard(self):
-        return f"{self.intrinsic} {self.flag.value}"
+        return f"{self.intrinsic} {flag_value(self.flag)}"
 
 
 # TODO field_name should be an enum
@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from threading import Lock
+from typing import Iterator, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .account import Account
+from .authentication import Authentication
+from .cache import MessageCache
+from .exception import PoolClosed, PoolExhausted
+from .instrumentation import Hook
+from .message import Message
+from .policy import Policy
+from .policy import all_ as all_policy
+from .transport import BufferedTransport, Transport
+
+# Put in the idle queue by close to wake up the threads waiting for a session, each
+# woken thread puts it back for the next one
+_CLOSED = object()
+
+
+class AccountPool(BaseModel):
+    authentication: Authentication
+    size: int = 4
+    timeout: Optional[float] = None
+    cache: Optional[MessageCache] = None
+    hooks: List[Hook] = []
+    keep_raw: bool = False
+    transport: Transport = Field(default_factory=BufferedTransport)
+
+    _idle: LifoQueue = PrivateAttr()
+    _accounts: List[Account] = PrivateAttr([])
+    _lock: Lock = PrivateAttr()
+
+    is_closed: bool = False
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self._idle = LifoQueue()
+        self._accounts = []
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def _create_account(self) -> Optional[Account]:
+        """
+        Open and login a new session if the pool is not full
+
+        :return: The new logged account or None if the pool is full
+        """
+        with self._lock:
+            if len(self._accounts) >= self.size:
+                return None
+            account = Account(
+                authentication=self.authentication,
+                cache=self.cache,
+                hooks=self.hooks,
+                keep_raw=self.keep_raw,
+                transport=self.transport,
+            )
+            self._accounts.append(account)
+
+        try:
+            account.login()
+        except Exception:
+            self._discard_account(account)
+            raise
+
+        return account
+
+    def _discard_account(self, account: Account):
+        """
+        Forget a session, the session is closed if possible
+
+        :param account: The session to forget
+        """
+        with self._lock:
+            if account in self._accounts:
+                self._accounts.remove(account)
+
+        if account.is_connected:
+            try:
+                account.logout()
+            except Exception:
+                account.is_connected = False
+
+    def acquire(self) -> Account:
+        """
+        Borrow a logged session from the pool, a new session is opened if none is
+        available and the pool is not full, dead sessions are replaced
+
+        :raises PoolClosed: If the pool is closed
+        :raises PoolExhausted: If no session is released before the timeout
+        :return: The logged session
+        """
+        while True:
+            if self.is_closed:
+                raise PoolClosed("The pool is closed")
+
+            try:
+                account = self._idle.get_nowait()
+            except Empty:
+                account = self._create_account()
+                if account is not None:
+                    return account
+
+                try:
+                    account = self._idle.get(timeout=self.timeout)
+                except Empty:
+                    raise PoolExhausted(
+                        f"No session released in the pool after {self.timeout}s"
+                    )
+
+            if account is _CLOSED:
+                self._idle.put(_CLOSED)
+                raise PoolClosed("The pool is closed")
+
+            if account.is_alive():
+                return account
+
+            self._discard_account(account)
+
+    def release(self, account: Account):
+        """
+        Give back a session to the pool
+
+        :param account: The session borrowed using `acquire`
+        """
+        if self.is_closed:
+            self._discard_account(account)
+        else:
+            self._idle.put(account)
+
+    @contextmanager
+    def account(self) -> Iterator[Account]:
+        """
+        Borrow a logged session from the pool for the duration of the context
+
+        :return: The logged session
+        """
+        account = self.acquire()
+        try:
+            yield account
+        finally:
+            self.release(account)
+
+    def fetch_messages(self, path: str, policy: Policy = all_policy) -> List[Message]:
+        """
+        Search all messages from the mailbox of a particular path using one of the
+        sessions, several threads can fetch at the same time using different sessions
+
+        :param path: The path of the mailbox
+        :param policy: The policy to fetch messages, defaults to all_
+        :return: The list of messages
+        """
+        with self.account() as account:
+            return account.mailbox_from_path(path).fetch(policy)
+
+    def close(self):
+        """
+        Logout every idle session of the pool, borrowed sessions are logged out when
+        they are released and the threads waiting for a session raise PoolClosed
+        """
+        self.is_closed = True
+
+        while True:
+            try:
+                account = self._idle.get_nowait()
+            except Empty:
+                break
+            if account is not _CLOSED:
+                self._discard_account(account)
+
+        self._idle.put(_CLOSED)
@@ -0,0 +1,32 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .flag import FlagSet
+from .message import Message
+
+
+class SyncState(BaseModel):
+    """
+    What is known about a mailbox after a synchronization, the state can be stored
+    using `json` and restored using `parse_raw` between two runs.
+    """
+
+    mailbox: str
+    uidvalidity: Optional[str]
+    uidnext: Optional[int]
+    highestmodseq: Optional[int]
+    uids: str = ""
+
+
+class MailboxChanges(BaseModel):
+    """
+    The changes of a mailbox since a previous `ggmail.sync.SyncState`, when the
+    UIDVALIDITY changed every message is reported as new and `is_full` is True.
+    """
+
+    state: SyncState
+    new_messages: List[Message]
+    flag_changes: Dict[str, FlagSet]
+    expunged_uids: List[str]
+    is_full: bool = False
@@ -0,0 +1,220 @@
+from imaplib import (
+    _MAXLINE,
+    IMAP4,
+    IMAP4_SSL,
+    Continuation,
+    Response_code,
+    Untagged_response,
+)
+from mmap import ACCESS_READ, mmap
+from tempfile import TemporaryFile
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+from .instrumentation import CountingIMAP4, CountingIMAP4_SSL, _ByteCounter
+
+# Size in bytes of the receive buffer of the buffered transport, large enough to
+# read many small responses from a single recv call
+DEFAULT_BUFFER_SIZE = 256 * 1024
+
+
+class _BufferedReader:
+    """
+    Read the responses of an `imaplib.IMAP4` connection through a large receive
+    buffer, literals larger than the buffer are read straight into a preallocated
+    bytearray and responses are parsed without the per-line bookkeeping of
+    imaplib, which is only kept when debugging. Literals larger than the spill
+    threshold are written to a temporary file which is mapped in memory.
+    """
+
+    buffer_size = DEFAULT_BUFFER_SIZE
+    spill_threshold: Optional[int] = None
+    spill_directory: Optional[str] = None
+
+    def __init__(
+        self,
+        *args,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        spill_threshold: Optional[int] = None,
+        spill_directory: Optional[str] = None,
+        **kwargs,
+    ):
+        # imaplib opens the connection from its constructor
+        self.buffer_size = buffer_size
+        self.spill_threshold = spill_threshold
+        self.spill_directory = spill_directory
+        super().__init__(*args, **kwargs)
+
+    def open(self, *args, **kwargs):
+        super().open(*args, **kwargs)
+        self.file.close()
+        self.file = self.sock.makefile("rb", buffering=self.buffer_size)
+
+    def readline(self) -> bytes:
+        line = self.file.readline(_MAXLINE + 1)
+        if len(line) > _MAXLINE:
+            raise self.error(f"got more than {_MAXLINE} bytes")
+        return line
+
+    def read(self, size: int) -> Union[bytes, bytearray, mmap]:
+        if self.spill_threshold is not None and size > self.spill_threshold:
+            return self._spill(size)
+
+        if size <= self.buffer_size:
+            return self.file.read(size)
+
+        literal = bytearray(size)
+        received = 0
+
+        with memoryview(literal) as view:
+            while received < size:
+                count = self.file.readinto(view[received:])
+                if not count:
+                    break
+                received += count
+
+        if received < size:
+            del literal[received:]
+        return literal
+
+    def _spill(self, size: int) -> Union[bytes, mmap]:
+        """
+        Write a literal to an anonymous temporary file and map it in memory, at
+        most one buffer of the literal is held in memory while receiving it
+        """
+        chunk = bytearray(min(size, self.buffer_size))
+        remaining = size
+
+        with TemporaryFile(dir=self.spill_directory) as file:
+            with memoryview(chunk) as view:
+                while remaining:
+                    count = self.file.readinto(view[: min(remaining, len(chunk))])
+                    if not count:
+                        break
+                    file.write(view[:count])
+                    remaining -= count
+
+            if remaining == size:
+                return b""
+            file.flush()
+            # The mapping stays valid once the file is closed
+            return mmap(file.fileno(), 0, access=ACCESS_READ)
+
+    def _get_line(self) -> bytes:
+        if self.debug:
+            return super()._get_line()
+
+        line = self.readline()
+        if not line.endswith(b"\r\n"):
+            if not line:
+                raise self.abort("socket error: EOF")
+            raise self.abort(f"socket error: unterminated line: {line!r}")
+
+        return line[:-2]
+
+    def _get_response(self) -> Optional[bytes]:
+        """
+        Read a response and store it, same as `imaplib.IMAP4._get_response`
+
+        :return: The first line of the response or None for a continuation request
+        """
+        if self.debug:
+            return super()._get_response()
+
+        response = self._get_line()
+        untagged = self.untagged_responses
+
+        match = self.tagre.match(response)
+        if match:
+            tag = match.group("tag")
+            if tag not in self.tagged_commands:
+                raise self.abort(f"unexpected tagged response: {response!r}")
+            kind = str(match.group("type"), self._encoding)
+            data = match.group("data")
+            self.tagged_commands[tag] = (kind, [data])
+        else:
+            match = Untagged_response.match(response)
+            if match:
+                data = match.group("data") or b""
+            else:
+                match = self.Untagged_status.match(response)
+                if match is None:
+                    continuation = Continuation.match(response)
+                    if continuation is None:
+                        raise self.abort(f"unexpected response: {response!r}")
+                    self.continuation_response = continuation.group("data")
+                    return None
+                data = match.group("data")
+                if match.group("data2"):
+                    data += b" " + match.group("data2")
+
+            kind = str(match.group("type"), self._encoding)
+            responses = untagged.setdefault(kind, [])
+
+            literal = self.Literal.match(data)
+            while literal:
+                responses.append((data, self.read(int(literal.group("size")))))
+                data = self._get_line()
+                literal = self.Literal.match(data)
+
+            responses.append(data)
+
+        if kind in ("OK", "NO", "BAD"):
+            code = Response_code.match(data)
+            if code:
+                code_kind = str(code.group("type"), self._encoding)
+                untagged.setdefault(code_kind, []).append(code.group("data") or b"")
+
+        return response
+
+
+class BufferedIMAP4(_ByteCounter, _BufferedReader, IMAP4):
+    pass
+
+
+class BufferedIMAP4_SSL(_ByteCounter, _BufferedReader, IMAP4_SSL):
+    pass
+
+
+class Transport(BaseModel):
+    """
+    Open the connections of an account using the read path of imaplib as is
+    """
+
+    def open(self, host: str, port: int, secure: bool) -> IMAP4:
+        """
+        Open a connection counting the transferred bytes
+
+        :param host: The host of the server
+        :param port: The port of the server
+        :param secure: False to connect without TLS
+        :return: The connection
+        """
+        if secure:
+            return CountingIMAP4_SSL(host, port)
+        return CountingIMAP4(host, port)
+
+
+class BufferedTransport(Transport):
+    """
+    Open the connections of an account with a large receive buffer, literals are
+    read into preallocated bytearrays. To bound the memory used by huge messages,
+    set a spill threshold: larger literals are received in a temporary file mapped
+    in memory, the content of such messages is decoded from the mapping without
+    parsing or copying their attachments.
+    """
+
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+    spill_threshold: Optional[int] = None
+    spill_directory: Optional[str] = None
+
+    def open(self, host: str, port: int, secure: bool) -> IMAP4:
+        imap_class = BufferedIMAP4_SSL if secure else BufferedIMAP4
+        return imap_class(
+            host,
+            port,
+            buffer_size=self.buffer_size,
+            spill_threshold=self.spill_threshold,
+            spill_directory=self.spill_directory,
+        )
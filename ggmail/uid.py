@@ -0,0 +1,105 @@
+from typing import Iterable, List, Tuple
+
+DEFAULT_MAX_UID_SET_SIZE = 8000
+
+
+def uid_ranges(uids: Iterable[str]) -> List[Tuple[int, int]]:
+    """
+    Group uids into ranges of consecutive uids
+
+    :param uids: The uids, in any order, duplicates are ignored
+    :return: The sorted list of inclusive ranges
+    """
+    ranges: List[Tuple[int, int]] = []
+
+    for uid in sorted({int(uid) for uid in uids}):
+        if ranges and ranges[-1][1] == uid - 1:
+            ranges[-1] = (ranges[-1][0], uid)
+        else:
+            ranges.append((uid, uid))
+
+    return ranges
+
+
+def _format_range(start: int, end: int) -> str:
+    return str(start) if start == end else f"{start}:{end}"
+
+
+def compress_uids(uids: Iterable[str]) -> str:
+    """
+    Build the compact uid set of an IMAP command, consecutive uids are written as
+    ranges, e.g. ["1", "2", "3", "7"] gives "1:3,7"
+
+    :param uids: The uids
+    :return: The uid set
+    """
+    return ",".join(_format_range(start, end) for start, end in uid_ranges(uids))
+
+
+def chunk_uids(
+    uids: Iterable[str], max_size: int = DEFAULT_MAX_UID_SET_SIZE
+) -> List[List[str]]:
+    """
+    Split uids into chunks whose compact uid set does not exceed a number of bytes,
+    a single range is never split
+
+    :param uids: The uids
+    :param max_size: The maximum size of the uid set of a chunk in bytes
+    :return: The sorted chunks of uids
+    """
+    chunks: List[List[str]] = []
+    size = 0
+
+    for start, end in uid_ranges(uids):
+        token_size = len(_format_range(start, end))
+        range_uids = [str(uid) for uid in range(start, end + 1)]
+
+        if chunks and size + 1 + token_size <= max_size:
+            chunks[-1].extend(range_uids)
+            size += 1 + token_size
+        else:
+            chunks.append(range_uids)
+            size = token_size
+
+    return chunks
+
+
+def expand_uids(uid_set: str) -> List[str]:
+    """
+    Expand a uid set into its uids, the inverse of `ggmail.uid.compress_uids`
+
+    :param uid_set: The uid set, e.g. "1:3,7"
+    :return: The list of uids
+    """
+    uids: List[str] = []
+
+    for token in uid_set.split(","):
+        if not token:
+            continue
+        start, _, end = token.partition(":")
+        first, last = sorted((int(start), int(end or start)))
+        uids.extend(str(uid) for uid in range(first, last + 1))
+
+    return uids
+
+
+def count_uids(uid_set: str) -> int:
+    """
+    Count the uids of a uid set without expanding it, a range ending with * counts
+    as a single uid since its end is only known by the server
+
+    :param uid_set: The uid set, e.g. "1:3,7"
+    :return: The number of uids
+    """
+    count = 0
+
+    for token in uid_set.split(","):
+        if not token:
+            continue
+        start, _, end = token.partition(":")
+        if "*" in token:
+            count += 1
+        else:
+            count += abs(int(end or start) - int(start)) + 1
+
+    return count
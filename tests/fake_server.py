@@ -0,0 +1,695 @@
+"""
+Local stand-in IMAP server serving synthetic mailboxes, used by the integration
+tests and the benchmarks. Only the part of IMAP4rev1 used by ggmail is supported.
+"""
+import re
+import shutil
+import socketserver
+import ssl
+import subprocess
+import threading
+import time
+from email import message_from_bytes
+from email.message import EmailMessage
+from email.message import Message as MIMEEntity
+from email.policy import SMTP
+from email.utils import collapse_rfc2231_value
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+CRLF = b"\r\n"
+DEFAULT_CAPABILITIES = ("IMAP4rev1", "MOVE", "UIDPLUS")
+STRUCTURES = ("text", "multipart", "attachment")
+
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|\(|\)|[^\s()]+')
+_HEADER_FIELDS = re.compile(rb"HEADER\.FIELDS \((?P<fields>[^)]*)\)", re.IGNORECASE)
+_SECTION = re.compile(
+    rb"BODY(?:\.PEEK)?\[(?P<part>\d+(?:\.\d+)*)\]"
+    rb"(?:<(?P<origin>\d+)\.(?P<length>\d+)>)?",
+    re.IGNORECASE,
+)
+_LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. "
+)
+
+
+class FakeMessage:
+    def __init__(self, uid: int, raw: bytes, flags: Sequence[str] = ()):
+        self.uid = uid
+        self.raw = raw
+        self.flags: Set[str] = set(flags)
+        self._mime: Optional[MIMEEntity] = None
+
+    def mime(self) -> MIMEEntity:
+        if self._mime is None:
+            self._mime = message_from_bytes(self.raw)
+        return self._mime
+
+    def bodystructure(self) -> bytes:
+        return _bodystructure(self.mime())
+
+    def section(self, part: str) -> Optional[bytes]:
+        """
+        Build the response of BODY[<part>], e.g. BODY[2.1], None if there is no part
+        """
+        entity = self.mime()
+
+        for index in part.split("."):
+            if entity.get_content_type() == "message/rfc822":
+                entity = entity.get_payload(0)
+            if entity.is_multipart():
+                children = entity.get_payload()
+                if not 1 <= int(index) <= len(children):
+                    return None
+                entity = children[int(index) - 1]
+            elif index != "1":
+                return None
+
+        return _entity_body(entity)
+
+    def header(self) -> bytes:
+        end = self.raw.find(CRLF + CRLF)
+        return self.raw if end == -1 else self.raw[: end + 4]
+
+    def header_fields(self, fields: Sequence[bytes]) -> bytes:
+        """
+        Build the response of BODY[HEADER.FIELDS (...)]
+        """
+        wanted = {field.upper() for field in fields}
+        kept: List[bytes] = []
+        keep = False
+
+        for line in self.header().split(CRLF):
+            if line[:1] in (b" ", b"\t"):
+                if keep:
+                    kept.append(line)
+                continue
+            name = line.split(b":", 1)[0].strip().upper()
+            keep = name in wanted
+            if keep:
+                kept.append(line)
+
+        return CRLF.join(kept) + CRLF + CRLF
+
+
+class FakeMailbox:
+    def __init__(
+        self,
+        name: str,
+        messages: Sequence[FakeMessage] = (),
+        attributes: Sequence[str] = (),
+        uidvalidity: int = 1,
+    ):
+        self.name = name
+        self.messages: List[FakeMessage] = list(messages)
+        self.attributes = list(attributes)
+        self.uidvalidity = uidvalidity
+        self.uidnext = max((message.uid for message in self.messages), default=0) + 1
+
+    def append(self, raw: bytes, flags: Sequence[str] = ()) -> FakeMessage:
+        message = FakeMessage(self.uidnext, raw, flags)
+        self.uidnext += 1
+        self.messages.append(message)
+        return message
+
+    def sequence_numbers(self) -> Dict[int, int]:
+        return {message.uid: number for number, message in enumerate(self.messages, 1)}
+
+    def remove(self, uids: Set[int]):
+        self.messages = [
+            message for message in self.messages if message.uid not in uids
+        ]
+
+    def by_uids(self, uids: Set[int]) -> List[FakeMessage]:
+        return [message for message in self.messages if message.uid in uids]
+
+
+def _lorem(size: int) -> str:
+    """
+    Build a deterministic text of about size bytes wrapped at 76 characters
+    """
+    text = (_LOREM * (size // len(_LOREM) + 1))[:size]
+    lines = []
+    for start in range(0, len(text), 76):
+        end = start + 76
+        lines.append(text[start:end])
+    return "\n".join(lines)
+
+
+def make_message(uid: int, size: int = 2048, structure: str = "text") -> bytes:
+    """
+    Build a deterministic raw message
+
+    :param uid: The uid, used in the subject and the boundaries
+    :param size: The approximate size of the content in bytes
+    :param structure: text, multipart (text and html) or attachment (text and
+                      binary attachment)
+    :return: The raw message with CRLF line endings
+    """
+    message = EmailMessage()
+    message["From"] = f"sender{uid % 10}@example.com"
+    message["To"] = "recipient@example.com"
+    message["Subject"] = f"Message {uid}"
+    message["Date"] = "Sat, 09 Oct 2021 18:27:26 +0200"
+    message["Message-ID"] = f"<{uid}@example.com>"
+
+    if structure == "text":
+        message.set_content(_lorem(size))
+    elif structure == "multipart":
+        message.set_content(_lorem(size // 2))
+        message.add_alternative(f"<html><p>{_lorem(size // 2)}</p></html>", "html")
+        message.set_boundary(f"alternative-{uid}")
+    elif structure == "attachment":
+        message.set_content(_lorem(256))
+        attachment = bytes(index % 256 for index in range(size))
+        message.add_attachment(
+            attachment, "application", "octet-stream", filename=f"file-{uid}.bin"
+        )
+        message.set_boundary(f"mixed-{uid}")
+    else:
+        raise ValueError(f"Unknown structure {structure}, use one of {STRUCTURES}")
+
+    return message.as_bytes(policy=SMTP)
+
+
+def _quote(value: Optional[str]) -> bytes:
+    if value is None:
+        return b"NIL"
+    return b'"' + value.replace("\\", "\\\\").replace('"', '\\"').encode() + b'"'
+
+
+def _parameters(params: Sequence[Tuple[str, object]]) -> bytes:
+    if not params:
+        return b"NIL"
+    pairs = [
+        _quote(name.upper()) + b" " + _quote(collapse_rfc2231_value(value))
+        for name, value in params
+    ]
+    return b"(" + b" ".join(pairs) + b")"
+
+
+def _entity_body(entity: MIMEEntity) -> bytes:
+    if entity.get_content_type() == "message/rfc822":
+        return entity.get_payload(0).as_bytes(policy=SMTP)
+    return entity.get_payload().encode("ascii", "surrogateescape")
+
+
+def _bodystructure(entity: MIMEEntity) -> bytes:
+    """
+    Render the BODYSTRUCTURE of a parsed entity, envelopes are left empty
+    """
+    maintype = entity.get_content_maintype().upper()
+    subtype = entity.get_content_subtype().upper()
+    params = (entity.get_params() or [])[1:]
+
+    if maintype == "MULTIPART":
+        children = b"".join(_bodystructure(child) for child in entity.get_payload())
+        tail = _quote(subtype) + b" " + _parameters(params) + b" NIL NIL NIL"
+        return b"(" + children + b" " + tail + b")"
+
+    body = _entity_body(entity)
+    encoding = entity.get("Content-Transfer-Encoding", "7bit").upper()
+    fields = [
+        _quote(maintype),
+        _quote(subtype),
+        _parameters(params),
+        _quote(entity.get("Content-ID")),
+        _quote(entity.get("Content-Description")),
+        _quote(encoding),
+        b"%d" % len(body),
+    ]
+    if maintype == "MESSAGE" and subtype == "RFC822":
+        fields.append(b"(NIL NIL NIL NIL NIL NIL NIL NIL NIL NIL)")
+        fields.append(_bodystructure(entity.get_payload(0)))
+        fields.append(b"%d" % body.count(b"\n"))
+    elif maintype == "TEXT":
+        fields.append(b"%d" % body.count(b"\n"))
+
+    disposition = entity.get_params(header="content-disposition")
+    if disposition:
+        fields.append(b"NIL")
+        kind = _quote(disposition[0][0].upper())
+        fields.append(b"(" + kind + b" " + _parameters(disposition[1:]) + b")")
+    return b"(" + b" ".join(fields) + b")"
+
+
+def synthetic_mailbox(
+    name: str = "INBOX",
+    count: int = 100,
+    size: int = 2048,
+    structure: str = "text",
+    attributes: Sequence[str] = (),
+) -> FakeMailbox:
+    """
+    Build a mailbox of identical sized messages, one message out of three is seen
+
+    :param name: The name of the mailbox
+    :param count: The number of messages
+    :param size: The approximate size of each message content in bytes
+    :param structure: The structure of the messages, see `make_message`
+    :param attributes: The LIST attributes such as \\Trash
+    :return: The mailbox
+    """
+    messages = []
+    for uid in range(1, count + 1):
+        flags = ["\\Seen"] if uid % 3 == 0 else []
+        messages.append(FakeMessage(uid, make_message(uid, size, structure), flags))
+    return FakeMailbox(name, messages, attributes)
+
+
+def self_signed_context(directory: Path) -> Optional[ssl.SSLContext]:
+    """
+    Build a server ssl context from a self-signed certificate created with openssl
+
+    :param directory: The directory receiving the certificate and its key
+    :return: The context or None if openssl is not available
+    """
+    if shutil.which("openssl") is None:
+        return None
+
+    certificate, key = directory / "cert.pem", directory / "key.pem"
+    command = "openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=localhost"
+    subprocess.run(
+        command.split() + ["-keyout", str(key), "-out", str(certificate)],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(str(certificate), str(key))
+    return context
+
+
+def _unquote(token: bytes) -> str:
+    text = token.decode("utf8")
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        text = text[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return text
+
+
+def _parse_uid_set(uid_set: bytes, mailbox: FakeMailbox) -> Set[int]:
+    last = max((message.uid for message in mailbox.messages), default=0)
+    uids: Set[int] = set()
+
+    for token in uid_set.decode("ascii").split(","):
+        start, _, end = token.partition(":")
+        first = last if start == "*" else int(start)
+        final = first if not end else (last if end == "*" else int(end))
+        if first > final:
+            first, final = final, first
+        uids.update(range(first, final + 1))
+
+    return uids
+
+
+def _parse_list(tokens: List[bytes]) -> List[bytes]:
+    """
+    Read the tokens of a parenthesized list or a single token
+    """
+    if tokens and tokens[0] == b"(":
+        items = []
+        tokens.pop(0)
+        while tokens and tokens[0] != b")":
+            items.append(tokens.pop(0))
+        if tokens:
+            tokens.pop(0)
+        return items
+    return [tokens.pop(0)] if tokens else []
+
+
+class BadCommand(Exception):
+    pass
+
+
+_FLAG_CRITERIA = {
+    b"SEEN": ("\\Seen", True),
+    b"UNSEEN": ("\\Seen", False),
+    b"FLAGGED": ("\\Flagged", True),
+    b"UNFLAGGED": ("\\Flagged", False),
+    b"DELETED": ("\\Deleted", True),
+    b"UNDELETED": ("\\Deleted", False),
+    b"ANSWERED": ("\\Answered", True),
+    b"UNANSWERED": ("\\Answered", False),
+    b"DRAFT": ("\\Draft", True),
+    b"UNDRAFT": ("\\Draft", False),
+}
+_TEXT_CRITERIA = (b"SUBJECT", b"FROM", b"TO", b"BODY", b"TEXT")
+
+
+def _search_key(tokens: List[bytes], mailbox: FakeMailbox):
+    """
+    Compile one search key into a predicate on messages
+    """
+    key = tokens.pop(0).upper()
+
+    if key == b"ALL":
+        return lambda message: True
+    if key in _FLAG_CRITERIA:
+        flag, present = _FLAG_CRITERIA[key]
+        return lambda message: (flag in message.flags) is present
+    if key == b"UID":
+        uids = _parse_uid_set(tokens.pop(0), mailbox)
+        return lambda message: message.uid in uids
+    if key == b"NOT":
+        predicate = _search_key(tokens, mailbox)
+        return lambda message: not predicate(message)
+    if key == b"OR":
+        left = _search_key(tokens, mailbox)
+        right = _search_key(tokens, mailbox)
+        return lambda message: left(message) or right(message)
+    if key in _TEXT_CRITERIA:
+        value = _unquote(tokens.pop(0)).lower().encode("utf8")
+        return lambda message: value in message.raw.lower()
+
+    raise BadCommand(f"Unsupported search key {key!r}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_TCPServer"
+
+    def setup(self):
+        super().setup()
+        self.fake: "FakeIMAPServer" = self.server.fake
+        self.selected: Optional[FakeMailbox] = None
+        self.output = bytearray()
+
+    def write(self, *lines: bytes):
+        for line in lines:
+            self.output += line + CRLF
+
+    def flush(self):
+        if self.output:
+            self.wfile.write(bytes(self.output))
+            self.output.clear()
+
+    def handle(self):
+        capabilities = " ".join(self.fake.capabilities).encode("ascii")
+        self.write(b"* OK [CAPABILITY " + capabilities + b"] Fake IMAP server ready")
+        self.flush()
+
+        for line in self.rfile:
+            line = line.rstrip(CRLF)
+            if not line:
+                continue
+
+            tag, _, command = line.partition(b" ")
+            name, _, arguments = command.partition(b" ")
+            name = name.upper()
+
+            if self.fake.latency:
+                time.sleep(self.fake.latency)
+
+            try:
+                with self.fake.lock:
+                    status = self.dispatch(name, arguments)
+            except BadCommand as error:
+                status = b"BAD " + str(error).encode("utf8")
+            except (IndexError, ValueError) as error:
+                status = b"BAD Invalid arguments " + str(error).encode("utf8")
+
+            self.write(tag + b" " + status)
+            self.flush()
+
+            if name == b"LOGOUT":
+                return
+
+    def dispatch(self, name: bytes, arguments: bytes) -> bytes:
+        self.fake.commands.append(name + b" " + arguments if arguments else name)
+        tokens = _TOKEN.findall(arguments)
+
+        if name == b"CAPABILITY":
+            self.write(b"* CAPABILITY " + " ".join(self.fake.capabilities).encode())
+        elif name == b"NOOP":
+            pass
+        elif name == b"LOGOUT":
+            self.write(b"* BYE Logging out")
+        elif name == b"LOGIN":
+            password = _unquote(tokens[1])
+            if self.fake.password is not None and password != self.fake.password:
+                return b"NO [AUTHENTICATIONFAILED] Invalid credentials"
+        elif name == b"ENABLE":
+            self.write(b"* ENABLED " + b" ".join(tokens))
+        elif name == b"LIST":
+            for mailbox in self.fake.mailboxes.values():
+                attributes = " ".join(["\\HasNoChildren"] + mailbox.attributes)
+                self.write(f'* LIST ({attributes}) "/" "{mailbox.name}"'.encode())
+        elif name in (b"SELECT", b"EXAMINE"):
+            return self.select(_unquote(tokens[0]))
+        elif name == b"CREATE":
+            path = _unquote(tokens[0])
+            if self.fake.find(path) is not None:
+                return b"NO [ALREADYEXISTS] Mailbox exists"
+            self.fake.add_mailbox(FakeMailbox(path))
+        elif name == b"DELETE":
+            mailbox = self.fake.find(_unquote(tokens[0]))
+            if mailbox is None:
+                return b"NO [NONEXISTENT] No such mailbox"
+            del self.fake.mailboxes[mailbox.name]
+        elif name == b"RENAME":
+            mailbox = self.fake.find(_unquote(tokens[0]))
+            if mailbox is None:
+                return b"NO [NONEXISTENT] No such mailbox"
+            del self.fake.mailboxes[mailbox.name]
+            mailbox.name = _unquote(tokens[1])
+            self.fake.add_mailbox(mailbox)
+        elif name == b"EXPUNGE":
+            self.expunge(None)
+        elif name == b"UID":
+            return self.uid(tokens)
+        else:
+            raise BadCommand(f"Unknown command {name!r}")
+
+        return b"OK " + name + b" completed"
+
+    def select(self, path: str) -> bytes:
+        mailbox = self.fake.find(path)
+        if mailbox is None:
+            self.selected = None
+            return b"NO [NONEXISTENT] No such mailbox"
+
+        self.selected = mailbox
+        self.write(
+            b"* FLAGS (\\Answered \\Flagged \\Deleted \\Seen \\Draft)",
+            b"* %d EXISTS" % len(mailbox.messages),
+            b"* 0 RECENT",
+            b"* OK [UIDVALIDITY %d] UIDs valid" % mailbox.uidvalidity,
+            b"* OK [UIDNEXT %d] Predicted next UID" % mailbox.uidnext,
+        )
+        return b"OK [READ-WRITE] SELECT completed"
+
+    def require_selected(self) -> FakeMailbox:
+        if self.selected is None:
+            raise BadCommand("No mailbox selected")
+        return self.selected
+
+    def expunge(self, uids: Optional[Set[int]]):
+        mailbox = self.require_selected()
+        expunged = [
+            message
+            for message in mailbox.messages
+            if "\\Deleted" in message.flags and (uids is None or message.uid in uids)
+        ]
+        self.remove(mailbox, expunged)
+
+    def remove(self, mailbox: FakeMailbox, messages: List[FakeMessage]):
+        numbers = mailbox.sequence_numbers()
+        for message in reversed(messages):
+            self.write(b"* %d EXPUNGE" % numbers[message.uid])
+        mailbox.remove({message.uid for message in messages})
+
+    def uid(self, tokens: List[bytes]) -> bytes:
+        mailbox = self.require_selected()
+        command = tokens.pop(0).upper()
+
+        if command == b"SEARCH":
+            if tokens and tokens[0].upper() == b"CHARSET":
+                del tokens[:2]
+            predicates = []
+            while tokens:
+                predicates.append(_search_key(tokens, mailbox))
+            uids = [
+                str(message.uid).encode()
+                for message in mailbox.messages
+                if all(predicate(message) for predicate in predicates)
+            ]
+            self.write(b" ".join([b"* SEARCH"] + uids))
+        elif command == b"FETCH":
+            uids = _parse_uid_set(tokens.pop(0), mailbox)
+            self.fetch(mailbox, mailbox.by_uids(uids), b" ".join(tokens))
+        elif command == b"STORE":
+            uids = _parse_uid_set(tokens.pop(0), mailbox)
+            self.store(mailbox, mailbox.by_uids(uids), tokens)
+        elif command in (b"COPY", b"MOVE"):
+            uids = _parse_uid_set(tokens.pop(0), mailbox)
+            target = self.fake.find(_unquote(tokens.pop(0)))
+            if target is None:
+                return b"NO [TRYCREATE] No such mailbox"
+            messages = mailbox.by_uids(uids)
+            for message in messages:
+                target.append(message.raw, sorted(message.flags))
+            if command == b"MOVE":
+                self.remove(mailbox, messages)
+        elif command == b"EXPUNGE":
+            self.expunge(_parse_uid_set(tokens.pop(0), mailbox))
+        else:
+            raise BadCommand(f"Unknown UID command {command!r}")
+
+        return b"OK UID " + command + b" completed"
+
+    def fetch(self, mailbox: FakeMailbox, messages: List[FakeMessage], items: bytes):
+        upper_items = items.upper()
+        header_fields = _HEADER_FIELDS.search(items)
+        section = _SECTION.search(items)
+        numbers = mailbox.sequence_numbers()
+
+        for message in messages:
+            parts = [b"UID %d" % message.uid]
+            if b"FLAGS" in upper_items:
+                parts.append(
+                    b"FLAGS (" + " ".join(sorted(message.flags)).encode() + b")"
+                )
+            if b"RFC822.SIZE" in upper_items:
+                parts.append(b"RFC822.SIZE %d" % len(message.raw))
+            if b"BODYSTRUCTURE" in upper_items:
+                parts.append(b"BODYSTRUCTURE " + message.bodystructure())
+
+            literal = None
+            if section:
+                part = section.group("part").decode("ascii")
+                name = b"BODY[" + section.group("part") + b"]"
+                literal = message.section(part)
+                if literal is None:
+                    parts.append(name + b" NIL")
+                elif section.group("origin") is not None:
+                    origin = int(section.group("origin"))
+                    end = origin + int(section.group("length"))
+                    literal = literal[origin:end]
+                    name += b"<%d>" % origin
+            elif header_fields:
+                fields = header_fields.group("fields").split()
+                literal = message.header_fields(fields)
+                name = b"BODY[HEADER.FIELDS (" + b" ".join(fields).upper() + b")]"
+            elif b"BODY[]" in upper_items or b"BODY.PEEK[]" in upper_items:
+                literal = message.raw
+                name = b"BODY[]"
+            elif b"BODY.PEEK[HEADER]" in upper_items or b"BODY[HEADER]" in upper_items:
+                literal = message.header()
+                name = b"BODY[HEADER]"
+
+            head = b"* %d FETCH (" % numbers[message.uid] + b" ".join(parts)
+            if literal is None:
+                self.write(head + b")")
+            else:
+                self.output += head + b" " + name + b" {%d}" % len(literal) + CRLF
+                self.output += literal + b")" + CRLF
+
+    def store(self, mailbox: FakeMailbox, messages: List[FakeMessage], tokens):
+        action = tokens.pop(0).upper()
+        flags = {_unquote(flag) for flag in _parse_list(tokens)}
+        numbers = mailbox.sequence_numbers()
+
+        for message in messages:
+            if action.startswith(b"+"):
+                message.flags |= flags
+            elif action.startswith(b"-"):
+                message.flags -= flags
+            else:
+                message.flags = set(flags)
+
+            if not action.endswith(b".SILENT"):
+                flag_list = " ".join(sorted(message.flags)).encode()
+                self.write(
+                    b"* %d FETCH (UID %d FLAGS (%s))"
+                    % (numbers[message.uid], message.uid, flag_list)
+                )
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, fake: "FakeIMAPServer"):
+        self.fake = fake
+        super().__init__(address, _Handler)
+
+    def get_request(self):
+        sock, address = super().get_request()
+        if self.fake.ssl_context is not None:
+            sock = self.fake.ssl_context.wrap_socket(sock, server_side=True)
+        return sock, address
+
+
+class FakeIMAPServer:
+    """
+    Threaded IMAP server listening on localhost, plain TCP by default or TLS if a
+    server ssl context is given
+
+    :param mailboxes: The mailboxes, defaults to an empty INBOX
+    :param latency: The number of seconds waited before answering each command
+    :param ssl_context: The server side ssl context, e.g. with a self-signed cert
+    :param capabilities: The advertised capabilities
+    :param password: The accepted password, defaults to None to accept any
+    """
+
+    def __init__(
+        self,
+        mailboxes: Sequence[FakeMailbox] = (),
+        latency: float = 0.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        capabilities: Sequence[str] = DEFAULT_CAPABILITIES,
+        password: Optional[str] = None,
+    ):
+        self.mailboxes: Dict[str, FakeMailbox] = {}
+        for mailbox in mailboxes or [FakeMailbox("INBOX")]:
+            self.add_mailbox(mailbox)
+        self.latency = latency
+        self.ssl_context = ssl_context
+        self.capabilities = tuple(capabilities)
+        self.password = password
+        self.commands: List[bytes] = []
+        self.lock = threading.RLock()
+        self._server: Optional[_TCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "FakeIMAPServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def host(self) -> str:
+        return self.address[0]
+
+    @property
+    def port(self) -> int:
+        return self.address[1]
+
+    def add_mailbox(self, mailbox: FakeMailbox):
+        self.mailboxes[mailbox.name] = mailbox
+
+    def find(self, path: str) -> Optional[FakeMailbox]:
+        if path.upper() == "INBOX":
+            path = "INBOX"
+        return self.mailboxes.get(path)
+
+    def iter_messages(self) -> Iterator[FakeMessage]:
+        for mailbox in self.mailboxes.values():
+            yield from mailbox.messages
+
+    def start(self):
+        self._server = _TCPServer(("127.0.0.1", 0), self)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
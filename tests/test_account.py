@@ -1,4 +1,4 @@
-from imaplib import IMAP4_SSL
+from imaplib import IMAP4, IMAP4_SSL
 from unittest.mock import ANY, Mock, call, patch
 
 import pytest
@@ -8,19 +8,41 @@ from ggmail.account import Account
 from ggmail.exception import (
     FlagAlreadyAttached,
     FlagNotAttached,
+    LoginFailed,
     MailboxAlreadyExists,
     MailboxFetchingFailed,
     MailboxNotDeletable,
     MailboxNotFound,
     MessageFetchingFailed,
+    MessageNotFound,
     MessageSearchingFailed,
     NotConnected,
 )
 from ggmail.flag import Flag
 from ggmail.mailbox import Mailbox, MailboxKind
+from ggmail.message import FetchMode
 from ggmail.policy import all_
 
 
+def fetch_response(*literals: bytes) -> list:
+    """
+    Build the raw response of a UID FETCH of the messages whose uids are 1, 2...
+    """
+    response = []
+    for uid, literal in enumerate(literals, 1):
+        response += [(b"%d (UID %d BODY[] {%d}" % (uid, uid, len(literal)), literal)]
+        response += [b" FLAGS (\\Seen))"]
+    return response
+
+
+def fetched(uid: int, literal: bytes) -> tuple:
+    """
+    The description passed to the factories for a message of `fetch_response`
+    """
+    header = b"%d (UID %d BODY[] {%d} FLAGS (\\Seen))" % (uid, uid, len(literal))
+    return header, literal
+
+
 @fixture
 def logged_account_with_inbox(logged_account):
     mailbox = Mailbox(
@@ -35,6 +57,164 @@ def logged_account_with_inbox(logged_account):
     return logged_account
 
 
+class TestAccountConnection:
+    @patch.object(IMAP4_SSL, "__init__", return_value=None)
+    def test_lazy_connection(self, imap_init_mock, account):
+        imap_init_mock.assert_not_called()
+
+        imap = account._imap
+
+        imap_init_mock.assert_called_once_with("imap.gmail.com", 993)
+        assert account._imap is imap
+
+    @patch.object(IMAP4_SSL, "__init__", return_value=None)
+    def test_connect(self, imap_init_mock, account):
+        account.connect()
+        account.connect()
+
+        imap_init_mock.assert_called_once_with("imap.gmail.com", 993)
+
+    @patch.object(IMAP4_SSL, "__init__", return_value=None)
+    def test_connect_background(self, imap_init_mock, account):
+        account.connect(background=True)
+
+        assert isinstance(account._imap, IMAP4_SSL)
+        imap_init_mock.assert_called_once_with("imap.gmail.com", 993)
+
+    @patch.object(IMAP4_SSL, "__init__", side_effect=[OSError(), None])
+    def test_connect_background_failed(self, imap_init_mock, account):
+        account.connect(background=True)
+
+        with raises(OSError):
+            account._imap
+
+        assert isinstance(account._imap, IMAP4_SSL)
+        assert imap_init_mock.call_count == 2
+
+    @patch.object(IMAP4_SSL, "__init__", return_value=None)
+    @patch.object(IMAP4_SSL, "logout")
+    @patch.object(IMAP4_SSL, "login")
+    def test_login_after_logout(
+        self, imap_login_mock, imap_logout_mock, imap_init_mock, account
+    ):
+        account.login()
+        account.logout()
+        account.login()
+
+        assert imap_init_mock.call_count == 2
+
+
+@patch("ggmail.account.sleep")
+@patch.object(IMAP4_SSL, "shutdown")
+@patch.object(IMAP4_SSL, "select")
+@patch.object(IMAP4_SSL, "login")
+class TestAccountReconnect:
+    @patch.object(IMAP4_SSL, "uid")
+    def test_idempotent_command_retried(
+        self,
+        imap_uid_mock,
+        imap_login_mock,
+        imap_select_mock,
+        imap_shutdown_mock,
+        sleep_mock,
+        logged_account_with_inbox,
+    ):
+        logged_account_with_inbox.selected_mailbox = logged_account_with_inbox.inbox()
+        imap_uid_mock.side_effect = [IMAP4.abort("BYE"), ("OK", [b"1 2"])]
+
+        uids = logged_account_with_inbox.search_message_uids()
+
+        assert uids == ["1", "2"]
+        imap_login_mock.assert_called_once()
+        imap_select_mock.assert_called_once_with("Inbox")
+        sleep_mock.assert_called_once_with(0.5)
+        assert logged_account_with_inbox.is_connected
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_retries_exhausted(
+        self,
+        imap_uid_mock,
+        imap_login_mock,
+        imap_select_mock,
+        imap_shutdown_mock,
+        sleep_mock,
+        logged_account,
+    ):
+        logged_account.max_retries = 2
+        imap_uid_mock.side_effect = ConnectionResetError()
+
+        with raises(ConnectionResetError):
+            logged_account.search_message_uids()
+
+        assert imap_uid_mock.call_count == 3
+        assert sleep_mock.call_args_list == [call(0.5), call(1.0)]
+        assert logged_account.is_connected
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_command_not_retried(
+        self,
+        imap_uid_mock,
+        imap_login_mock,
+        imap_select_mock,
+        imap_shutdown_mock,
+        sleep_mock,
+        logged_account_with_inbox,
+    ):
+        imap_uid_mock.side_effect = IMAP4.abort("BYE")
+
+        with raises(IMAP4.abort):
+            logged_account_with_inbox.copy_message_using_uid(
+                "1", logged_account_with_inbox.inbox()
+            )
+
+        imap_uid_mock.assert_called_once()
+        imap_login_mock.assert_called_once()
+        sleep_mock.assert_not_called()
+        assert logged_account_with_inbox.is_connected
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_login_failed(
+        self,
+        imap_uid_mock,
+        imap_login_mock,
+        imap_select_mock,
+        imap_shutdown_mock,
+        sleep_mock,
+        logged_account,
+    ):
+        imap_uid_mock.side_effect = IMAP4.abort("BYE")
+        imap_login_mock.side_effect = IMAP4.error("Invalid credentials")
+
+        with raises(LoginFailed):
+            logged_account.search_message_uids()
+
+        assert imap_uid_mock.call_count == 1
+        assert logged_account.is_connected is False
+
+    @patch.object(IMAP4_SSL, "logout")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_logout_session_lost(
+        self,
+        imap_uid_mock,
+        imap_logout_mock,
+        imap_login_mock,
+        imap_select_mock,
+        imap_shutdown_mock,
+        sleep_mock,
+        logged_account,
+    ):
+        imap_uid_mock.side_effect = OSError()
+        imap_login_mock.side_effect = OSError()
+
+        with raises(OSError):
+            logged_account.copy_message_using_uid("1", Mock(path="Inbox"))
+
+        assert logged_account.is_connected is False
+        logged_account.is_connected = True
+        logged_account.logout()
+        imap_logout_mock.assert_not_called()
+
+
 class TestAccountLogout:
     def test_logout_success(self, logged_account):
         logged_account.logout()
@@ -563,17 +743,54 @@ class TestAccountSearchMessage:
         logged_account,
     ):
         account_search_message_uids_mock.return_value = ["1", "2"]
-        imap_uid_mock.return_value = "OK", [b"msg1", b")", b"msg2", b")"]
+        imap_uid_mock.return_value = "OK", fetch_response(b"msg1", b"msg2")
         message_factory_mock.return_value = Mock()
 
         messages = logged_account.search_messages()
 
-        imap_uid_mock.assert_called_once_with("FETCH", "1,2", "(BODY.PEEK[] FLAGS)")
+        imap_uid_mock.assert_called_once_with("FETCH", "1:2", "(BODY.PEEK[] FLAGS)")
         assert len(messages) == 2
         message_factory_mock.assert_has_calls(
-            [call("1", b"msg1", ANY), call("2", b"msg2", ANY)]
+            [call("1", fetched(1, b"msg1"), ANY), call("2", fetched(2, b"msg2"), ANY)]
         )
 
+    @patch.object(IMAP4_SSL, "uid")
+    @patch.object(Account, "search_message_uids")
+    @patch("ggmail.account.message_factory")
+    def test_search_messages_out_of_order(
+        self,
+        message_factory_mock,
+        account_search_message_uids_mock,
+        imap_uid_mock,
+        logged_account,
+    ):
+        account_search_message_uids_mock.return_value = ["1", "2", "3"]
+        response = fetch_response(b"msg1", b"msg2")
+        unsolicited = b"9 (FLAGS (\\Deleted))"
+        imap_uid_mock.return_value = "OK", response[2:] + [unsolicited] + response[:2]
+        message_factory_mock.return_value = Mock()
+
+        messages = logged_account.search_messages()
+
+        assert len(messages) == 2
+        assert message_factory_mock.call_args_list == [
+            call("1", fetched(1, b"msg1"), ANY),
+            call("2", fetched(2, b"msg2"), ANY),
+        ]
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_fetch_messages_keep_raw(self, imap_uid_mock, logged_account):
+        raw_message = (
+            b"Subject: Subject\r\nDate: Sat, 9 Oct 2021 18:27:26 +0200\r\n\r\n"
+        )
+        imap_uid_mock.return_value = "OK", fetch_response(raw_message)
+        logged_account.keep_raw = True
+
+        messages = logged_account.fetch_messages_using_uids(["1"])
+
+        assert messages[0].raw.obj is raw_message
+        assert messages[0].subject == "Subject"
+
     @patch.object(Account, "search_message_uids")
     @patch("ggmail.account.message_factory")
     def test_search_messages_empty(
@@ -620,7 +837,7 @@ class TestAccountSearchMessage:
         logged_account_with_inbox,
     ):
         account_search_message_uids_mock.return_value = ["1", "2"]
-        imap_uid_mock.return_value = "OK", [b"msg1", b")", b"msg2", b")"]
+        imap_uid_mock.return_value = "OK", fetch_response(b"msg1", b"msg2")
         message_factory_mock.return_value = Mock()
 
         inbox = logged_account_with_inbox.inbox()
@@ -628,7 +845,7 @@ class TestAccountSearchMessage:
 
         assert len(messages) == 2
         message_factory_mock.assert_has_calls(
-            [call("1", b"msg1", ANY), call("2", b"msg2", ANY)]
+            [call("1", fetched(1, b"msg1"), ANY), call("2", fetched(2, b"msg2"), ANY)]
         )
 
     @patch.object(IMAP4_SSL, "uid")
@@ -649,6 +866,184 @@ class TestAccountSearchMessage:
         with raises(NotConnected):
             account.search_messages()
 
+    @patch.object(IMAP4_SSL, "uid")
+    @patch.object(Account, "search_message_uids")
+    @patch("ggmail.account.message_factory")
+    def test_iter_messages(
+        self,
+        message_factory_mock,
+        account_search_message_uids_mock,
+        imap_uid_mock,
+        logged_account,
+    ):
+        account_search_message_uids_mock.return_value = ["1", "2", "3"]
+        imap_uid_mock.side_effect = [
+            ("OK", fetch_response(b"msg1", b"msg2")),
+            ("OK", fetch_response(b"msg1", b"msg2", b"msg3")[4:]),
+        ]
+        message_factory_mock.return_value = Mock()
+
+        messages = logged_account.iter_messages(batch_size=2)
+
+        next(messages)
+        imap_uid_mock.assert_called_once_with("FETCH", "1:2", "(BODY.PEEK[] FLAGS)")
+        assert len(list(messages)) == 2
+        imap_uid_mock.assert_called_with("FETCH", "3", "(BODY.PEEK[] FLAGS)")
+        message_factory_mock.assert_has_calls(
+            [
+                call("1", fetched(1, b"msg1"), ANY),
+                call("2", fetched(2, b"msg2"), ANY),
+                call("3", fetched(3, b"msg3"), ANY),
+            ]
+        )
+
+    @patch.object(IMAP4_SSL, "select")
+    @patch.object(IMAP4_SSL, "uid")
+    @patch.object(Account, "search_message_uids")
+    @patch("ggmail.account.message_factory")
+    def test_iter_messages_from_mailbox(
+        self,
+        message_factory_mock,
+        account_search_message_uids_mock,
+        imap_uid_mock,
+        imap_select_mock,
+        logged_account_with_inbox,
+    ):
+        account_search_message_uids_mock.return_value = ["1", "2"]
+        imap_uid_mock.side_effect = [
+            ("OK", fetch_response(b"msg1")),
+            ("OK", fetch_response(b"msg1", b"msg2")[2:]),
+        ]
+        message_factory_mock.return_value = Mock()
+
+        inbox = logged_account_with_inbox.inbox()
+        messages = list(inbox.iter(batch_size=1))
+
+        imap_select_mock.assert_called_once_with("Inbox")
+        assert imap_uid_mock.call_count == 2
+        assert len(messages) == 2
+
+    @patch.object(IMAP4_SSL, "uid")
+    @patch.object(Account, "search_message_uids")
+    @patch("ggmail.account.header_message_factory")
+    @patch("ggmail.account.message_factory")
+    def test_search_messages_headers_lazy_content(
+        self,
+        message_factory_mock,
+        header_message_factory_mock,
+        account_search_message_uids_mock,
+        imap_uid_mock,
+        logged_account,
+        messages,
+    ):
+        account_search_message_uids_mock.return_value = ["1", "2"]
+        imap_uid_mock.return_value = "OK", fetch_response(b"msg1", b"msg2")
+        header_message_factory_mock.side_effect = messages
+        message_factory_mock.side_effect = [
+            Mock(uid="1", body="Body 1", html=None),
+            Mock(uid="2", body="Body 2", html="<html>2</html>"),
+        ]
+
+        fetched = logged_account.search_messages(mode=FetchMode.HEADERS)
+
+        imap_uid_mock.assert_called_once_with(
+            "FETCH",
+            "1:2",
+            "(BODY.PEEK[HEADER.FIELDS (FROM TO SUBJECT DATE CONTENT-TYPE)] FLAGS)",
+        )
+        message_factory_mock.assert_not_called()
+
+        assert fetched[0].body == "Body 1"
+        assert fetched[1].html == "<html>2</html>"
+        assert fetched[1].body == "Body 2"
+        imap_uid_mock.assert_called_with("FETCH", "1:2", "(BODY.PEEK[] FLAGS)")
+        assert imap_uid_mock.call_count == 2
+
+    @patch.object(IMAP4_SSL, "uid")
+    @patch.object(Account, "search_message_uids")
+    @patch("ggmail.account.summary_factory")
+    def test_search_messages_summary(
+        self,
+        summary_factory_mock,
+        account_search_message_uids_mock,
+        imap_uid_mock,
+        logged_account,
+    ):
+        account_search_message_uids_mock.return_value = ["1", "2"]
+        imap_uid_mock.return_value = "OK", fetch_response(b"msg1", b"msg2")
+        summaries = [Mock(uid=1), Mock(uid=2)]
+        summary_factory_mock.side_effect = summaries
+
+        fetched = logged_account.search_messages(mode=FetchMode.SUMMARY)
+
+        imap_uid_mock.assert_called_once_with(
+            "FETCH",
+            "1:2",
+            "(BODY.PEEK[HEADER.FIELDS (FROM TO SUBJECT DATE CONTENT-TYPE)] FLAGS)",
+        )
+        assert fetched == summaries
+
+    @patch.object(IMAP4_SSL, "select")
+    @patch.object(Account, "fetch_messages_using_uids")
+    def test_load_message_contents_reselect(
+        self,
+        account_fetch_messages_using_uids_mock,
+        imap_select_mock,
+        logged_account_with_inbox,
+        messages,
+    ):
+        account_fetch_messages_using_uids_mock.return_value = [
+            Mock(uid="1", body="Body 1", html=None)
+        ]
+        inbox = logged_account_with_inbox.inbox()
+
+        logged_account_with_inbox.load_message_contents(messages, inbox)
+
+        imap_select_mock.assert_called_once_with("Inbox")
+        account_fetch_messages_using_uids_mock.assert_called_once_with(["1", "2"])
+        assert messages[0].body == "Body 1"
+        assert messages[1].body is None
+
+    @patch.object(IMAP4_SSL, "select")
+    @patch.object(Account, "fetch_messages_using_uids")
+    def test_load_message_contents_restores_selection(
+        self,
+        account_fetch_messages_using_uids_mock,
+        imap_select_mock,
+        logged_account_with_inbox,
+        messages,
+    ):
+        account_fetch_messages_using_uids_mock.side_effect = RuntimeError
+        inbox = logged_account_with_inbox.inbox()
+        other = inbox.copy(update={"path": "Other", "label": "Other"})
+        logged_account_with_inbox.selected_mailbox = other
+
+        with raises(RuntimeError):
+            logged_account_with_inbox.load_message_contents(messages, inbox)
+
+        assert imap_select_mock.call_args_list == [call("Inbox"), call("Other")]
+        assert logged_account_with_inbox.selected_mailbox is other
+
+    @patch.object(IMAP4_SSL, "select")
+    @patch.object(Account, "fetch_messages_using_uids", return_value=[])
+    def test_load_message_contents_same_mailbox(
+        self,
+        account_fetch_messages_using_uids_mock,
+        imap_select_mock,
+        logged_account_with_inbox,
+        messages,
+    ):
+        inbox = logged_account_with_inbox.inbox()
+        logged_account_with_inbox.selected_mailbox = inbox
+
+        logged_account_with_inbox.load_message_contents(messages, inbox)
+
+        imap_select_mock.assert_not_called()
+
+    def test_iter_messages_not_connected(self, account):
+        with raises(NotConnected):
+            next(account.iter_messages())
+
 
 class TestAccountExpunge:
     @patch.object(IMAP4_SSL, "expunge")
@@ -662,7 +1057,18 @@ class TestAccountBulkOperation:
     def test_copy_messages(self, imap_uid_mock, logged_account_with_inbox, messages):
         inbox = logged_account_with_inbox.inbox()
         logged_account_with_inbox.copy_messages(messages, inbox)
-        imap_uid_mock.assert_called_once_with("COPY", "1,2", inbox.path)
+        imap_uid_mock.assert_called_once_with("COPY", "1:2", inbox.path)
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_copy_messages_chunked(self, imap_uid_mock, logged_account_with_inbox):
+        inbox = logged_account_with_inbox.inbox()
+        logged_account_with_inbox.max_uid_set_size = 6
+        logged_account_with_inbox.copy_messages_using_uids(
+            ["10", "2", "3", "4", "7"], inbox
+        )
+        imap_uid_mock.assert_has_calls(
+            [call("COPY", "2:4,7", inbox.path), call("COPY", "10", inbox.path)]
+        )
 
     @patch.object(IMAP4_SSL, "uid")
     def test_copy_messages_empty(self, imap_uid_mock, logged_account_with_inbox):
@@ -670,27 +1076,78 @@ class TestAccountBulkOperation:
         logged_account_with_inbox.copy_messages([], inbox)
         imap_uid_mock.assert_not_called()
 
+    @patch.object(IMAP4_SSL, "capability")
     @patch.object(IMAP4_SSL, "uid")
-    def test_move_messages(self, imap_uid_mock, logged_account_with_inbox, messages):
+    def test_move_messages_using_move(
+        self, imap_uid_mock, imap_capability_mock, logged_account_with_inbox, messages
+    ):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1 MOVE UIDPLUS"]
+        inbox = logged_account_with_inbox.inbox()
+        logged_account_with_inbox.move_messages(messages, inbox, with_expunge=True)
+        imap_uid_mock.assert_called_once_with("MOVE", "1:2", inbox.path)
+        for message in messages:
+            assert Flag.DELETED in message.flags
+
+    @patch.object(IMAP4_SSL, "expunge")
+    @patch.object(IMAP4_SSL, "capability")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_move_messages_using_uid_expunge(
+        self,
+        imap_uid_mock,
+        imap_capability_mock,
+        imap_expunge_mock,
+        logged_account_with_inbox,
+        messages,
+    ):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1 UIDPLUS"]
+        inbox = logged_account_with_inbox.inbox()
+        logged_account_with_inbox.move_messages(messages, inbox, with_expunge=True)
+        assert imap_uid_mock.call_args_list == [
+            call("COPY", "1:2", inbox.path),
+            call("STORE", "1:2", "+FLAGS.SILENT", "(\\Deleted)"),
+            call("EXPUNGE", "1:2"),
+        ]
+        imap_expunge_mock.assert_not_called()
+
+    @patch.object(IMAP4_SSL, "capability")
+    def test_has_capability_requested_once(self, imap_capability_mock, logged_account):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1 MOVE"]
+        assert logged_account.has_capability("move") is True
+        assert logged_account.has_capability("UIDPLUS") is False
+        imap_capability_mock.assert_called_once()
+
+    @patch.object(IMAP4_SSL, "capability")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_move_messages(
+        self, imap_uid_mock, imap_capability_mock, logged_account_with_inbox, messages
+    ):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1"]
         inbox = logged_account_with_inbox.inbox()
         logged_account_with_inbox.move_messages(messages, inbox)
         imap_uid_mock.has_calls(
-            call("COPY", "1,2", inbox.path),  # Copy from the origin
-            call("STORE", "1,2", "+FLAGS", "\\Deleted"),  # Remove the origin
+            call("COPY", "1:2", inbox.path),  # Copy from the origin
+            call("STORE", "1:2", "+FLAGS.SILENT", "(\\Deleted)"),  # Remove the origin
         )
         for message in messages:
             assert Flag.DELETED in message.flags
 
+    @patch.object(IMAP4_SSL, "capability")
     @patch.object(IMAP4_SSL, "expunge")
     @patch.object(IMAP4_SSL, "uid")
     def test_move_messages_with_expunge(
-        self, imap_uid_mock, imap_expungd_mock, logged_account_with_inbox, messages
+        self,
+        imap_uid_mock,
+        imap_expungd_mock,
+        imap_capability_mock,
+        logged_account_with_inbox,
+        messages,
     ):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1"]
         inbox = logged_account_with_inbox.inbox()
         logged_account_with_inbox.move_messages(messages, inbox, with_expunge=True)
         imap_uid_mock.has_calls(
-            call("COPY", "1,2", inbox.path),  # Copy from the origin
-            call("STORE", "1,2", "+FLAGS", "\\Deleted"),  # Remove the origin
+            call("COPY", "1:2", inbox.path),  # Copy from the origin
+            call("STORE", "1:2", "+FLAGS.SILENT", "(\\Deleted)"),  # Remove the origin
         )
         imap_expungd_mock.assert_called_once()
         for message in messages:
@@ -701,10 +1158,58 @@ class TestAccountBulkOperation:
         self, imap_uid_mock, logged_account_with_inbox, messages
     ):
         logged_account_with_inbox.add_flag_messages(messages, Flag.FLAGGED)
-        imap_uid_mock.assert_called_once_with("STORE", "1,2", "+FLAGS", "\\Flagged")
+        imap_uid_mock.assert_called_once_with(
+            "STORE", "1:2", "+FLAGS.SILENT", "(\\Flagged)"
+        )
         for message in messages:
             assert Flag.FLAGGED in message.flags
 
+    @patch.object(IMAP4_SSL, "uid")
+    def test_add_flag_message_single_store(
+        self, imap_uid_mock, logged_account_with_inbox, message
+    ):
+        logged_account_with_inbox.add_flag_message(message, Flag.SEEN)
+        imap_uid_mock.assert_called_once_with("STORE", "1", "+FLAGS.SILENT", "(\\Seen)")
+        assert message.flags == [Flag.SEEN]
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_add_flags_messages(
+        self, imap_uid_mock, logged_account_with_inbox, messages
+    ):
+        logged_account_with_inbox.add_flags_messages(
+            messages, [Flag.SEEN, Flag.FLAGGED, Flag.SEEN]
+        )
+        imap_uid_mock.assert_called_once_with(
+            "STORE", "1:2", "+FLAGS.SILENT", "(\\Seen \\Flagged)"
+        )
+        for message in messages:
+            assert message.flags == [Flag.SEEN, Flag.FLAGGED]
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_remove_flags_messages(
+        self, imap_uid_mock, logged_account_with_inbox, messages
+    ):
+        for message in messages:
+            message.flags.extend([Flag.SEEN, Flag.FLAGGED, Flag.ANSWERED])
+        logged_account_with_inbox.remove_flags_messages(
+            messages, [Flag.SEEN, Flag.FLAGGED]
+        )
+        imap_uid_mock.assert_called_once_with(
+            "STORE", "1:2", "-FLAGS.SILENT", "(\\Seen \\Flagged)"
+        )
+        for message in messages:
+            assert message.flags == [Flag.ANSWERED]
+
+    def test_remove_flags_messages_not_attached(
+        self, logged_account_with_inbox, message
+    ):
+        message.flags.append(Flag.SEEN)
+        with raises(FlagNotAttached):
+            logged_account_with_inbox.remove_flags_messages(
+                [message], [Flag.SEEN, Flag.FLAGGED]
+            )
+        assert message.flags == [Flag.SEEN]
+
     @patch.object(IMAP4_SSL, "uid")
     def test_add_flag_messages_empty(self, imap_uid_mock, logged_account_with_inbox):
         logged_account_with_inbox.add_flag_messages([], Flag.FLAGGED)
@@ -726,7 +1231,9 @@ class TestAccountBulkOperation:
         for message in messages:
             message.flags.append(Flag.FLAGGED)
         logged_account_with_inbox.remove_flag_messages(messages, Flag.FLAGGED)
-        imap_uid_mock.assert_called_once_with("STORE", "1,2", "-FLAGS", "\\Flagged")
+        imap_uid_mock.assert_called_once_with(
+            "STORE", "1:2", "-FLAGS.SILENT", "(\\Flagged)"
+        )
         for message in messages:
             assert Flag.FLAGGED not in message.flags
 
@@ -740,3 +1247,109 @@ class TestAccountBulkOperation:
     ):
         with raises(FlagNotAttached):
             logged_account_with_inbox.remove_flag_messages(messages, Flag.FLAGGED)
+
+
+class TestAccountAttachments:
+    @patch.object(IMAP4_SSL, "uid")
+    def test_fetch_attachments_using_uids(self, imap_uid_mock, logged_account):
+        imap_uid_mock.return_value = "OK", [
+            b'1 (UID 4 BODYSTRUCTURE (("TEXT" "PLAIN" NIL NIL NIL "7BIT" 4 1)'
+            b'("APPLICATION" "PDF" ("NAME" "a.pdf") NIL NIL "BASE64" 8) "MIXED"))',
+            b'2 (UID 5 BODYSTRUCTURE ("TEXT" "PLAIN" NIL NIL NIL "7BIT" 4 1))',
+        ]
+
+        attachments = logged_account.fetch_attachments_using_uids(["4", "5"])
+
+        imap_uid_mock.assert_called_once_with("FETCH", "4:5", "(BODYSTRUCTURE)")
+        assert [attachment.filename for attachment in attachments["4"]] == ["a.pdf"]
+        assert attachments["4"][0].part == "2"
+        assert attachments["5"] == []
+
+    @patch.object(IMAP4_SSL, "select")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_fetch_attachments_other_mailbox(
+        self, imap_uid_mock, imap_select_mock, logged_account_with_inbox
+    ):
+        imap_uid_mock.return_value = "OK", [
+            b'1 (UID 4 BODYSTRUCTURE ("APPLICATION" "PDF" ("NAME" "a.pdf") NIL NIL '
+            b'"BASE64" 8))'
+        ]
+        inbox = logged_account_with_inbox.inbox()
+        other = inbox.copy(update={"path": "Other", "label": "Other"})
+        logged_account_with_inbox.selected_mailbox = other
+
+        attachments = logged_account_with_inbox.fetch_attachments_using_uids(
+            ["4"], mailbox=inbox
+        )
+
+        assert imap_select_mock.call_args_list == [call("Inbox"), call("Other")]
+        assert logged_account_with_inbox.selected_mailbox is other
+        assert attachments["4"][0]._mailbox == inbox
+
+    @patch.object(IMAP4_SSL, "uid", return_value=("NO", [b"Failure"]))
+    def test_fetch_attachments_failed(self, imap_uid_mock, logged_account):
+        with raises(MessageFetchingFailed):
+            logged_account.fetch_attachments_using_uids(["4"])
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_download_part(self, imap_uid_mock, logged_account):
+        imap_uid_mock.return_value = "OK", [
+            (b"1 (UID 4 BODY[2] {10}", b"Y29udGVudA"),
+            b")",
+        ]
+
+        content = logged_account.download_part("4", "2", "base64")
+
+        imap_uid_mock.assert_called_once_with("FETCH", "4", "(BODY.PEEK[2])")
+        assert content == b"content"
+
+    @patch.object(IMAP4_SSL, "select")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_download_part_other_mailbox(
+        self, imap_uid_mock, imap_select_mock, logged_account_with_inbox
+    ):
+        imap_uid_mock.return_value = "OK", [
+            (b"1 (UID 4 BODY[2] {7}", b"content"),
+            b")",
+        ]
+        inbox = logged_account_with_inbox.inbox()
+        other = inbox.copy(update={"path": "Other", "label": "Other"})
+        logged_account_with_inbox.selected_mailbox = other
+
+        content = logged_account_with_inbox.download_part("4", "2", mailbox=inbox)
+
+        assert content == b"content"
+        assert imap_select_mock.call_args_list == [call("Inbox"), call("Other")]
+        assert logged_account_with_inbox.selected_mailbox is other
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_download_missing_part(self, imap_uid_mock, logged_account):
+        imap_uid_mock.return_value = "OK", [b"1 (UID 4 BODY[3] NIL)"]
+
+        assert logged_account.download_part("4", "3") == b""
+
+    @patch.object(IMAP4_SSL, "uid", return_value=("OK", [None]))
+    def test_download_part_missing_message(self, imap_uid_mock, logged_account):
+        with raises(MessageNotFound):
+            logged_account.download_part("4", "2")
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_stream_part(self, imap_uid_mock, logged_account):
+        imap_uid_mock.side_effect = [
+            ("OK", [(b"1 (UID 4 BODY[2]<0> {6}", b"Y29ud\r"), b")"]),
+            ("OK", [(b"1 (UID 4 BODY[2]<6> {6}", b"\nGVudA"), b")"]),
+            ("OK", [(b"1 (UID 4 BODY[2]<12> {2}", b"=="), b")"]),
+        ]
+
+        chunks = list(logged_account.stream_part("4", "2", "base64", chunk_size=6))
+
+        assert imap_uid_mock.call_args_list == [
+            call("FETCH", "4", "(BODY.PEEK[2]<0.6>)"),
+            call("FETCH", "4", "(BODY.PEEK[2]<6.6>)"),
+            call("FETCH", "4", "(BODY.PEEK[2]<12.6>)"),
+        ]
+        assert chunks == [b"con", b"ten", b"t"]
+
+    def test_stream_part_not_connected(self, account):
+        with raises(NotConnected):
+            next(account.stream_part("4", "2"))
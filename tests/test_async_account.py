@@ -0,0 +1,330 @@
+import asyncio
+from base64 import b64decode
+
+import pytest
+from pytest import raises
+
+from ggmail.async_account import AsyncAccount
+from ggmail.async_imap import AsyncIMAP4
+from ggmail.async_mailbox import AsyncMailbox
+from ggmail.authentication import Google, GoogleOAuth2
+from ggmail.exception import LoginFailed, NotConnected
+from ggmail.flag import Flag
+from ggmail.mailbox import MailboxKind
+
+RAW_MESSAGE = (
+    b"From: from@gmail.com\r\n"
+    b"To: to@gmail.com\r\n"
+    b"Subject: Subject\r\n"
+    b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"\r\n"
+    b"Body\r\n"
+)
+
+
+class ScriptedServer:
+    """
+    Tiny IMAP server answering each command using a dictionary of responses
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.commands = []
+
+    async def handle(self, reader, writer):
+        writer.write(b"* OK ready\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            tag, command = line.rstrip(b"\r\n").split(b" ", 1)
+            self.commands.append(command)
+            name = command.split(b" ")[0]
+
+            if name == b"AUTHENTICATE":
+                writer.write(b"+ \r\n")
+                self.commands.append(b64decode(await reader.readline()))
+
+            for response in self.responses.get(name, []):
+                writer.write(response + b"\r\n")
+
+            status = b"NO" if name in self.responses.get(b"FAIL", []) else b"OK"
+            writer.write(tag + b" " + status + b" done\r\n")
+            await writer.drain()
+
+            if name == b"LOGOUT":
+                break
+        writer.close()
+
+
+def run_with_server(responses, scenario, authentication_class=Google, **credentials):
+    server = ScriptedServer(responses)
+
+    async def main():
+        tcp_server = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = tcp_server.sockets[0].getsockname()[1]
+        credentials.setdefault("username", "test@gmail.com")
+        authentication = authentication_class(
+            host="127.0.0.1", port=port, **credentials
+        )
+        account = AsyncAccount(authentication=authentication)
+        account._imap.secure = False
+        try:
+            return await scenario(account)
+        finally:
+            tcp_server.close()
+            await tcp_server.wait_closed()
+
+    return asyncio.run(main()), server.commands
+
+
+BASE_RESPONSES = {
+    b"CAPABILITY": [b"* CAPABILITY IMAP4rev1 MOVE"],
+    b"LIST": [
+        b'* LIST (\\HasNoChildren) "/" "INBOX"',
+        b'* LIST (\\HasNoChildren \\Trash) "/" "[Gmail]/Trash"',
+    ],
+    b"SELECT": [b"* 1 EXISTS", b"* OK [UIDVALIDITY 3] UIDs valid"],
+    b"UID": [
+        b"* SEARCH 1 2",
+        b"* 1 FETCH (UID 1 FLAGS (\\Seen) BODY[] {%d}" % len(RAW_MESSAGE),
+        RAW_MESSAGE + b")",
+        b"* 2 FETCH (UID 2 FLAGS () BODY[] {%d}" % len(RAW_MESSAGE),
+        RAW_MESSAGE + b")",
+    ],
+}
+
+
+class TestAsyncAccountLogin:
+    def test_login_logout(self):
+        async def scenario(account):
+            async with account:
+                assert account.is_connected is True
+                assert "MOVE" in account._imap.capabilities
+            return account.is_connected
+
+        is_connected, commands = run_with_server(
+            BASE_RESPONSES, scenario, password="secret"
+        )
+
+        assert is_connected is False
+        assert commands[1] == b'LOGIN test@gmail.com "secret"'
+        assert commands[-1] == b"LOGOUT"
+
+    def test_login_oauth2(self):
+        async def scenario(account):
+            await account.login()
+
+        _, commands = run_with_server(
+            BASE_RESPONSES, scenario, GoogleOAuth2, token="token"
+        )
+
+        assert commands[1] == b"AUTHENTICATE XOAUTH2"
+        assert commands[2] == b"user=test@gmail.com\1auth=Bearer token\1\1"
+
+    def test_login_failed(self):
+        async def scenario(account):
+            with raises(LoginFailed):
+                await account.login()
+            return account.is_connected
+
+        responses = {**BASE_RESPONSES, b"FAIL": [b"LOGIN"]}
+        is_connected, _ = run_with_server(responses, scenario, password="secret")
+
+        assert is_connected is False
+
+    def test_not_connected(self):
+        async def scenario(account):
+            with raises(NotConnected):
+                await account.mailboxes()
+
+        run_with_server(BASE_RESPONSES, scenario, password="secret")
+
+
+class TestAsyncAccountMailboxes:
+    def test_mailboxes(self):
+        async def scenario(account):
+            async with account:
+                return await account.mailboxes(), await account.trash()
+
+        (mailboxes, trash), _ = run_with_server(
+            BASE_RESPONSES, scenario, password="secret"
+        )
+
+        assert len(mailboxes) == 2
+        assert all(isinstance(mailbox, AsyncMailbox) for mailbox in mailboxes)
+        assert trash.kind is MailboxKind.TRASH
+        assert trash.path == "[Gmail]/Trash"
+
+    def test_create_and_delete_mailbox(self):
+        async def scenario(account):
+            async with account:
+                mailbox = await account.create_mailbox("Custom")
+                await account.delete_mailbox(mailbox)
+                return await account.customs()
+
+        customs, commands = run_with_server(BASE_RESPONSES, scenario, password="secret")
+
+        assert customs == []
+        assert b"CREATE Custom" in commands
+        assert b"DELETE Custom" in commands
+
+
+class TestAsyncAccountMessages:
+    def test_fetch_messages(self):
+        async def scenario(account):
+            async with account:
+                inbox = await account.inbox()
+                return await inbox.fetch()
+
+        messages, commands = run_with_server(
+            BASE_RESPONSES, scenario, password="secret"
+        )
+
+        assert b"SELECT Inbox" in commands
+        assert b"UID SEARCH ALL" in commands
+        assert b"UID FETCH 1:2 (BODY.PEEK[] FLAGS)" in commands
+        assert messages[0].subject == "Subject"
+        assert messages[0].body == "Body\r\n"
+        assert messages[0].flags == [Flag.SEEN]
+
+    def test_iter_messages(self):
+        async def scenario(account):
+            async with account:
+                inbox = await account.inbox()
+                return [message async for message in inbox.iter(batch_size=1)]
+
+        messages, commands = run_with_server(
+            BASE_RESPONSES, scenario, password="secret"
+        )
+
+        assert b"UID FETCH 1 (BODY.PEEK[] FLAGS)" in commands
+        assert b"UID FETCH 2 (BODY.PEEK[] FLAGS)" in commands
+        assert len(messages) == 2
+
+    def test_search_message_uids(self):
+        async def scenario(account):
+            async with account:
+                return await account.search_message_uids()
+
+        uids, _ = run_with_server(BASE_RESPONSES, scenario, password="secret")
+
+        assert uids == ["1", "2"]
+
+    @pytest.mark.parametrize(
+        "capabilities,with_expunge,expected_commands",
+        [
+            pytest.param(
+                b"IMAP4rev1 MOVE",
+                False,
+                [b"UID MOVE 1 [Gmail]/Trash"],
+                id="move",
+            ),
+            pytest.param(
+                b"IMAP4rev1",
+                False,
+                [b"UID COPY 1 [Gmail]/Trash", b"UID STORE 1 +FLAGS.SILENT (\\Deleted)"],
+                id="copy",
+            ),
+            pytest.param(
+                b"IMAP4rev1 UIDPLUS",
+                True,
+                [
+                    b"UID COPY 1 [Gmail]/Trash",
+                    b"UID STORE 1 +FLAGS.SILENT (\\Deleted)",
+                    b"UID EXPUNGE 1",
+                ],
+                id="uidplus",
+            ),
+            pytest.param(
+                b"IMAP4rev1",
+                True,
+                [
+                    b"UID COPY 1 [Gmail]/Trash",
+                    b"UID STORE 1 +FLAGS.SILENT (\\Deleted)",
+                    b"EXPUNGE",
+                ],
+                id="expunge",
+            ),
+        ],
+    )
+    def test_move_message(self, capabilities, with_expunge, expected_commands):
+        async def scenario(account):
+            async with account:
+                inbox = await account.inbox()
+                trash = await account.trash()
+                messages = await inbox.fetch()
+                await messages[0].move(trash, with_expunge=with_expunge)
+                return messages[0]
+
+        responses = {**BASE_RESPONSES, b"CAPABILITY": [b"* CAPABILITY " + capabilities]}
+        message, commands = run_with_server(responses, scenario, password="secret")
+
+        fetch_index = commands.index(b"UID FETCH 1:2 (BODY.PEEK[] FLAGS)")
+        move_index = fetch_index + 1
+        assert commands[move_index:-1] == expected_commands
+        assert message.is_deleted()
+
+    def test_flag_message(self):
+        async def scenario(account):
+            async with account:
+                messages = await (await account.inbox()).fetch()
+                await messages[0].star()
+                await messages[0].unseen()
+                return messages[0]
+
+        message, commands = run_with_server(BASE_RESPONSES, scenario, password="secret")
+
+        assert b"UID STORE 1 +FLAGS.SILENT (\\Flagged)" in commands
+        assert b"UID STORE 1 -FLAGS.SILENT (\\Seen)" in commands
+        assert message.flags == [Flag.FLAGGED]
+
+
+class TestAsyncIMAP4:
+    def test_untagged_response_codes(self):
+        async def scenario(account):
+            async with account:
+                await (await account.inbox()).select()
+                return account._imap.untagged_responses
+
+        untagged_responses, _ = run_with_server(
+            BASE_RESPONSES, scenario, password="secret"
+        )
+
+        assert untagged_responses["UIDVALIDITY"] == [b"3"]
+
+    def test_large_search_response(self):
+        uids = [str(uid) for uid in range(1, 20001)]
+        responses = {
+            **BASE_RESPONSES,
+            b"UID": [b"* SEARCH " + " ".join(uids).encode("ascii")],
+        }
+
+        async def scenario(account):
+            async with account:
+                return await account.search_message_uids()
+
+        found, _ = run_with_server(responses, scenario, password="secret")
+
+        assert found == uids
+
+    def test_line_too_long(self, monkeypatch):
+        monkeypatch.setattr("ggmail.async_imap._LINE_LIMIT", 1024)
+        responses = {**BASE_RESPONSES, b"NOOP": [b"* OK " + b"x" * 4096]}
+
+        async def scenario(account):
+            await account.login()
+            with raises(AsyncIMAP4.abort):
+                await account._imap.noop()
+            return account._imap._writer
+
+        writer, _ = run_with_server(responses, scenario, password="secret")
+
+        assert writer is None
+
+    def test_command_not_opened(self):
+        imap = AsyncIMAP4("127.0.0.1")
+
+        with raises(AsyncIMAP4.abort):
+            asyncio.run(imap.noop())
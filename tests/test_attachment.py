@@ -0,0 +1,180 @@
+import base64
+import quopri
+from unittest.mock import Mock
+
+import pytest
+
+from ggmail.attachment import (
+    TransferDecoder,
+    attachments_from_bodystructure,
+    iter_parts,
+)
+from ggmail.message import Attachment
+
+TEXT = ["TEXT", "PLAIN", ["CHARSET", "utf-8"], None, None, "7BIT", 12, 1]
+HTML = ["TEXT", "HTML", ["CHARSET", "utf-8"], None, None, "QUOTED-PRINTABLE", 40, 2]
+PDF = ["APPLICATION", "PDF", ["NAME", "report.pdf"], None, None, "BASE64", 1000]
+
+
+def chunks(data: bytes, size: int) -> list:
+    pieces = []
+    for start in range(0, len(data), size):
+        end = start + size
+        pieces.append(data[start:end])
+    return pieces
+
+
+def attachment(*disposition) -> list:
+    return [None, ["ATTACHMENT", list(disposition) or None], None]
+
+
+class TestAttachmentsFromBodystructure:
+    def test_attachments(self):
+        bodystructure = [[TEXT, HTML, "ALTERNATIVE"], PDF + attachment(), "MIXED"]
+        account, mailbox = Mock(), Mock()
+
+        attachments = attachments_from_bodystructure(
+            "4", bodystructure, account, mailbox
+        )
+
+        assert attachments == [
+            Attachment(
+                account,
+                uid="4",
+                part="2",
+                filename="report.pdf",
+                content_type="application/pdf",
+                size=1000,
+                encoding="base64",
+            )
+        ]
+        assert attachments[0]._account is account
+        assert attachments[0]._mailbox is mailbox
+
+    def test_single_part_attachment(self):
+        bodystructure = PDF + attachment("FILENAME", "other.pdf")
+
+        attachments = attachments_from_bodystructure("4", bodystructure, Mock())
+
+        assert [(item.part, item.filename) for item in attachments] == [
+            ("1", "other.pdf")
+        ]
+
+    def test_nested_parts(self):
+        image = ["IMAGE", "PNG", ["NAME", "logo.png"], "<logo>", None, "BASE64", 80]
+        related = [HTML, image + [None, ["INLINE", None]], "RELATED"]
+        bodystructure = [[TEXT, related, "ALTERNATIVE"], PDF, "MIXED"]
+
+        attachments = attachments_from_bodystructure("4", bodystructure, Mock())
+
+        assert [(item.part, item.filename) for item in attachments] == [
+            ("1.2.2", "logo.png"),
+            ("2", "report.pdf"),
+        ]
+
+    def test_inline_text_is_not_an_attachment(self):
+        bodystructure = [TEXT + [None, ["INLINE", None]], HTML, "ALTERNATIVE"]
+
+        assert attachments_from_bodystructure("4", bodystructure, Mock()) == []
+
+    def test_attached_message(self):
+        envelope = [None] * 10
+        rfc822 = ["MESSAGE", "RFC822", None, None, None, "7BIT", 300, envelope]
+        rfc822 += [[PDF + attachment(), TEXT, "MIXED"], 10]
+        bodystructure = [TEXT, rfc822 + attachment(), "MIXED"]
+
+        attachments = attachments_from_bodystructure("4", bodystructure, Mock())
+
+        assert [(item.part, item.content_type) for item in attachments] == [
+            ("2", "message/rfc822")
+        ]
+        assert attachments[0].filename is None
+
+    @pytest.mark.parametrize(
+        "disposition, expected",
+        [
+            (["FILENAME*", "utf-8''na%C3%AFve.txt"], "naïve.txt"),
+            (["FILENAME", "=?utf-8?q?caf=C3=A9.txt?="], "café.txt"),
+            (["FILENAME", 'say "hi".txt'], 'say "hi".txt'),
+        ],
+    )
+    def test_encoded_filename(self, disposition, expected):
+        bodystructure = PDF[:2] + [None] + PDF[3:] + attachment(*disposition)
+
+        attachments = attachments_from_bodystructure("4", bodystructure, Mock())
+
+        assert attachments[0].filename == expected
+
+    def test_iter_parts(self):
+        bodystructure = [[TEXT, HTML, "ALTERNATIVE"], PDF, "MIXED", ["BOUNDARY", "b"]]
+
+        assert [part for part, _ in iter_parts(bodystructure)] == ["1.1", "1.2", "2"]
+
+
+class TestTransferDecoder:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 4, 7, 77, 1000])
+    def test_base64(self, chunk_size):
+        content = bytes(range(256)) * 3
+        encoded = base64.encodebytes(content).replace(b"\n", b"\r\n")
+        decoder = TransferDecoder("BASE64")
+
+        decoded = b"".join(
+            decoder.decode(chunk) for chunk in chunks(encoded, chunk_size)
+        )
+
+        assert decoded + decoder.decode(b"", final=True) == content
+
+    def test_base64_truncated(self):
+        decoder = TransferDecoder("base64")
+
+        assert decoder.decode(b"YWJjZA=", final=True) == b"abcd"
+        assert TransferDecoder("base64").decode(b"YWJjZ", final=True) == b"abc"
+
+    @pytest.mark.parametrize("chunk_size", [1, 5, 76, 1000])
+    def test_quoted_printable(self, chunk_size):
+        content = ("Café crème, " * 20 + "\r\n").encode("utf8") * 3
+        encoded = quopri.encodestring(content)
+        decoder = TransferDecoder("quoted-printable")
+
+        decoded = b"".join(
+            decoder.decode(chunk) for chunk in chunks(encoded, chunk_size)
+        )
+
+        assert decoded + decoder.decode(b"", final=True) == content
+
+    def test_identity(self):
+        decoder = TransferDecoder(None)
+
+        assert decoder.decode(bytearray(b"raw")) == b"raw"
+        assert TransferDecoder("8bit").decode(b"=41") == b"=41"
+
+
+class TestAttachment:
+    @pytest.fixture
+    def attachment(self):
+        return Attachment(
+            Mock(),
+            _mailbox=Mock(),
+            uid="4",
+            part="2",
+            filename="report.pdf",
+            content_type="application/pdf",
+            size=1000,
+            encoding="base64",
+        )
+
+    def test_download(self, attachment):
+        attachment._account.download_part.return_value = b"content"
+
+        assert attachment.download() == b"content"
+        attachment._account.download_part.assert_called_once_with(
+            "4", "2", "base64", mailbox=attachment._mailbox
+        )
+
+    def test_stream(self, attachment):
+        attachment._account.stream_part.return_value = iter([b"con", b"tent"])
+
+        assert list(attachment.stream(chunk_size=3)) == [b"con", b"tent"]
+        attachment._account.stream_part.assert_called_once_with(
+            "4", "2", "base64", 3, mailbox=attachment._mailbox
+        )
@@ -1,3 +1,4 @@
+import asyncio
 from imaplib import IMAP4, IMAP4_SSL
 from unittest.mock import patch
 
@@ -5,7 +6,8 @@ import pytest
 from pytest import raises
 
 from ggmail.account import Account
-from ggmail.authentication import Google, GoogleOAuth2, Outlook
+from ggmail.async_imap import AsyncIMAP4
+from ggmail.authentication import Authentication, Google, GoogleOAuth2, Outlook
 from ggmail.exception import AlreadyConnected, LoginFailed
 
 
@@ -79,3 +81,28 @@ class TestAuthenticationLogin:
 
         with raises(LoginFailed):
             account.login()
+
+
+class CustomAuthentication(Authentication):
+    password: str
+    host: str = "imap.example.com"
+    port: int = 993
+
+    def login(self, imap: IMAP4):
+        imap.login(self.username, self.password)
+
+
+class TestCustomAuthentication:
+    @patch.object(IMAP4_SSL, "login")
+    def test_login_without_async_login(self, imap_login_mock):
+        authentication = CustomAuthentication(username="user", password="secret")
+
+        Account(authentication=authentication).login()
+
+        imap_login_mock.assert_called_once_with("user", "secret")
+
+    def test_async_login_not_implemented(self):
+        authentication = CustomAuthentication(username="user", password="secret")
+
+        with raises(NotImplementedError):
+            asyncio.run(authentication.async_login(AsyncIMAP4("imap.example.com")))
@@ -0,0 +1,190 @@
+from imaplib import IMAP4_SSL
+from unittest.mock import call, patch
+
+from pytest import fixture, raises
+
+from ggmail.flag import Flag
+from ggmail.mailbox import Mailbox, MailboxKind
+
+
+def make_mailbox(path, account):
+    return Mailbox(
+        label=path,
+        path=path,
+        kind=MailboxKind.CUSTOM,
+        has_children=False,
+        _account=account,
+    )
+
+
+@fixture
+def inbox(logged_account):
+    inbox = make_mailbox("Inbox", logged_account)
+    logged_account.selected_mailbox = inbox
+    return inbox
+
+
+class TestAccountBatchFlags:
+    @patch.object(IMAP4_SSL, "uid")
+    def test_flags_coalesced(self, imap_uid_mock, logged_account, inbox, messages):
+        with logged_account.batch():
+            for message in messages:
+                message.star()
+                message.seen()
+            imap_uid_mock.assert_not_called()
+            assert messages[0].flags == [Flag.FLAGGED, Flag.SEEN]
+
+        imap_uid_mock.assert_called_once_with(
+            "STORE", "1:2", "+FLAGS.SILENT", "(\\Flagged \\Seen)"
+        )
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_flags_last_update_wins(
+        self, imap_uid_mock, logged_account, inbox, messages
+    ):
+        with logged_account.batch():
+            for message in messages:
+                message.star()
+            messages[0].unstar()
+
+        assert imap_uid_mock.call_args_list == [
+            call("STORE", "2", "+FLAGS.SILENT", "(\\Flagged)"),
+            call("STORE", "1", "-FLAGS.SILENT", "(\\Flagged)"),
+        ]
+        assert messages[0].flags == []
+        assert messages[1].flags == [Flag.FLAGGED]
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_nested_batch(self, imap_uid_mock, logged_account, inbox, messages):
+        with logged_account.batch() as outer:
+            with logged_account.batch() as inner:
+                messages[0].seen()
+            assert inner is outer
+            imap_uid_mock.assert_not_called()
+            messages[1].seen()
+
+        imap_uid_mock.assert_called_once_with(
+            "STORE", "1:2", "+FLAGS.SILENT", "(\\Seen)"
+        )
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_flushed_on_exit(self, imap_uid_mock, logged_account, inbox, message):
+        with logged_account.batch():
+            message.seen()
+
+        imap_uid_mock.assert_called_once_with("STORE", "1", "+FLAGS.SILENT", "(\\Seen)")
+        assert logged_account._batch is None
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_discarded_on_error(self, imap_uid_mock, logged_account, inbox, message):
+        with raises(ValueError):
+            with logged_account.batch():
+                message.seen()
+                raise ValueError()
+
+        imap_uid_mock.assert_not_called()
+        assert logged_account._batch is None
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_nested_batch_error_discards_outer(
+        self, imap_uid_mock, logged_account, inbox, messages
+    ):
+        with raises(ValueError):
+            with logged_account.batch():
+                messages[0].seen()
+                with logged_account.batch():
+                    raise ValueError()
+
+        imap_uid_mock.assert_not_called()
+
+
+class TestAccountBatchMoves:
+    @patch.object(IMAP4_SSL, "expunge")
+    @patch.object(IMAP4_SSL, "capability")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_moves_with_uidplus(
+        self,
+        imap_uid_mock,
+        imap_capability_mock,
+        imap_expunge_mock,
+        logged_account,
+        inbox,
+        messages,
+    ):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1 UIDPLUS"]
+        archive = make_mailbox("Archive", logged_account)
+        trash = make_mailbox("Trash", logged_account)
+
+        with logged_account.batch():
+            messages[0].copy(trash)
+            messages[0].move(archive, with_expunge=True)
+            messages[1].move(archive, with_expunge=True)
+
+        assert imap_uid_mock.call_args_list == [
+            call("COPY", "1", "Trash"),
+            call("COPY", "1:2", "Archive"),
+            call("STORE", "1:2", "+FLAGS.SILENT", "(\\Deleted)"),
+            call("EXPUNGE", "1:2"),
+        ]
+        imap_expunge_mock.assert_not_called()
+        assert all(message.is_deleted() for message in messages)
+
+    @patch.object(IMAP4_SSL, "expunge")
+    @patch.object(IMAP4_SSL, "capability")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_moves_with_move(
+        self,
+        imap_uid_mock,
+        imap_capability_mock,
+        imap_expunge_mock,
+        logged_account,
+        inbox,
+        messages,
+    ):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1 MOVE UIDPLUS"]
+        archive = make_mailbox("Archive", logged_account)
+
+        with logged_account.batch():
+            for message in messages:
+                message.seen()
+                message.move(archive, with_expunge=True)
+
+        assert imap_uid_mock.call_args_list == [
+            call("STORE", "1:2", "+FLAGS.SILENT", "(\\Seen)"),
+            call("MOVE", "1:2", "Archive"),
+        ]
+        imap_expunge_mock.assert_not_called()
+
+    @patch.object(IMAP4_SSL, "expunge")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_expunge_once(
+        self, imap_uid_mock, imap_expunge_mock, logged_account, inbox, messages
+    ):
+        with logged_account.batch():
+            for message in messages:
+                message.delete()
+                logged_account.expunge()
+
+        imap_expunge_mock.assert_called_once()
+
+    @patch.object(IMAP4_SSL, "select")
+    @patch.object(IMAP4_SSL, "uid")
+    def test_several_source_mailboxes(
+        self, imap_uid_mock, imap_select_mock, logged_account, inbox, messages
+    ):
+        other = make_mailbox("Other", logged_account)
+
+        with logged_account.batch():
+            messages[0].seen()
+            logged_account.select_mailbox(other)
+            messages[1].seen()
+
+        assert imap_select_mock.call_args_list == [
+            call("Other"),
+            call("Inbox"),
+            call("Other"),
+        ]
+        assert imap_uid_mock.call_args_list == [
+            call("STORE", "1", "+FLAGS.SILENT", "(\\Seen)"),
+            call("STORE", "2", "+FLAGS.SILENT", "(\\Seen)"),
+        ]
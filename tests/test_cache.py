@@ -0,0 +1,132 @@
+from imaplib import IMAP4_SSL
+from unittest.mock import call, patch
+
+from pytest import fixture
+
+from ggmail.cache import MessageCache
+from ggmail.flag import Flag
+from ggmail.mailbox import Mailbox, MailboxKind
+
+RAW_MESSAGE = (
+    b"From: from@gmail.com\r\n"
+    b"To: to@gmail.com\r\n"
+    b"Subject: Subject\r\n"
+    b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n"
+    b"Content-Type: text/plain\r\n\r\n"
+    b"Body"
+)
+
+
+@fixture
+def cache():
+    with MessageCache() as cache:
+        yield cache
+
+
+class TestMessageCache:
+    def test_store_messages(self, cache):
+        cache.store_messages("Inbox", "1", {"1": b"msg1", "3": b"msg3"})
+
+        assert cache.messages("Inbox", "1", ["1", "2", "3"]) == {
+            "1": b"msg1",
+            "3": b"msg3",
+        }
+        assert cache.messages("Other", "1", ["1"]) == {}
+        assert cache.uids("Inbox") == ["1", "3"]
+
+    def test_uidvalidity_changed(self, cache):
+        cache.store_messages("Inbox", "1", {"1": b"msg1"})
+        cache.store_messages("Other", "1", {"1": b"msg1"})
+
+        assert cache.messages("Inbox", "2", ["1"]) == {}
+        assert cache.messages("Inbox", "1", ["1"]) == {}
+        assert cache.uids("Other") == ["1"]
+
+    def test_many_messages(self, cache):
+        raw_messages = {str(uid): b"msg" for uid in range(1, 2001)}
+        cache.store_messages("Inbox", "1", raw_messages)
+
+        assert cache.messages("Inbox", "1", list(raw_messages)) == raw_messages
+
+    def test_clear(self, cache):
+        cache.store_messages("Inbox", "1", {"1": b"msg1"})
+        cache.store_messages("Other", "1", {"1": b"msg1"})
+
+        cache.clear("Inbox")
+        assert cache.uids("Inbox") == []
+        assert cache.uids("Other") == ["1"]
+
+        cache.clear()
+        assert cache.uids("Other") == []
+
+    def test_persistent(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+
+        with MessageCache(path=path) as cache:
+            cache.store_messages("Inbox", "1", {"1": b"msg1"})
+
+        with MessageCache(path=path) as cache:
+            assert cache.messages("Inbox", "1", ["1"]) == {"1": b"msg1"}
+
+
+class TestAccountCache:
+    @fixture
+    def cached_account(self, logged_account, cache):
+        logged_account.cache = cache
+        inbox = Mailbox(
+            label="Inbox",
+            path="Inbox",
+            kind=MailboxKind.INBOX,
+            has_children=False,
+            _account=logged_account,
+        )
+        with patch.object(IMAP4_SSL, "select"), patch.object(
+            IMAP4_SSL, "response", return_value=("UIDVALIDITY", [b"42"])
+        ):
+            logged_account.select_mailbox(inbox)
+        return logged_account
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_fetch_stores_messages(self, imap_uid_mock, cached_account, cache):
+        imap_uid_mock.return_value = "OK", [
+            (b"1 (UID 1 FLAGS (\\Seen) BODY[] {10}", RAW_MESSAGE),
+            b")",
+        ]
+
+        messages = cached_account.fetch_messages_using_uids(["1"])
+
+        imap_uid_mock.assert_called_once_with("FETCH", "1", "(BODY.PEEK[] FLAGS)")
+        assert messages[0].body == "Body"
+        assert cache.messages("Inbox", "42", ["1"]) == {"1": RAW_MESSAGE}
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_fetch_uses_cache(self, imap_uid_mock, cached_account, cache):
+        cache.store_messages("Inbox", "42", {"1": RAW_MESSAGE, "2": RAW_MESSAGE})
+        imap_uid_mock.side_effect = [
+            ("OK", [b"1 (UID 1 FLAGS (\\Flagged))"]),
+            ("OK", [(b"3 (UID 3 FLAGS () BODY[] {10}", RAW_MESSAGE), b")"]),
+        ]
+
+        messages = cached_account.fetch_messages_using_uids(["1", "2", "3"])
+
+        assert imap_uid_mock.call_args_list == [
+            call("FETCH", "1:2", "(FLAGS)"),
+            call("FETCH", "3", "(BODY.PEEK[] FLAGS)"),
+        ]
+        assert [message.uid for message in messages] == ["1", "3"]
+        assert messages[0].flags == [Flag.FLAGGED]
+        assert messages[0].body == "Body"
+        assert cache.uids("Inbox") == ["1", "2", "3"]
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_fetch_without_uidvalidity(self, imap_uid_mock, cached_account, cache):
+        cached_account._uidvalidity = None
+        cache.store_messages("Inbox", "42", {"1": RAW_MESSAGE})
+        imap_uid_mock.return_value = "OK", [
+            (b"1 (UID 1 FLAGS () BODY[] {10}", RAW_MESSAGE),
+            b")",
+        ]
+
+        cached_account.fetch_messages_using_uids(["1"])
+
+        imap_uid_mock.assert_called_once_with("FETCH", "1", "(BODY.PEEK[] FLAGS)")
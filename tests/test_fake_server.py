@@ -0,0 +1,195 @@
+from pytest import fixture, raises, skip
+
+from ggmail.account import Account
+from ggmail.authentication import Google
+from ggmail.exception import LoginFailed, MailboxNotFound
+from ggmail.flag import Flag
+from ggmail.mailbox import MailboxKind
+from ggmail.message import FetchMode
+from ggmail.policy import flagged, seen, subject_contains
+from tests.fake_server import (
+    FakeIMAPServer,
+    FakeMailbox,
+    FakeMessage,
+    make_message,
+    self_signed_context,
+    synthetic_mailbox,
+)
+
+
+@fixture
+def server():
+    mailboxes = [
+        synthetic_mailbox(count=5, structure="multipart"),
+        FakeMailbox("Archive"),
+        FakeMailbox("Trash", attributes=["\\Trash"]),
+    ]
+    with FakeIMAPServer(mailboxes, password="password") as fake:
+        yield fake
+
+
+def create_account(server, password="password", secure=False):
+    authentication = Google(
+        username="user",
+        password=password,
+        host=server.host,
+        port=server.port,
+        secure=secure,
+    )
+    return Account(authentication=authentication)
+
+
+@fixture
+def account(server):
+    with create_account(server) as account:
+        yield account
+
+
+class TestFakeServer:
+    def test_login_failed(self, server):
+        with raises(LoginFailed):
+            create_account(server, password="wrong").login()
+
+    def test_mailboxes(self, account):
+        mailboxes = account.mailboxes()
+
+        assert [mailbox.path for mailbox in mailboxes] == ["Inbox", "Archive", "Trash"]
+        assert mailboxes[0].kind == MailboxKind.INBOX
+        assert mailboxes[2].kind == MailboxKind.TRASH
+
+    def test_select_unknown_mailbox(self, account):
+        with raises(MailboxNotFound):
+            account.mailbox_from_path("Unknown").select()
+
+    def test_fetch(self, account):
+        messages = account.inbox().fetch()
+
+        assert [message.uid for message in messages] == ["1", "2", "3", "4", "5"]
+        assert messages[0].subject == "Message 1"
+        assert messages[0].body.startswith("Lorem ipsum")
+        assert messages[0].html.startswith("<html>")
+
+    def test_fetch_keep_raw(self, account):
+        account.keep_raw = True
+
+        message = account.inbox().fetch()[0]
+
+        assert b"Subject: Message 1\r\n" in bytes(message.raw)
+        assert message.html.startswith("<html>")
+
+    def test_fetch_headers(self, account):
+        messages = account.inbox().fetch(mode=FetchMode.HEADERS)
+
+        assert messages[1].subject == "Message 2"
+        assert messages[1].body.startswith("Lorem ipsum")
+        assert messages[1].encoding == "utf-8"
+
+    def test_fetch_headers_keeps_selection(self, server, account):
+        messages = account.inbox().fetch(mode=FetchMode.HEADERS)
+        account.mailbox_from_path("Archive").select()
+
+        assert messages[0].body.startswith("Lorem ipsum")
+        assert account.selected_mailbox.path == "Archive"
+        selects = [command for command in server.commands if command.startswith(b"SEL")]
+        assert selects[-1] == b"SELECT Archive"
+
+    def test_fetch_summaries(self, account):
+        summaries = account.inbox().fetch(mode=FetchMode.SUMMARY)
+
+        assert [summary.uid for summary in summaries] == [1, 2, 3, 4, 5]
+        assert summaries[2].has_flag(Flag.SEEN)
+        assert summaries[2].to_message().subject == "Message 3"
+
+    def test_search(self, account):
+        inbox = account.inbox()
+
+        assert len(inbox.search_uids(subject_contains("Message"))) == 5
+        assert inbox.search_uids(seen) == ["3"]
+        assert inbox.search_uids(seen + flagged) == []
+
+    def test_flags(self, account):
+        inbox = account.inbox()
+        messages = inbox.fetch()
+
+        account.add_flags_messages(messages[:2], [Flag.FLAGGED])
+        account.remove_flags_messages(messages[2:3], [Flag.SEEN])
+
+        assert inbox.search_uids(flagged) == ["1", "2"]
+        assert inbox.search_uids(seen) == []
+
+    def test_copy(self, account):
+        archive = account.mailbox_from_path("Archive")
+        inbox = account.inbox()
+
+        inbox.select()
+        account.copy_messages_using_uids(["1", "2"], archive)
+
+        assert len(inbox.search_uids()) == 5
+        assert len(archive.search_uids()) == 2
+
+    def test_move(self, account):
+        archive = account.mailbox_from_path("Archive")
+        inbox = account.inbox()
+
+        inbox.select()
+        account.move_messages_using_uids(["1", "2"], archive)
+
+        assert inbox.search_uids() == ["3", "4", "5"]
+        assert archive.fetch()[0].subject == "Message 1"
+
+
+def test_fake_server_attachments():
+    inbox = FakeMailbox(
+        "INBOX",
+        [
+            FakeMessage(1, make_message(1, 512)),
+            FakeMessage(2, make_message(2, 40000, "attachment")),
+        ],
+    )
+    content = bytes(index % 256 for index in range(40000))
+
+    with FakeIMAPServer([inbox]) as fake:
+        with create_account(fake) as account:
+            first, second = account.inbox().fetch()
+            attachment = second.attachments[0]
+
+            assert first.attachments == []
+            assert attachment.filename == "file-2.bin"
+            assert attachment.content_type == "application/octet-stream"
+            assert attachment.size > len(content)
+            assert attachment.download() == content
+            assert b"".join(attachment.stream(chunk_size=4096)) == content
+            assert second.download("1").startswith(b"Lorem ipsum")
+            assert not any(b"BODY[" in command for command in fake.commands)
+
+
+def test_fake_server_attachments_other_mailbox():
+    inbox = FakeMailbox("INBOX", [FakeMessage(1, make_message(1, 4000, "attachment"))])
+    archive = FakeMailbox("Archive", [FakeMessage(1, make_message(1, 512))])
+    content = bytes(index % 256 for index in range(4000))
+
+    with FakeIMAPServer([inbox, archive]) as fake:
+        with create_account(fake) as account:
+            (message,) = account.inbox().fetch()
+            account.mailbox_from_path("Archive").select()
+
+            attachment = message.attachments[0]
+
+            assert attachment.filename == "file-1.bin"
+            assert attachment.download() == content
+            assert b"".join(attachment.stream(chunk_size=1024)) == content
+            assert account.selected_mailbox.path == "Archive"
+
+
+@fixture
+def ssl_context(tmp_path):
+    context = self_signed_context(tmp_path)
+    if context is None:
+        skip("openssl is required to create a self-signed certificate")
+    return context
+
+
+def test_fake_server_tls(ssl_context):
+    with FakeIMAPServer([synthetic_mailbox(count=2)], ssl_context=ssl_context) as fake:
+        with create_account(fake, secure=True) as account:
+            assert [message.uid for message in account.inbox().fetch()] == ["1", "2"]
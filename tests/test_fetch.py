@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta, timezone
+
+from ggmail.fetch import (
+    iter_fetch_responses,
+    parse_fetch,
+    parse_internaldate,
+    parse_list,
+)
+from ggmail.flag import Flag
+
+
+class TestParseFetch:
+    def test_parse_fetch(self):
+        raw_response = [
+            (
+                b'1 (UID 4 RFC822.SIZE 6 INTERNALDATE " 9-Oct-2021 18:27:26 +0200" '
+                b"BODY[] {6}",
+                b"Body\r\n",
+            ),
+            b" FLAGS (\\Seen $Label) MODSEQ (12))",
+        ]
+
+        response = parse_fetch(raw_response)["4"]
+
+        assert response.sequence == 1
+        assert response.uid == "4"
+        assert response.size == 6
+        assert response.internaldate == datetime(
+            2021, 10, 9, 18, 27, 26, tzinfo=timezone(timedelta(hours=2))
+        )
+        assert response.flags == [Flag.SEEN, "$Label"]
+        assert response.modseq == 12
+        assert response.body == b"Body\r\n"
+        assert response.literals == {"BODY[]": b"Body\r\n"}
+        assert response.text.endswith(b"BODY[] {6} FLAGS (\\Seen $Label) MODSEQ (12))")
+
+    def test_parse_fetch_out_of_order(self):
+        raw_response = [
+            (b"2 (UID 9 BODY[] {2}", b"m9"),
+            b")",
+            (b"1 (UID 3 BODY[] {2}", b"m3"),
+            b")",
+        ]
+
+        responses = parse_fetch(raw_response)
+
+        assert list(responses) == ["9", "3"]
+        assert responses["3"].body == b"m3"
+        assert responses["9"].body == b"m9"
+
+    def test_parse_fetch_unsolicited(self):
+        raw_response = [
+            b"5 (FLAGS (\\Deleted))",
+            (b"1 (UID 3 BODY[] {2}", b"m3"),
+            b" FLAGS ())",
+            b"7 (UID 12 FLAGS (\\Flagged))",
+        ]
+
+        responses = parse_fetch(raw_response)
+
+        assert list(responses) == ["3", "12"]
+        assert responses["3"].flags == []
+        assert responses["12"].body is None
+
+    def test_parse_fetch_several_literals(self):
+        raw_response = [
+            (b"1 (UID 3 BODY[HEADER.FIELDS (UID FLAGS)] {4}", b"head"),
+            (b" BODY[TEXT]<0> {4}", b"text"),
+            b" UID 3)",
+        ]
+
+        response = parse_fetch(raw_response)["3"]
+
+        assert response.literals == {
+            "BODY[HEADER.FIELDS (UID FLAGS)]": b"head",
+            "BODY[TEXT]<0>": b"text",
+        }
+        assert response.flags is None
+
+    def test_parse_fetch_merges_duplicates(self):
+        raw_response = [
+            b"1 (UID 3 FLAGS (\\Seen))",
+            (b"1 (UID 3 BODY[] {2}", b"m3"),
+            b")",
+        ]
+
+        response = parse_fetch(raw_response)["3"]
+
+        assert response.flags == [Flag.SEEN]
+        assert response.body == b"m3"
+
+    def test_parse_fetch_bodystructure(self):
+        raw_response = [
+            (
+                b'1 (UID 3 BODYSTRUCTURE (("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL '
+                b'"7BIT" 12 1 NIL NIL NIL)("APPLICATION" "PDF" ("NAME" {9}',
+                b'a "b".pdf',
+            ),
+            b') NIL "UID 9 FLAGS (x)" "BASE64" 1000 NIL ("ATTACHMENT" NIL) NIL) '
+            b'"MIXED" ("BOUNDARY" "b") NIL NIL) FLAGS (\\Seen))',
+        ]
+        text = ["TEXT", "PLAIN", ["CHARSET", "utf-8"], None, None, "7BIT", 12, 1]
+        pdf = ["APPLICATION", "PDF", ["NAME", 'a "b".pdf'], None, "UID 9 FLAGS (x)"]
+
+        response = parse_fetch(raw_response)["3"]
+
+        assert response.bodystructure == [
+            text + [None, None, None],
+            pdf + ["BASE64", 1000, None, ["ATTACHMENT", None], None],
+            "MIXED",
+            ["BOUNDARY", "b"],
+            None,
+            None,
+        ]
+        assert response.uid == "3"
+        assert response.flags == [Flag.SEEN]
+        assert response.literals == {}
+
+    def test_parse_fetch_without_bodystructure(self):
+        response = parse_fetch([b"1 (UID 3 FLAGS ())"])["3"]
+
+        assert response.bodystructure is None
+
+    def test_parse_fetch_empty(self):
+        assert parse_fetch([None]) == {}
+
+    def test_iter_fetch_responses(self):
+        raw_response = [b")", b"1 (FLAGS ())", b"2 (UID 4)"]
+
+        responses = list(iter_fetch_responses(raw_response))
+
+        assert [response.sequence for response in responses] == [1, 2]
+        assert [response.uid for response in responses] == [None, "4"]
+
+    def test_parse_internaldate_malformed(self):
+        assert parse_internaldate(b"yesterday") is None
+
+
+class TestParseList:
+    def test_parse_list(self):
+        lines = [(b'("A" (1 NIL) atom "q\\"uote")', None)]
+
+        assert parse_list(lines) == ["A", [1, None], "atom", 'q"uote']
+
+    def test_parse_list_not_a_list(self):
+        assert parse_list([(b"NIL", None)]) == []
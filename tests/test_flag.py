@@ -0,0 +1,82 @@
+from pytest import raises
+
+from ggmail.flag import FLAG_BITS, Flag, FlagSet, format_flags
+from ggmail.message import decode_flags
+from ggmail.policy import keyword
+
+
+class TestFlagSet:
+    def test_membership(self):
+        flags = FlagSet([Flag.SEEN, "$Forwarded"])
+
+        assert Flag.SEEN in flags
+        assert "\\SEEN" in flags
+        assert "$Forwarded" in flags
+        assert Flag.FLAGGED not in flags
+        assert "$Junk" not in flags
+
+    def test_storage(self):
+        flags = FlagSet(["\\Seen", "\\Flagged", "$Forwarded"])
+
+        assert flags.bits == FLAG_BITS[Flag.SEEN] | FLAG_BITS[Flag.FLAGGED]
+        assert flags.keywords == {"$Forwarded"}
+        assert list(flags) == [Flag.FLAGGED, Flag.SEEN, "$Forwarded"]
+        assert len(flags) == 3
+
+    def test_equality(self):
+        flags = FlagSet([Flag.SEEN, "$Forwarded"])
+
+        assert flags == FlagSet(["$Forwarded", "\\Seen"])
+        assert flags == ["$Forwarded", Flag.SEEN]
+        assert flags != [Flag.SEEN]
+        assert FlagSet() == []
+
+    def test_operators(self):
+        flags = FlagSet([Flag.SEEN, "$Forwarded"])
+
+        assert flags | [Flag.DRAFT] == [Flag.SEEN, Flag.DRAFT, "$Forwarded"]
+        assert flags - ["$Forwarded"] == [Flag.SEEN]
+        assert flags & FlagSet([Flag.SEEN, Flag.DRAFT]) == [Flag.SEEN]
+        assert flags == [Flag.SEEN, "$Forwarded"]
+
+    def test_update(self):
+        flags = FlagSet()
+
+        flags.update([Flag.SEEN, "$Junk"])
+        flags.add(Flag.DRAFT)
+        flags.difference_update(FlagSet([Flag.SEEN]))
+        flags.discard("$Junk")
+        flags.discard("$Unknown")
+
+        assert flags == [Flag.DRAFT]
+
+    def test_remove_missing(self):
+        with raises(KeyError):
+            FlagSet().remove(Flag.SEEN)
+
+    def test_validate(self):
+        assert FlagSet.validate([Flag.SEEN]) == [Flag.SEEN]
+
+        with raises(TypeError):
+            FlagSet.validate("\\Seen")
+
+    def test_format_flags(self):
+        assert format_flags([Flag.SEEN, "$Junk"]) == "(\\Seen $Junk)"
+
+
+class TestDecodeFlags:
+    def test_decode_unknown_keywords(self):
+        header = b"6 (FLAGS (\\Seen $Forwarded $Junk) BODY[] {5043}"
+
+        flags = decode_flags(header)
+
+        assert flags == [Flag.SEEN, "$Forwarded", "$Junk"]
+
+    def test_keywords_interned(self):
+        first = decode_flags(b"1 (FLAGS ($Forwarded))")
+        second = decode_flags(b"2 (FLAGS ($Forwarded))")
+
+        assert next(iter(first)) is next(iter(second))
+
+    def test_keyword_policy(self):
+        assert keyword("$Junk").to_imap_standard() == "KEYWORD $Junk"
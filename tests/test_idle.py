@@ -0,0 +1,167 @@
+import socket
+from contextlib import closing
+from imaplib import IMAP4
+from threading import Thread
+from unittest.mock import patch
+
+from pytest import fixture, raises
+
+from ggmail.account import Account
+from ggmail.exception import MailboxNotFound
+from ggmail.idle import IdleEvent, IdleEventKind
+from ggmail.mailbox import Mailbox, MailboxKind
+from ggmail.message import FetchMode
+from ggmail.policy import all_
+from ggmail.policy import uid as uid_policy
+
+
+class IdleServer:
+    """
+    Server side of a socket pair accepting IDLE and DONE
+    """
+
+    def __init__(self, sock: socket.socket, accept: bool = True):
+        self.sock = sock
+        self.accept = accept
+        self.commands = []
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        tag = b""
+        try:
+            for line in self.sock.makefile("rb"):
+                line = line.rstrip(b"\r\n")
+                self.commands.append(line)
+                if line.endswith(b" IDLE"):
+                    tag = line.split(b" ")[0]
+                    if self.accept:
+                        self.send(b"+ idling")
+                    else:
+                        self.send(tag + b" NO IDLE not allowed")
+                elif line == b"DONE":
+                    self.send(tag + b" OK IDLE terminated")
+        except OSError:
+            pass
+
+    def send(self, line: bytes):
+        self.sock.sendall(line + b"\r\n")
+
+
+@fixture
+def socket_pair(logged_account):
+    client, server = socket.socketpair()
+    imap = logged_account._imap
+    imap.sock = client
+    imap.file = client.makefile("rb")
+    imap.tagpre = b"GG"
+    imap.tagnum = 0
+
+    logged_account.selected_mailbox = Mailbox(
+        label="Inbox",
+        path="Inbox",
+        kind=MailboxKind.INBOX,
+        has_children=False,
+        _account=logged_account,
+    )
+
+    yield server
+
+    imap.file.close()
+    client.close()
+    server.close()
+
+
+class TestAccountIdle:
+    def test_no_selected_mailbox(self, logged_account):
+        with raises(MailboxNotFound):
+            next(logged_account.idle())
+
+    def test_events(self, logged_account, socket_pair):
+        server = IdleServer(socket_pair)
+        server.send(b"* 3 EXISTS")
+        server.send(b"* OK Still here")
+        server.send(b"* 1 FETCH (FLAGS (\\Seen))")
+
+        with closing(logged_account.idle(timeout=5)) as events:
+            assert next(events) == IdleEvent(kind=IdleEventKind.EXISTS, number=3)
+            assert next(events) == IdleEvent(
+                kind=IdleEventKind.FETCH, number=1, data=b"(FLAGS (\\Seen))"
+            )
+
+        assert server.commands == [b"GG0 IDLE", b"DONE"]
+
+    def test_vanished(self, logged_account, socket_pair):
+        logged_account._sync_extension = "QRESYNC"
+        server = IdleServer(socket_pair)
+        server.send(b"* VANISHED 41,43:45")
+        server.send(b"* 5 EXISTS")
+
+        with closing(logged_account.idle(timeout=5)) as events:
+            assert next(events) == IdleEvent(
+                kind=IdleEventKind.VANISHED,
+                number=4,
+                data=b"41,43:45",
+                uids=["41", "43", "44", "45"],
+            )
+            assert next(events) == IdleEvent(kind=IdleEventKind.EXISTS, number=5)
+
+    def test_renewal(self, logged_account, socket_pair):
+        server = IdleServer(socket_pair)
+
+        events = list(logged_account.idle(timeout=0.5, renewal=0.2))
+
+        assert events == []
+        assert server.commands[:4] == [b"GG0 IDLE", b"DONE", b"GG1 IDLE", b"DONE"]
+        assert server.commands[1::2] == [b"DONE"] * (len(server.commands) // 2)
+
+    def test_refused(self, logged_account, socket_pair):
+        IdleServer(socket_pair, accept=False)
+
+        with raises(IMAP4.error):
+            next(logged_account.idle(timeout=5))
+
+    def test_bye(self, logged_account, socket_pair):
+        server = IdleServer(socket_pair)
+        server.send(b"* BYE Shutting down")
+
+        with raises(IMAP4.abort):
+            next(logged_account.idle(timeout=5))
+
+
+class TestAccountWatch:
+    @patch.object(Account, "fetch_messages_using_uids")
+    @patch.object(Account, "search_message_uids")
+    def test_watch_messages(
+        self,
+        account_search_message_uids_mock,
+        account_fetch_messages_using_uids_mock,
+        logged_account,
+        socket_pair,
+        message,
+    ):
+        server = IdleServer(socket_pair)
+        server.send(b"* 3 EXISTS")
+        logged_account._uidnext = 3
+        account_search_message_uids_mock.return_value = ["2", "3"]
+        account_fetch_messages_using_uids_mock.return_value = [message]
+
+        with closing(logged_account.watch_messages(timeout=5)) as messages:
+            assert next(messages) is message
+
+        account_search_message_uids_mock.assert_called_once_with(
+            uid_policy("3:*") + all_
+        )
+        account_fetch_messages_using_uids_mock.assert_called_once_with(
+            ["3"], FetchMode.FULL
+        )
+        assert server.commands == [b"GG0 IDLE", b"DONE"]
+
+    @patch.object(Account, "search_message_uids")
+    def test_watch_messages_timeout(
+        self, account_search_message_uids_mock, logged_account, socket_pair
+    ):
+        IdleServer(socket_pair)
+        account_search_message_uids_mock.return_value = ["1", "2"]
+
+        assert list(logged_account.watch_messages(timeout=0.2)) == []
@@ -0,0 +1,156 @@
+import socket
+from imaplib import IMAP4, IMAP4_SSL
+from unittest.mock import Mock, patch
+
+from pytest import fixture, raises
+
+from ggmail.instrumentation import (
+    CommandEvent,
+    CountingIMAP4_SSL,
+    Histogram,
+    MetricsCollector,
+    ParseEvent,
+)
+
+
+@fixture
+def events(logged_account):
+    events = []
+    logged_account.hooks = [events.append]
+    return events
+
+
+class TestHistogram:
+    def test_observe(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [1, 2, 1]
+        assert histogram.count == 4
+        assert histogram.mean == 1.5125
+        assert histogram.minimum == 0.05
+        assert histogram.maximum == 5.0
+
+    def test_percentile(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert histogram.percentile(25) == 0.1
+        assert histogram.percentile(50) == 1.0
+        assert histogram.percentile(100) == 5.0
+
+    def test_empty(self):
+        histogram = Histogram()
+
+        assert histogram.mean is None
+        assert histogram.percentile(50) is None
+
+
+class TestMetricsCollector:
+    def test_collect(self):
+        collector = MetricsCollector()
+
+        collector(CommandEvent(name="UID FETCH", uid_count=2, duration=0.02))
+        collector(CommandEvent(name="UID FETCH", bytes_received=10, duration=0.2))
+        collector(CommandEvent(name="SELECT", duration=0.01, error="abort"))
+        collector(ParseEvent(name="message_factory", count=2, duration=0.001))
+
+        fetch = collector.commands["UID FETCH"]
+        assert fetch.latency.count == 2
+        assert fetch.uid_count == 2
+        assert fetch.bytes_received == 10
+        assert collector.commands["SELECT"].errors == 1
+        assert collector.parsers["message_factory"].count == 1
+
+        snapshot = collector.snapshot()
+        assert snapshot["commands"]["UID FETCH"]["uid_count"] == 2
+
+        collector.reset()
+        assert collector.commands == {}
+        assert collector.parsers == {}
+
+
+class TestCountingIMAP4_SSL:
+    @patch.object(IMAP4_SSL, "__init__", return_value=None)
+    def test_count_bytes(self, imap_init_mock):
+        client, server = socket.socketpair()
+        imap = CountingIMAP4_SSL("imap.gmail.com", 993)
+        imap.sock = client
+        imap.file = client.makefile("rb")
+
+        imap.send(b"GG1 NOOP\r\n")
+        server.sendall(b"GG1 OK NOOP completed\r\n{3}\r\nabc")
+        imap.readline()
+        imap.readline()
+        imap.read(3)
+
+        assert imap.bytes_sent == 10
+        assert imap.bytes_received == 31
+
+        imap.file.close()
+        client.close()
+        server.close()
+
+
+class TestAccountHooks:
+    @patch.object(IMAP4_SSL, "uid")
+    def test_command_event(self, imap_uid_mock, logged_account, events):
+        imap_uid_mock.return_value = "OK", [b"1 2"]
+
+        logged_account.search_message_uids()
+
+        assert len(events) == 1
+        assert events[0].name == "UID SEARCH"
+        assert events[0].uid_count == 0
+        assert events[0].error is None
+
+    @patch.object(IMAP4_SSL, "uid")
+    @patch("ggmail.account.message_factory")
+    def test_fetch_events(
+        self, message_factory_mock, imap_uid_mock, logged_account, events
+    ):
+        imap_uid_mock.return_value = "OK", [
+            (b"1 (UID 1 FLAGS () BODY[] {4}", b"msg1"),
+            b")",
+            (b"2 (UID 2 FLAGS () BODY[] {4}", b"msg2"),
+            b")",
+        ]
+        message_factory_mock.return_value = Mock()
+
+        logged_account.fetch_messages_using_uids(["1", "2"])
+
+        command_event, parse_event = events
+        assert command_event.name == "UID FETCH"
+        assert command_event.uid_count == 2
+        assert parse_event.name == "message_factory"
+        assert parse_event.count == 2
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_failed_command_event(self, imap_uid_mock, logged_account, events):
+        imap_uid_mock.side_effect = IMAP4.error("BAD")
+
+        with raises(IMAP4.error):
+            logged_account.search_message_uids()
+
+        assert events[0].error == "error"
+
+    @patch.object(IMAP4_SSL, "list")
+    def test_mailbox_parse_event(self, imap_list_mock, logged_account, events):
+        imap_list_mock.return_value = "OK", [
+            b'(\\\\HasNoChildren) "/" "INBOX"',
+        ]
+
+        logged_account.mailboxes()
+
+        assert [event.name for event in events] == ["LIST", "mailbox_factory"]
+        assert events[1].count == 1
+
+    @patch.object(IMAP4_SSL, "uid")
+    def test_no_hook(self, imap_uid_mock, logged_account):
+        imap_uid_mock.return_value = "OK", [b"1 2"]
+
+        assert logged_account.search_message_uids() == ["1", "2"]
@@ -1,9 +1,33 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
-from ggmail.mailbox import MailboxKind, mailbox_factory
+from pydantic import ValidationError
+from pytest import raises
+
+from ggmail.mailbox import Mailbox, MailboxKind, mailbox_factory
 
 
 class TestMailboxFactory:
+    @patch.object(Mailbox, "__init__")
+    def test_mailbox_factory_skips_validation(self, init_mock):
+        raw_mailbox_description = b'(\\HasNoChildren) "/" "Custom"'
+        account = Mock()
+
+        mailbox = mailbox_factory(raw_mailbox_description, account)
+
+        init_mock.assert_not_called()
+        assert mailbox.path == "Custom"
+        assert mailbox._account is account
+
+    def test_mailbox_validated(self):
+        with raises(ValidationError):
+            Mailbox(
+                label="Custom",
+                path="Custom",
+                kind="?",
+                has_children=False,
+                _account=None,
+            )
+
     def test_mailbox_custom(self):
         raw_mailbox_description = b'(\\HasNoChildren) "/" "Custom"'
         mailbox = mailbox_factory(raw_mailbox_description, Mock())
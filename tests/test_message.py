@@ -1,22 +1,39 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from email.message import EmailMessage
 from imaplib import IMAP4_SSL
 from unittest.mock import ANY, Mock, call, patch
 
 import pytest
+from pydantic import ValidationError
 from pytest import raises
 
-from ggmail.exception import FlagAlreadyAttached, FlagNotAttached
-from ggmail.flag import Flag
+from ggmail.async_account import AsyncAccount
+from ggmail.exception import FlagAlreadyAttached, FlagNotAttached, MessageNotFound
+from ggmail.flag import FLAG_BITS, Flag, FlagSet, bits_to_flags, flags_to_bits
 from ggmail.message import (
+    Attachment,
+    ContentLoader,
     ContentType,
+    FetchMode,
     Message,
+    MessageSummary,
     decode_byte_best_effort,
     decode_content,
+    decode_content_from_buffer,
+    decode_content_with_encoding,
     decode_flags,
     decode_subject,
+    decode_text,
+    get_content_maintype,
     get_content_type,
+    header_message_factory,
+    lookup_codec,
     message_factory,
+    parse_header,
+    parse_mime,
+    summary_factory,
 )
+from tests.fake_server import STRUCTURES, make_message
 
 
 class TestMessageFlag:
@@ -161,8 +178,10 @@ class TestMoveMessage:
 
         imap_uid_mock.assert_called_once_with("COPY", "1", "Mailbox")
 
+    @patch.object(IMAP4_SSL, "capability")
     @patch.object(IMAP4_SSL, "uid")
-    def test_move_message(self, imap_uid_mock, logged_account):
+    def test_move_message(self, imap_uid_mock, imap_capability_mock, logged_account):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1"]
         message = Message(
             uid="1",
             from_="",
@@ -183,11 +202,13 @@ class TestMoveMessage:
         imap_uid_mock.has_calls([call("Copy", "1", "Mailbox")])
         assert Flag.DELETED in message.flags
 
+    @patch.object(IMAP4_SSL, "capability")
     @patch.object(IMAP4_SSL, "uid")
     @patch.object(IMAP4_SSL, "expunge")
     def test_move_message_with_expunge(
-        self, imap_expunge_mock, imap_uid_mock, logged_account
+        self, imap_expunge_mock, imap_uid_mock, imap_capability_mock, logged_account
     ):
+        imap_capability_mock.return_value = "OK", [b"IMAP4rev1"]
         message = Message(
             uid="1",
             from_="",
@@ -264,6 +285,75 @@ class TestMessageDecoders:
 
         assert decode_content(message) == ("body", r"<html>body<\html>")
 
+    def test_decode_text_declared_charset(self):
+        data = "Zażółć".encode("iso-8859-2")
+
+        assert decode_text(data, "ISO-8859-2") == ("Zażółć", "iso8859-2")
+
+    @pytest.mark.parametrize(
+        "charset",
+        [
+            pytest.param(None, id="missing"),
+            pytest.param("unknown-charset", id="unknown"),
+            pytest.param("us-ascii", id="wrong"),
+        ],
+    )
+    def test_decode_text_fallback(self, charset):
+        assert decode_text("é".encode("utf-8"), charset) == ("é", "utf-8")
+        assert decode_text("é".encode("latin_1"), charset) == ("é", "iso8859-1")
+
+    def test_decode_text_ignore(self):
+        assert decode_text(None) == (None, None)
+
+    def test_lookup_codec(self):
+        lookup_codec.cache_clear()
+
+        assert lookup_codec("UTF8") == "utf-8"
+        assert lookup_codec("UTF8") == "utf-8"
+        assert lookup_codec("unknown-charset") is None
+        assert lookup_codec.cache_info().hits == 1
+
+    def test_decode_content_with_encoding(self):
+        message = EmailMessage()
+        message.set_content("Grüße")
+        message.add_alternative("<p>Grüße</p>", "html", charset="iso-8859-1")
+
+        body, html, encoding = decode_content_with_encoding(message)
+
+        assert body == "Grüße\n"
+        assert html == "<p>Grüße</p>\n"
+        assert encoding == "utf-8"
+
+    @pytest.mark.parametrize("structure", STRUCTURES)
+    def test_decode_content_from_buffer(self, structure):
+        raw_message = make_message(1, 4096, structure)
+
+        assert decode_content_from_buffer(
+            memoryview(raw_message)
+        ) == decode_content_with_encoding(parse_mime(raw_message))
+
+    def test_decode_content_from_buffer_nested(self):
+        raw_message = (
+            b"Content-Type: multipart/mixed; boundary=b\r\n\r\n"
+            b"preamble\r\n"
+            b"--b\r\n\r\n"
+            b"no header\r\n"
+            b"--b\r\n"
+            b"Content-Type: message/rfc822\r\n\r\n"
+            b"Content-Type: text/html; charset=latin_1\r\n"
+            b"Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+            b"caf=E9\r\n"
+            b"--b\r\n"
+            b"Content-Type: application/octet-stream\r\n\r\n"
+            b"\x00\x01\r\n"
+            b"--b--\r\n"
+        )
+
+        content = decode_content_from_buffer(raw_message)
+
+        assert content == ("no header", "café", "utf-8")
+        assert content == decode_content_with_encoding(parse_mime(raw_message))
+
     def test_decode_flags(self):
         header = b"6 (FLAGS (\\Flagged \\Seen) BODY[] {5043}"
         flags = decode_flags(header)
@@ -274,35 +364,29 @@ class TestMessageDecoders:
 
 
 class TestMessageFactory:
-    @patch("ggmail.message.message_from_bytes")
+    @patch("ggmail.message.parse_header")
     @patch("ggmail.message.decode_subject")
-    @patch("ggmail.message.decode_content")
+    @patch("ggmail.message.decode_content_with_encoding")
     @patch("ggmail.message.decode_flags")
     def test_message_factory(
         self,
         decode_flags_mock,
         decode_content_mock,
         decode_subject_mock,
-        email_mock,
+        parse_header_mock,
     ):
-        message_dict = {
-            "From": "from@gmail.com",
-            "To": "to@gmail.com",
-            "Subject": "Subject",
-            "Date": "Sat, 9 Oct 2021 18:27:26 +0200",
+        parse_header_mock.return_value = {
+            "from": "from@gmail.com",
+            "to": "to@gmail.com",
+            "subject": "Subject",
+            "date": "Sat, 9 Oct 2021 18:27:26 +0200",
+            "content-type": "multipart/alternative; boundary=b",
         }
 
-        message = Mock()
-        message.__getitem__ = Mock()
-        message.__getitem__.side_effect = message_dict.__getitem__
-        message.get_content_maintype.return_value = "multipart"
-
-        decode_content_mock.return_value = "body", r"<html>body<\html>"
+        decode_content_mock.return_value = "body", r"<html>body<\html>", "utf-8"
         decode_subject_mock.return_value = "Subject"
         decode_flags_mock.return_value = []
 
-        email_mock.return_value = message
-
         message = message_factory("1", [b"", b""], ANY)
 
         assert message.uid == "1"
@@ -323,3 +407,371 @@ class TestMessageFactory:
     def test_get_content_type(self):
         assert get_content_type("text") is ContentType.TEXT
         assert get_content_type("multipart") is ContentType.MULTIPART
+
+    @pytest.mark.parametrize(
+        "content_type,maintype",
+        [
+            pytest.param(None, "text", id="missing"),
+            pytest.param("Multipart/Mixed; boundary=b", "multipart", id="multipart"),
+            pytest.param("image/png", "image", id="image"),
+            pytest.param("invalid", "text", id="invalid"),
+        ],
+    )
+    def test_get_content_maintype(self, content_type, maintype):
+        assert get_content_maintype(content_type) == maintype
+
+    def test_header_message_factory(self):
+        raw_headers = (
+            b"From: from@gmail.com\r\n"
+            b"To: to@gmail.com\r\n"
+            b"Subject: Subject\r\n"
+            b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n"
+            b"Content-Type: text/plain\r\n\r\n"
+        )
+
+        message = header_message_factory(
+            "1",
+            [b"1 (FLAGS (\\Seen) BODY[HEADER.FIELDS (FROM)] {10}", raw_headers],
+            ANY,
+        )
+
+        assert message.subject == "Subject"
+        assert message.content_type is ContentType.TEXT
+        assert message.flags == [Flag.SEEN]
+
+    def test_parse_header(self):
+        raw_message = (
+            b"Subject: =?utf-8?q?Sub?=\r\n =?utf-8?q?ject?=\r\n"
+            b"Subject: Other\r\n"
+            b"Content-Type: multipart/alternative; boundary=b\r\n\r\n"
+            b"--b\r\nContent-Type: text/plain\r\n\r\nbody\r\n--b--\r\n"
+        )
+
+        header = parse_header(raw_message)
+
+        assert header == {
+            "subject": "=?utf-8?q?Sub?=\r\n =?utf-8?q?ject?=",
+            "content-type": "multipart/alternative; boundary=b",
+        }
+        assert decode_subject(header["subject"]) == "Subject"
+
+    def test_parse_header_not_ascii(self):
+        raw_message = "Subject: Café\r\nTo: to@gmail.com\r\n\r\nbody".encode("utf8")
+
+        header = parse_header(raw_message)
+
+        assert header == {"subject": "Café", "to": "to@gmail.com"}
+
+    @patch("ggmail.message.decode_content_with_encoding")
+    def test_message_factory_drops_raw_message(self, decode_content_mock):
+        decode_content_mock.return_value = "body", None, "ascii"
+        raw_message = (
+            b"From: from@gmail.com\r\n"
+            b"To: to@gmail.com\r\n"
+            b"Subject: Subject\r\n"
+            b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n\r\n"
+            b"body"
+        )
+
+        message = message_factory("1", [b"1 (FLAGS () BODY[] {4}", raw_message], ANY)
+        decode_content_mock.assert_called_once()
+
+        assert message._raw is None
+        assert message.body == "body"
+        assert message.html is None
+        decode_content_mock.assert_called_once()
+
+    @patch("ggmail.message.decode_content_with_encoding")
+    def test_message_factory_keep_raw_decodes_content_once(self, decode_content_mock):
+        decode_content_mock.return_value = "body", None, "ascii"
+        raw_message = (
+            b"Subject: Subject\r\nDate: Sat, 9 Oct 2021 18:27:26 +0200\r\n\r\n"
+        )
+
+        message = message_factory(
+            "1", [b"1 (FLAGS () BODY[] {4}", raw_message], ANY, keep_raw=True
+        )
+        decode_content_mock.assert_not_called()
+
+        assert message.body == "body"
+        assert message.html is None
+        decode_content_mock.assert_called_once()
+
+    def test_message_factory_content_exported(self):
+        raw_message = (
+            b"From: from@gmail.com\r\n"
+            b"To: to@gmail.com\r\n"
+            b"Subject: Subject\r\n"
+            b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n\r\n"
+            b"body"
+        )
+
+        message = message_factory("1", [b"1 (FLAGS () BODY[] {4}", raw_message], ANY)
+
+        assert message.dict()["body"] == "body"
+
+    @patch.object(Message, "__init__")
+    def test_message_factory_skips_validation(self, init_mock):
+        raw_message = (
+            b"From: from@gmail.com\r\n"
+            b"Subject: Subject\r\n"
+            b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n\r\n"
+        )
+        account = Mock()
+
+        message = message_factory(
+            "1", [b"1 (FLAGS () BODY[] {4}", raw_message], account
+        )
+
+        init_mock.assert_not_called()
+        assert message.to == ""
+        assert message._account is account
+
+    def test_message_factory_keep_raw(self):
+        raw_message = bytearray(
+            b"From: from@gmail.com\r\n"
+            b"Subject: Subject\r\n"
+            b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n"
+            b"Content-Type: text/plain; charset=utf-8\r\n"
+            b"Content-Transfer-Encoding: 8bit\r\n\r\n"
+        ) + "Café".encode("utf8")
+
+        message = message_factory(
+            "1", [b"1 (FLAGS () BODY[] {4}", raw_message], ANY, keep_raw=True
+        )
+
+        assert message.raw.obj is raw_message
+        assert message.body == "Café"
+        assert message.raw == raw_message
+
+    def test_message_factory_raw_not_kept(self):
+        raw_message = (
+            b"Subject: Subject\r\nDate: Sat, 9 Oct 2021 18:27:26 +0200\r\n\r\n"
+        )
+
+        message = message_factory("1", [b"1 (FLAGS () BODY[] {4}", raw_message], ANY)
+
+        assert message.raw is None
+
+    def test_parse_mime_view(self):
+        raw_message = (
+            b"Content-Type: text/plain; charset=latin_1\r\n"
+            b"Content-Transfer-Encoding: 8bit\r\n\r\n"
+            b"caf\xe9"
+        )
+
+        mime = parse_mime(memoryview(raw_message))
+
+        assert mime.get_payload(decode=True) == b"caf\xe9"
+        assert decode_content(mime) == ("café", None)
+
+    def test_message_validated(self):
+        with raises(ValidationError):
+            Message(
+                uid="1",
+                from_="from@gmail.com",
+                to="to@gmail.com",
+                subject="Subject",
+                body=None,
+                html=None,
+                date="not a date",
+                content_type=ContentType.TEXT,
+                flags=[],
+                _account=None,
+            )
+
+
+class TestMessageFlagSet:
+    def test_flags_validated(self, message):
+        assert isinstance(message.flags, FlagSet)
+
+    def test_flags_exported(self, message):
+        message.flags.update([Flag.SEEN, "$Forwarded"])
+
+        assert '"flags": ["\\\\Seen", "$Forwarded"]' in message.json()
+
+
+class TestMessageLazyContent:
+    def test_unknown_attribute(self, message):
+        with raises(AttributeError):
+            message.unknown
+
+    def test_content_loaded_once(self, messages):
+        account = Mock()
+        loader = ContentLoader(account, None)
+        for message in messages:
+            loader.attach(message)
+
+        def load_message_contents(messages, mailbox):
+            for message in messages:
+                message.body = f"Body {message.uid}"
+                message.html = None
+
+        account.load_message_contents.side_effect = load_message_contents
+
+        assert messages[1].body == "Body 2"
+        assert messages[0].body == "Body 1"
+        assert messages[0].html is None
+        account.load_message_contents.assert_called_once_with(messages, None)
+
+    def test_export_loads_content(self, message):
+        account = Mock()
+        loader = ContentLoader(account, None)
+        loader.attach(message)
+
+        def load_message_contents(messages, mailbox):
+            for message in messages:
+                message.body = "Loaded"
+                message.html = None
+                message.encoding = "utf-8"
+
+        account.load_message_contents.side_effect = load_message_contents
+
+        exported = message.dict()
+
+        assert exported["body"] == "Loaded"
+        assert exported["encoding"] == "utf-8"
+        assert '"body": "Loaded"' in message.json()
+        account.load_message_contents.assert_called_once()
+
+
+class TestMessageAttachments:
+    @pytest.fixture
+    def account(self, message):
+        account = Mock()
+        account.fetch_attachments_using_uids.return_value = {
+            "1": [
+                Attachment(
+                    account,
+                    uid="1",
+                    part="2",
+                    filename="report.pdf",
+                    content_type="application/pdf",
+                    size=1000,
+                    encoding="base64",
+                )
+            ]
+        }
+        message._account = account
+        message._mailbox = account.inbox()
+        return account
+
+    def test_attachments_fetched_once(self, account, message):
+        assert message.attachments[0].filename == "report.pdf"
+        assert message.attachments[0].part == "2"
+        account.fetch_attachments_using_uids.assert_called_once_with(
+            ["1"], mailbox=account.inbox()
+        )
+
+    def test_attachments_missing_message(self, account, message):
+        account.fetch_attachments_using_uids.return_value = {}
+
+        assert message.attachments == []
+
+    def test_download(self, account, message):
+        message.download(message.attachments[0])
+        message.download("2")
+        message.download("1")
+
+        assert account.download_part.call_args_list == [
+            call("1", "2", "base64", mailbox=account.inbox()),
+            call("1", "2", "base64", mailbox=account.inbox()),
+            call("1", "1", None, mailbox=account.inbox()),
+        ]
+
+    def test_stream(self, account, message):
+        account.stream_part.return_value = iter([b"chunk"])
+
+        assert list(message.stream("2", chunk_size=10)) == [b"chunk"]
+        account.stream_part.assert_called_once_with(
+            "1", "2", "base64", 10, mailbox=account.inbox()
+        )
+
+    def test_async_account(self, account, message):
+        message._account = Mock(spec=AsyncAccount)
+
+        with raises(NotImplementedError):
+            message.attachments
+        with raises(NotImplementedError):
+            message.download("2")
+
+
+@pytest.fixture
+def summary():
+    return MessageSummary(
+        uid=1,
+        from_="from@gmail.com",
+        to="to@gmail.com",
+        subject="Subject",
+        timestamp=1633796846.0,
+        flag_bits=flags_to_bits([Flag.SEEN, Flag.FLAGGED]),
+        _account=Mock(),
+    )
+
+
+class TestMessageSummary:
+    def test_flag_bits(self):
+        bits = flags_to_bits([Flag.SEEN, Flag.ANSWERED, Flag.SEEN])
+
+        assert bits == FLAG_BITS[Flag.SEEN] | FLAG_BITS[Flag.ANSWERED]
+        assert bits_to_flags(bits) == [Flag.ANSWERED, Flag.SEEN]
+
+    def test_summary_flags(self, summary):
+        assert summary.flags == [Flag.FLAGGED, Flag.SEEN]
+        assert summary.has_flag(Flag.SEEN)
+        assert not summary.has_flag(Flag.DRAFT)
+
+    def test_summary_date(self, summary):
+        assert summary.date == datetime(2021, 10, 9, 16, 27, 26, tzinfo=timezone.utc)
+
+    def test_summary_compact(self, summary):
+        assert not hasattr(summary, "__dict__")
+
+    def test_summary_addresses_interned(self, summary):
+        other = MessageSummary(2, "".join(["from@", "gmail.com"]), "", "", 0, 0, None)
+
+        assert other.from_ is summary.from_
+
+    def test_summary_equality(self, summary):
+        other = MessageSummary(
+            1, "from@gmail.com", "to@gmail.com", "Subject", 1633796846.0, 0, None
+        )
+
+        assert other != summary
+        other.flag_bits = summary.flag_bits
+        assert other == summary
+        assert len({other, summary}) == 1
+
+    def test_summary_factory(self):
+        raw_headers = (
+            b"From: from@gmail.com\r\n"
+            b"Subject: =?utf-8?q?Subject?=\r\n"
+            b"Date: Sat, 9 Oct 2021 18:27:26 +0200\r\n\r\n"
+        )
+
+        summary = summary_factory(
+            "7",
+            [b"1 (FLAGS (\\Seen) BODY[HEADER.FIELDS (FROM)] {10}", raw_headers],
+            ANY,
+        )
+
+        assert summary.uid == 7
+        assert summary.from_ == "from@gmail.com"
+        assert summary.to == ""
+        assert summary.subject == "Subject"
+        assert summary.timestamp == 1633796846.0
+        assert summary.flags == [Flag.SEEN]
+
+    def test_to_message(self, summary, message):
+        summary._account.fetch_messages_using_uids.return_value = [message]
+
+        assert summary.to_message() is message
+        summary._account.fetch_messages_using_uids.assert_called_once_with(
+            ["1"], FetchMode.FULL
+        )
+
+    def test_to_message_not_found(self, summary):
+        summary._account.fetch_messages_using_uids.return_value = []
+
+        with raises(MessageNotFound):
+            summary.to_message(FetchMode.HEADERS)
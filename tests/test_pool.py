@@ -0,0 +1,154 @@
+from imaplib import IMAP4_SSL
+from threading import Thread
+from unittest.mock import patch
+
+from pytest import fixture, raises
+
+from ggmail.account import Account
+from ggmail.authentication import Google
+from ggmail.exception import PoolClosed, PoolExhausted
+from ggmail.pool import AccountPool
+
+
+@fixture
+def pool():
+    authentication = Google(username="test@gmail.com", password="secret")
+    return AccountPool(authentication=authentication, size=2, timeout=0.01)
+
+
+class TestAccountPoolAcquire:
+    @patch.object(IMAP4_SSL, "noop")
+    @patch.object(IMAP4_SSL, "login")
+    def test_acquire_login(self, imap_login_mock, imap_noop_mock, pool):
+        account = pool.acquire()
+        assert account.is_connected is True
+        imap_login_mock.assert_called_once()
+
+    @patch.object(IMAP4_SSL, "noop")
+    @patch.object(IMAP4_SSL, "login")
+    def test_acquire_reuse_released(self, imap_login_mock, imap_noop_mock, pool):
+        imap_noop_mock.return_value = "OK", [b""]
+
+        with pool.account() as first:
+            pass
+        with pool.account() as second:
+            pass
+
+        assert first is second
+        imap_login_mock.assert_called_once()
+
+    @patch.object(IMAP4_SSL, "login")
+    def test_acquire_different_sessions(self, imap_login_mock, pool):
+        first = pool.acquire()
+        second = pool.acquire()
+
+        assert first is not second
+        assert first._imap is not second._imap
+
+    @patch.object(IMAP4_SSL, "login")
+    def test_acquire_exhausted(self, imap_login_mock, pool):
+        pool.acquire()
+        pool.acquire()
+
+        with raises(PoolExhausted):
+            pool.acquire()
+
+    @patch.object(IMAP4_SSL, "login")
+    def test_acquire_wait_release(self, imap_login_mock, pool):
+        pool.timeout = 5
+        first = pool.acquire()
+        pool.acquire()
+
+        with patch.object(Account, "is_alive", return_value=True):
+            thread = Thread(target=pool.release, args=(first,))
+            thread.start()
+            assert pool.acquire() is first
+            thread.join()
+
+    @patch.object(IMAP4_SSL, "logout")
+    @patch.object(IMAP4_SSL, "login")
+    @patch.object(Account, "is_alive")
+    def test_acquire_replace_dead(
+        self, account_is_alive_mock, imap_login_mock, imap_logout_mock, pool
+    ):
+        account_is_alive_mock.return_value = False
+        dead = pool.acquire()
+        pool.release(dead)
+
+        account = pool.acquire()
+
+        assert account is not dead
+        assert dead not in pool._accounts
+        assert imap_login_mock.call_count == 2
+
+    def test_acquire_closed(self, pool):
+        pool.close()
+
+        with raises(PoolClosed):
+            pool.acquire()
+
+
+class TestAccountPoolClose:
+    @patch.object(IMAP4_SSL, "logout")
+    @patch.object(IMAP4_SSL, "login")
+    def test_close(self, imap_login_mock, imap_logout_mock, pool):
+        with pool:
+            idle = pool.acquire()
+            borrowed = pool.acquire()
+            pool.release(idle)
+
+        assert idle.is_connected is False
+        assert borrowed.is_connected is True
+
+        pool.release(borrowed)
+
+        assert borrowed.is_connected is False
+        assert pool._accounts == []
+
+    @patch.object(IMAP4_SSL, "logout")
+    @patch.object(IMAP4_SSL, "login")
+    def test_close_wakes_up_waiters(self, imap_login_mock, imap_logout_mock, pool):
+        pool.size = 1
+        pool.timeout = None
+        held = pool.acquire()
+        errors = []
+
+        def wait():
+            try:
+                pool.acquire()
+            except PoolClosed as error:
+                errors.append(error)
+
+        waiters = [Thread(target=wait) for _ in range(2)]
+        for waiter in waiters:
+            waiter.start()
+        pool.close()
+        pool.release(held)
+        for waiter in waiters:
+            waiter.join(timeout=5)
+
+        assert not any(waiter.is_alive() for waiter in waiters)
+        assert len(errors) == 2
+        assert held.is_connected is False
+
+    def test_close_twice(self, pool):
+        pool.close()
+        pool.close()
+
+        with raises(PoolClosed):
+            pool.acquire()
+
+
+class TestAccountIsAlive:
+    @patch.object(IMAP4_SSL, "noop")
+    def test_is_alive(self, imap_noop_mock, logged_account):
+        imap_noop_mock.return_value = "OK", [b""]
+        assert logged_account.is_alive() is True
+
+    @patch.object(IMAP4_SSL, "noop")
+    def test_is_alive_dead_socket(self, imap_noop_mock, logged_account):
+        imap_noop_mock.side_effect = OSError()
+        assert logged_account.is_alive() is False
+
+    def test_is_alive_not_connected(self, account):
+        assert account.is_alive() is False
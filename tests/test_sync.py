@@ -0,0 +1,187 @@
+from contextlib import ExitStack
+from imaplib import IMAP4_SSL
+from unittest.mock import Mock, patch
+
+from pytest import fixture, raises
+
+from ggmail.account import Account, parse_flags_response, parse_vanished_response
+from ggmail.exception import MailboxNotFound
+from ggmail.flag import Flag
+from ggmail.mailbox import Mailbox, MailboxKind
+from ggmail.sync import SyncState
+
+
+@fixture
+def inbox(logged_account):
+    return Mailbox(
+        label="Inbox",
+        path="Inbox",
+        kind=MailboxKind.INBOX,
+        has_children=False,
+        _account=logged_account,
+    )
+
+
+@fixture
+def state():
+    return SyncState(
+        mailbox="Inbox", uidvalidity="42", uidnext=4, highestmodseq=10, uids="1:3"
+    )
+
+
+@fixture
+def server():
+    """
+    Patch the commands used by a synchronization, the response codes are read from
+    the codes dictionary
+    """
+    codes = {"UIDVALIDITY": b"42", "UIDNEXT": b"5", "HIGHESTMODSEQ": b"12"}
+
+    def response(name):
+        return name, [codes.get(name)]
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(IMAP4_SSL, "select"))
+        stack.enter_context(patch.object(IMAP4_SSL, "response", side_effect=response))
+        capability = stack.enter_context(patch.object(IMAP4_SSL, "capability"))
+        capability.return_value = "OK", [b"IMAP4rev1"]
+
+        yield Mock(
+            codes=codes,
+            capability=capability,
+            xatom=stack.enter_context(
+                patch.object(IMAP4_SSL, "xatom", return_value=("OK", [None]))
+            ),
+            uid=stack.enter_context(patch.object(IMAP4_SSL, "uid")),
+            search_message_uids=stack.enter_context(
+                patch.object(Account, "search_message_uids")
+            ),
+            fetch_messages_using_uids=stack.enter_context(
+                patch.object(Account, "fetch_messages_using_uids", return_value=[])
+            ),
+        )
+
+
+class TestParseSync:
+    def test_parse_flags_response(self):
+        raw_response = [
+            b"1 (UID 4 FLAGS (\\Seen) MODSEQ (11))",
+            b"2 (FLAGS () UID 7)",
+            None,
+        ]
+
+        assert parse_flags_response(raw_response) == {
+            "4": [Flag.SEEN],
+            "7": [],
+        }
+
+    def test_parse_vanished_response(self):
+        raw_response = [b"(EARLIER) 2,5:6", b"9", None]
+
+        assert parse_vanished_response(raw_response) == ["2", "5", "6", "9"]
+
+
+class TestAccountChangesSince:
+    def test_no_selected_mailbox(self, logged_account):
+        with raises(MailboxNotFound):
+            logged_account.changes_since()
+
+    def test_first_sync(self, server, inbox):
+        server.search_message_uids.return_value = ["1", "2"]
+
+        changes = inbox.changes_since()
+
+        server.fetch_messages_using_uids.assert_called_once_with(["1", "2"])
+        assert changes.is_full
+        assert changes.state == SyncState(
+            mailbox="Inbox",
+            uidvalidity="42",
+            uidnext=5,
+            highestmodseq=12,
+            uids="1:2",
+        )
+
+    def test_uidvalidity_changed(self, server, inbox, state):
+        server.codes["UIDVALIDITY"] = b"43"
+        server.search_message_uids.return_value = ["1"]
+
+        changes = inbox.changes_since(state)
+
+        server.fetch_messages_using_uids.assert_called_once_with(["1"])
+        assert changes.is_full
+        assert changes.state.uidvalidity == "43"
+
+    def test_qresync(self, server, inbox, state):
+        server.capability.return_value = "OK", [b"IMAP4rev1 CONDSTORE QRESYNC"]
+        server.codes["VANISHED"] = b"(EARLIER) 2"
+        server.uid.return_value = "OK", [
+            b"1 (UID 1 FLAGS (\\Seen) MODSEQ (11))",
+            b"3 (UID 4 FLAGS () MODSEQ (12))",
+        ]
+
+        changes = inbox.changes_since(state)
+
+        server.xatom.assert_called_once_with("ENABLE", "QRESYNC")
+        server.uid.assert_called_once_with(
+            "FETCH", "1:*", "(UID FLAGS)", "(CHANGEDSINCE 10 VANISHED)"
+        )
+        server.search_message_uids.assert_not_called()
+        server.fetch_messages_using_uids.assert_called_once_with(["4"])
+        assert changes.flag_changes == {"1": [Flag.SEEN]}
+        assert changes.expunged_uids == ["2"]
+        assert not changes.is_full
+        assert changes.state.uids == "1,3:4"
+        assert changes.state.highestmodseq == 12
+
+    def test_qresync_unchanged(self, server, inbox, state):
+        server.capability.return_value = "OK", [b"IMAP4rev1 QRESYNC"]
+        server.codes["HIGHESTMODSEQ"] = b"10"
+
+        changes = inbox.changes_since(state)
+
+        server.uid.assert_not_called()
+        server.search_message_uids.assert_not_called()
+        assert changes.flag_changes == {}
+        assert changes.expunged_uids == []
+        assert changes.state.uids == "1:3"
+
+    def test_condstore(self, server, inbox, state):
+        server.capability.return_value = "OK", [b"IMAP4rev1 CONDSTORE"]
+        server.uid.return_value = "OK", [b"2 (UID 3 FLAGS (\\Flagged) MODSEQ (12))"]
+        server.search_message_uids.return_value = ["1", "3"]
+
+        changes = inbox.changes_since(state)
+
+        server.xatom.assert_called_once_with("ENABLE", "CONDSTORE")
+        server.uid.assert_called_once_with(
+            "FETCH", "1:*", "(UID FLAGS)", "(CHANGEDSINCE 10)"
+        )
+        server.fetch_messages_using_uids.assert_called_once_with([])
+        assert changes.flag_changes == {"3": [Flag.FLAGGED]}
+        assert changes.expunged_uids == ["2"]
+        assert changes.state.uids == "1,3"
+
+    def test_without_extension(self, server, inbox, state):
+        server.search_message_uids.return_value = ["2", "3", "4"]
+        server.uid.return_value = "OK", [
+            b"1 (UID 2 FLAGS (\\Seen))",
+            b"2 (UID 3 FLAGS ())",
+        ]
+
+        changes = inbox.changes_since(state)
+
+        server.xatom.assert_not_called()
+        server.uid.assert_called_once_with("FETCH", "2:3", "(FLAGS)")
+        server.fetch_messages_using_uids.assert_called_once_with(["4"])
+        assert changes.flag_changes == {"2": [Flag.SEEN], "3": []}
+        assert changes.expunged_uids == ["1"]
+        assert changes.state.uids == "2:4"
+
+    def test_extension_enabled_once(self, server, inbox, state):
+        server.capability.return_value = "OK", [b"IMAP4rev1 QRESYNC"]
+        server.codes["HIGHESTMODSEQ"] = b"10"
+
+        inbox.changes_since(state)
+        inbox.changes_since(state)
+
+        server.xatom.assert_called_once_with("ENABLE", "QRESYNC")
@@ -0,0 +1,109 @@
+from mmap import mmap
+from unittest.mock import patch
+
+from pytest import fixture
+
+from ggmail.account import Account
+from ggmail.authentication import Google
+from ggmail.message import decode_content_from_buffer
+from ggmail.transport import BufferedIMAP4, BufferedTransport, Transport
+from tests.fake_server import FakeIMAPServer, FakeMailbox, FakeMessage, make_message
+
+
+@fixture
+def server():
+    inbox = FakeMailbox(
+        "INBOX",
+        [
+            FakeMessage(1, make_message(1, 1024), ["\\Seen"]),
+            FakeMessage(2, make_message(2, 64 * 1024)),
+            FakeMessage(3, make_message(3, 256 * 1024, "attachment")),
+        ],
+    )
+    with FakeIMAPServer([inbox]) as fake:
+        yield fake
+
+
+def fetch(server, transport):
+    authentication = Google(
+        username="user",
+        password="password",
+        host=server.host,
+        port=server.port,
+        secure=False,
+    )
+    with Account(authentication=authentication, transport=transport) as account:
+        return account.inbox().fetch()
+
+
+class TestBufferedTransport:
+    def test_default_transport(self, account):
+        assert isinstance(account.transport, BufferedTransport)
+
+    def test_fetch(self, server):
+        messages = fetch(server, BufferedTransport(buffer_size=4096))
+        expected = fetch(server, Transport())
+
+        assert messages == expected
+        assert messages[1].body == expected[1].body
+
+    def test_read_literal_larger_than_buffer(self, server):
+        imap = BufferedIMAP4(server.host, server.port, buffer_size=4096)
+        imap.login("user", "password")
+        imap.select("INBOX")
+
+        status, raw_response = imap.uid("FETCH", "1:2", "(BODY.PEEK[])")
+
+        assert status == "OK"
+        assert bytes(raw_response[0][1]) == make_message(1, 1024)
+        assert isinstance(raw_response[2][1], bytearray)
+        assert raw_response[2][1] == make_message(2, 64 * 1024)
+        assert imap.bytes_received > 64 * 1024
+        imap.logout()
+
+    def test_spill_huge_literal(self, server):
+        transport = BufferedTransport(buffer_size=4096, spill_threshold=128 * 1024)
+
+        with patch(
+            "ggmail.message.decode_content_from_buffer",
+            wraps=decode_content_from_buffer,
+        ) as decode_mock:
+            messages = fetch(server, transport)
+        expected = fetch(server, Transport())
+
+        decode_mock.assert_called_once()
+        assert isinstance(decode_mock.call_args[0][0], mmap)
+        assert messages[2]._raw is None
+        assert messages == expected
+
+    def test_spill_keep_raw(self, server, tmp_path):
+        transport = BufferedTransport(
+            spill_threshold=128 * 1024, spill_directory=str(tmp_path)
+        )
+        authentication = Google(
+            username="user",
+            password="password",
+            host=server.host,
+            port=server.port,
+            secure=False,
+        )
+
+        with Account(
+            authentication=authentication, transport=transport, keep_raw=True
+        ) as account:
+            message = account.inbox().fetch()[2]
+
+        assert message.raw == make_message(3, 256 * 1024, "attachment")
+        assert message.body.startswith("Lorem ipsum")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_debug_uses_imaplib(self, server):
+        imap = BufferedIMAP4(server.host, server.port)
+        imap.debug = 1
+        imap.login("user", "password")
+
+        status, raw_response = imap.select("INBOX")
+
+        assert status == "OK"
+        assert raw_response == [b"3"]
+        imap.logout()
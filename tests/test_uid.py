@@ -0,0 +1,64 @@
+import pytest
+
+from ggmail.uid import chunk_uids, compress_uids, count_uids, expand_uids, uid_ranges
+
+
+class TestUidSet:
+    def test_uid_ranges(self):
+        assert uid_ranges(["5", "1", "2", "3", "3", "9", "10"]) == [
+            (1, 3),
+            (5, 5),
+            (9, 10),
+        ]
+
+    @pytest.mark.parametrize(
+        "uids,uid_set",
+        [
+            pytest.param([], "", id="empty"),
+            pytest.param(["4"], "4", id="single"),
+            pytest.param(["1", "2", "3", "7"], "1:3,7", id="range"),
+            pytest.param(["8", "3", "2", "9"], "2:3,8:9", id="unsorted"),
+        ],
+    )
+    def test_compress_uids(self, uids, uid_set):
+        assert compress_uids(uids) == uid_set
+
+    def test_chunk_uids(self):
+        chunks = chunk_uids(["1", "2", "3", "10", "20", "21"], max_size=7)
+        assert [compress_uids(chunk) for chunk in chunks] == ["1:3,10", "20:21"]
+        assert chunks[0] == ["1", "2", "3", "10"]
+
+    def test_chunk_uids_never_split_range(self):
+        chunks = chunk_uids([str(uid) for uid in range(1, 100001)], max_size=3)
+        assert len(chunks) == 1
+        assert compress_uids(chunks[0]) == "1:100000"
+
+    def test_chunk_uids_large(self):
+        uids = [str(uid) for uid in range(1, 60000, 2)]
+        chunks = chunk_uids(uids, max_size=1000)
+        assert sum(len(chunk) for chunk in chunks) == len(uids)
+        assert all(len(compress_uids(chunk)) <= 1000 for chunk in chunks)
+
+    @pytest.mark.parametrize(
+        "uid_set,uids",
+        [
+            pytest.param("", [], id="empty"),
+            pytest.param("4", ["4"], id="single"),
+            pytest.param("1:3,7", ["1", "2", "3", "7"], id="range"),
+            pytest.param("9:8", ["8", "9"], id="reversed"),
+        ],
+    )
+    def test_expand_uids(self, uid_set, uids):
+        assert expand_uids(uid_set) == uids
+
+    @pytest.mark.parametrize(
+        "uid_set,count",
+        [
+            pytest.param("", 0, id="empty"),
+            pytest.param("4", 1, id="single"),
+            pytest.param("1:3,7", 4, id="range"),
+            pytest.param("5:*", 1, id="star"),
+        ],
+    )
+    def test_count_uids(self, uid_set, count):
+        assert count_uids(uid_set) == count